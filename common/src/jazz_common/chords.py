@@ -0,0 +1,90 @@
+"""Chord symbols as pitch-class masks.
+
+A chord is a root pitch class plus a quality suffix as printed after the root
+(``"7"``, ``"m7"``, ``"maj7(#11)"``...). ``CHORD_TONES`` lists each quality's
+semitones above the root, including a named tension, so a chord's mask can be
+compared against scale masks from ``jazz_common.pcset``.
+"""
+
+from .pcset import mask_from_pcs, pcs_from_mask
+from .pitch import NAME_TO_PC
+
+CHORD_TONES = {
+    "": (0, 4, 7),
+    "m": (0, 3, 7),
+    "6": (0, 4, 7, 9),
+    "m6": (0, 3, 7, 9),
+    "7": (0, 4, 7, 10),
+    "9": (0, 4, 7, 10, 2),
+    "13": (0, 4, 10, 9),
+    "7sus4": (0, 5, 7, 10),
+    "m7": (0, 3, 7, 10),
+    "m9": (0, 3, 7, 10, 2),
+    "maj7": (0, 4, 7, 11),
+    "maj9": (0, 4, 7, 11, 2),
+    "m(maj7)": (0, 3, 7, 11),
+    "m7b5": (0, 3, 6, 10),
+    "dim7": (0, 3, 6, 9),
+    "7(b9)": (0, 4, 7, 10, 1),
+    "7(#9)": (0, 4, 7, 10, 3),
+    "7(#11)": (0, 4, 7, 10, 6),
+    "7(b13)": (0, 4, 7, 10, 8),
+    "7(#5)": (0, 4, 8, 10),
+    # b9, #9, #11 and b13 over 1-3-b7: only the altered scale holds them all.
+    "7alt": (0, 4, 10, 1, 3, 6, 8),
+    "m7(b9)": (0, 3, 7, 10, 1),
+    "maj7(#11)": (0, 4, 7, 11, 6),
+    "maj7(#5)": (0, 4, 8, 11),
+}
+# Other spellings of the same qualities, as found on lead sheets.
+ALIASES = {
+    "-": "m",
+    "-7": "m7",
+    "min7": "m7",
+    "mi7": "m7",
+    "Δ": "maj7",
+    "Δ7": "maj7",
+    "M7": "maj7",
+    "ø": "m7b5",
+    "ø7": "m7b5",
+    "m7(b5)": "m7b5",
+    "-7b5": "m7b5",
+    "°7": "dim7",
+    "o7": "dim7",
+    "-(maj7)": "m(maj7)",
+    "mM7": "m(maj7)",
+    "7b9": "7(b9)",
+    "7#9": "7(#9)",
+    "7#11": "7(#11)",
+    "7b13": "7(b13)",
+    "7#5": "7(#5)",
+    "7+": "7(#5)",
+    "+7": "7(#5)",
+    "sus4": "7sus4",
+    "7sus": "7sus4",
+    "maj7#11": "maj7(#11)",
+    "maj7#5": "maj7(#5)",
+}
+
+
+def normalize_quality(quality: str) -> str:
+    quality = ALIASES.get(quality, quality)
+    if quality not in CHORD_TONES:
+        raise ValueError(f"Unknown chord quality: {quality!r}")
+    return quality
+
+
+def chord_mask(root_pc: int, quality: str) -> int:
+    return mask_from_pcs(root_pc + interval for interval in CHORD_TONES[normalize_quality(quality)])
+
+
+def parse_chord_symbol(symbol: str):
+    """``"Bb7"`` -> ``(10, "7")``: root pitch class and normalized quality."""
+    root = symbol[:2] if len(symbol) > 1 and symbol[1] in "#b" else symbol[:1]
+    if root not in NAME_TO_PC:
+        raise ValueError(f"Unknown chord root in {symbol!r}")
+    return NAME_TO_PC[root], normalize_quality(symbol[len(root):])
+
+
+def chord_pcs(root_pc: int, quality: str):
+    return pcs_from_mask(chord_mask(root_pc, quality))
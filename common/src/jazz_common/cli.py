@@ -0,0 +1,104 @@
+"""``jazz``: one console entry point for every build step, loading subcommands lazily.
+
+Subcommands are registered by module path only, so ``jazz --help`` (and the
+parsing of a chain of steps) imports none of abjad, reportlab or pypdf; a
+step's module is imported when that step runs. Steps separated by ``+`` run
+in one process, paying import costs once and sharing in-process caches::
+
+    jazz generator --pdf --output-dir build + cover --output-dir build + book --output-dir build
+
+The project packages are optional: a step whose package is not installed
+fails with a hint instead of an import traceback.
+"""
+
+import argparse
+import importlib
+import sys
+import time
+
+SEPARATOR = "+"
+# name -> (module whose main(argv) runs the step, one-line help)
+COMMANDS = {
+    "generator": ("jazz_scales.generator", "Generate scale charts in multiple keys (.ly, .pdf, .midi)."),
+    "export-json": ("jazz_scales.export_json", "Export resolved scale charts as JSON for the web app."),
+    "musicxml": ("jazz_scales.musicxml", "Export every key x scale chart as MusicXML (.musicxml files or one .mxl)."),
+    "snippets": ("jazz_scales.snippets", "Engrave each key x scale pair as a cropped SVG for the web app."),
+    "compose": ("jazz_scales.compose", "Engrave pairs once and compose the chapter PDFs from them."),
+    "cover": ("jazz_scales.cover", "Render the book cover PDF."),
+    "book": ("jazz_scales.book", "Merge the cover, TOC and chapter PDFs into the book."),
+    "packet": ("jazz_scales.packet", "Assemble a practice packet of chosen scales and keys from the built book."),
+    "audio": ("jazz_scales.audio", "Trim, level, and write waveform peaks for the rendered WAVs."),
+    "recommend": ("jazz_scales.recommend", "Rank scales for every chord of a progression (JSON or annotated LilyPond)."),
+    "voicings": ("jazz_scales.voicings", "Enumerate shell, rootless and drop voicings of every chart's chord (JSON, optional LilyPond)."),
+    "serve": ("jazz_scales.serve", "Serve single charts on demand over HTTP."),
+    "generate-single": ("jazz_scales.generate_single", "Write the legacy single-key (C) chart to out/."),
+    "book-single": ("jazz_scales.book_single", "Assemble the legacy single-chart book in out/."),
+    "blues": ("jazz_blues.blues_take_1", "Generate the annotated blues studies."),
+    "blues-choruses": ("jazz_blues.guide_tones", "Generate blues choruses with the guide-tone line solver (JSON)."),
+    "blues-musicxml": ("jazz_blues.musicxml", "Export the blues choruses in each key as MusicXML (.musicxml files or one .mxl)."),
+}
+# Distributions that provide each top-level package, for the "not installed" hint.
+PACKAGES = {"jazz_scales": "jazz-scales (pip install ./projects/scales)", "jazz_blues": "jazz-blues (pip install ./projects/blues)"}
+
+
+def split_steps(argv):
+    """Split ``argv`` on ``+`` into ``[(command, args), ...]``; empty steps are dropped."""
+    steps = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    return [(step[0], step[1:]) for step in steps if step]
+
+
+def load(command: str):
+    """Import ``command``'s module and return its ``main``."""
+    module_name = COMMANDS[command][0]
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as exc:
+        package = module_name.split(".")[0]
+        if exc.name != package:
+            raise
+        raise SystemExit(f"jazz {command}: needs {PACKAGES[package]}") from None
+    return module.main
+
+
+def build_parser():
+    lines = [f"  {name:<16} {help_text}" for name, (_module, help_text) in COMMANDS.items()]
+    ap = argparse.ArgumentParser(
+        prog="jazz",
+        description="Run jazz-patterns build steps. Chain steps with '+' to run them in one process.",
+        epilog="commands:\n" + "\n".join(lines) + "\n\nRun 'jazz COMMAND --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("--time", action="store_true", help="Print each step's wall time (including its first-use imports).")
+    ap.add_argument("command", choices=list(COMMANDS), metavar="COMMAND", help="Step to run (see below).")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="The step's own options, then optionally '+ COMMAND ...'.")
+    return ap
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    ap = build_parser()
+    # Global options and the first command come from argparse; the rest is split on '+'.
+    args = ap.parse_args(argv)
+    first = argv.index(args.command)
+    steps = split_steps(argv[first:])
+    for command, _step_args in steps:
+        if command not in COMMANDS:
+            ap.error(f"unknown command {command!r} (choose from {', '.join(COMMANDS)})")
+
+    for command, step_args in steps:
+        start = time.perf_counter()
+        step = load(command)
+        # The steps' parsers take their prog (usage line) from argv[0].
+        sys.argv[0] = f"jazz {command}"
+        step(step_args)
+        if args.time:
+            print(f"jazz {command}: {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
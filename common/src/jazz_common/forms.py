@@ -0,0 +1,100 @@
+"""Chord progressions (forms) shared by the generators and the chord-scale engine.
+
+A form is a list of bars; each bar lists its chord events as ``(degree offset
+in semitones above the key, quality, roman numeral)``, with the bar split
+evenly between its events. Qualities are ``jazz_common.chords`` suffixes.
+"""
+
+import json
+from pathlib import Path
+
+JAZZ_BLUES_FORM = [
+    [(0, "7", "I7")],
+    [(5, "7", "IV7")],
+    [(0, "7", "I7")],
+    [(9, "7", "VI7")],
+    [(2, "m7", "ii7")],
+    [(7, "7", "V7")],
+    [(0, "7", "I7")],
+    [(9, "7", "VI7")],
+    [(2, "m7", "ii7")],
+    [(7, "7", "V7")],
+    [(0, "7", "I7"), (9, "7", "VI7")],
+    [(2, "m7", "ii7"), (7, "7", "V7")],
+]
+
+BASIC_BLUES_FORM = [
+    [(0, "7", "I7")],
+    [(5, "7", "IV7")],
+    [(0, "7", "I7")],
+    [(0, "7", "I7")],
+    [(5, "7", "IV7")],
+    [(5, "7", "IV7")],
+    [(0, "7", "I7")],
+    [(0, "7", "I7")],
+    [(7, "7", "V7")],
+    [(5, "7", "IV7")],
+    [(0, "7", "I7")],
+    [(7, "7", "V7")],
+]
+
+MINOR_BLUES_FORM = [
+    [(0, "m7", "i7")],
+    [(5, "m7", "iv7")],
+    [(0, "m7", "i7")],
+    [(0, "m7", "i7")],
+    [(5, "m7", "iv7")],
+    [(5, "m7", "iv7")],
+    [(0, "m7", "i7")],
+    [(0, "m7", "i7")],
+    [(8, "7", "bVI7")],
+    [(7, "7alt", "V7alt")],
+    [(0, "m7", "i7")],
+    [(2, "m7b5", "iiø7"), (7, "7(b9)", "V7(b9)")],
+]
+
+RHYTHM_CHANGES_A = [
+    [(0, "maj7", "Imaj7"), (9, "7", "VI7")],
+    [(2, "m7", "ii7"), (7, "7", "V7")],
+    [(0, "maj7", "Imaj7"), (9, "7", "VI7")],
+    [(2, "m7", "ii7"), (7, "7", "V7")],
+    [(0, "7", "I7")],
+    [(5, "maj7", "IVmaj7"), (6, "dim7", "#iv°7")],
+    [(2, "m7", "ii7"), (7, "7", "V7")],
+    [(0, "maj7", "Imaj7")],
+]
+
+MAJOR_II_V_I = [
+    [(2, "m7", "ii7")],
+    [(7, "7", "V7")],
+    [(0, "maj7", "Imaj7")],
+    [(0, "maj7", "Imaj7")],
+]
+
+MINOR_II_V_I = [
+    [(2, "m7b5", "iiø7")],
+    [(7, "7alt", "V7alt")],
+    [(0, "m(maj7)", "i(maj7)")],
+    [(0, "m6", "i6")],
+]
+
+FORMS = {
+    "jazz-blues": JAZZ_BLUES_FORM,
+    "basic-blues": BASIC_BLUES_FORM,
+    "minor-blues": MINOR_BLUES_FORM,
+    "rhythm-changes-a": RHYTHM_CHANGES_A,
+    "ii-v-i-major": MAJOR_II_V_I,
+    "ii-v-i-minor": MINOR_II_V_I,
+}
+
+
+def load_forms(path) -> dict:
+    """Forms from a JSON file of ``{"name": [[[offset, quality, roman], ...], ...]}``.
+
+    The roman numeral is optional (``[offset, quality]``), defaulting to ``""``.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    forms = {}
+    for name, bars in raw.items():
+        forms[name] = [[(int(event[0]), event[1], event[2] if len(event) > 2 else "") for event in bar] for bar in bars]
+    return forms
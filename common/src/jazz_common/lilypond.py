@@ -1,18 +1,57 @@
-"""Helpers for compiling generated LilyPond source to PDF/MIDI."""
+"""Helpers for writing generated LilyPond source and compiling it to PDF/MIDI."""
 
+import asyncio
+import hashlib
+import os
 import shutil
+import signal
 import subprocess
+from collections import deque
 from pathlib import Path
 
+import abjad
 
-def _tail(text: str, n: int = 30) -> str:
+from .profile import span
+
+TAIL_LINES = 30
+
+
+def _tail(text: str, n: int = TAIL_LINES) -> str:
     lines = (text or "").splitlines()
     return "\n".join(lines[-n:])
 
 
-def compile_with_lilypond(ly_path: Path, want_pdf: bool, want_midi: bool):
-    lilypond_exe = shutil.which("lilypond")
-    result = {
+def _clean_chunk(string: str) -> str:
+    # The same post-processing LilyPondFile and persist.as_ly apply to the whole
+    # document; both steps are line-local, so applying them per chunk is equivalent.
+    lines = ["" if line.isspace() else line for line in string.split("\n")]
+    return abjad.tag.remove_tags("\n".join(lines))
+
+
+def write_ly_incrementally(items, outfile) -> str:
+    """Write a LilyPond file one top-level item at a time.
+
+    ``items`` (blocks, scores, or literal strings; any iterable, so it may be a
+    generator that builds each score on demand) is formatted and flushed to
+    ``outfile`` item by item instead of as one in-memory document. The bytes are
+    identical to ``abjad.persist.as_ly(abjad.LilyPondFile(items=list(items)), outfile)``.
+    """
+    outfile = str(outfile)
+    Path(outfile).parent.mkdir(parents=True, exist_ok=True)
+    with open(outfile, "w") as f:
+        # Site comments and tags are kept here as persist.as_ly keeps them, then
+        # tags are stripped by _clean_chunk, as as_ly strips them.
+        f.write(_clean_chunk(abjad.lilypond(abjad.LilyPondFile(items=[]), site_comments=True, tags=True)))
+        for item in items:
+            string = item if isinstance(item, str) else abjad.lilypond(item, site_comments=True, tags=True)
+            f.write("\n" + _clean_chunk(string))
+        f.write("\n")
+    return outfile
+
+
+def _empty_result():
+    return {
+        "succeeded": False,
         "pdf_ok": False,
         "midi_ok": False,
         "pdf_path": None,
@@ -21,31 +60,321 @@ def compile_with_lilypond(ly_path: Path, want_pdf: bool, want_midi: bool):
         "stderr_tail": "",
         "cmd": None,
     }
+
+
+def _collect_outputs(result, base: Path, want_pdf: bool, want_midi: bool):
+    pdf_path = base.with_suffix(".pdf")
+    midi_path = base.with_suffix(".midi")
+    mid_path = base.with_suffix(".mid")
+
+    if want_pdf and pdf_path.exists():
+        result["pdf_ok"] = True
+        result["pdf_path"] = str(pdf_path)
+    if want_midi and (midi_path.exists() or mid_path.exists()):
+        result["midi_ok"] = True
+        result["midi_path"] = str(midi_path if midi_path.exists() else mid_path)
+    return result
+
+
+def compile_with_lilypond(ly_path: Path, want_pdf: bool, want_midi: bool, flags=()):
+    lilypond_exe = shutil.which("lilypond")
+    result = _empty_result()
     if lilypond_exe is None:
         result["stderr_tail"] = "ERROR: lilypond not found in PATH."
         return result
 
     base = ly_path.parent / ly_path.stem
-    cmd = [lilypond_exe, "-o", str(base), str(ly_path)]
+    cmd = [lilypond_exe, *flags, "-o", str(base), str(ly_path)]
     result["cmd"] = " ".join(cmd)
 
     try:
-        cp = subprocess.run(cmd, check=True, text=True, capture_output=True)
+        with span("lilypond", cat="subprocess", file=ly_path.name):
+            cp = subprocess.run(cmd, check=True, text=True, capture_output=True)
         result["stdout_tail"] = _tail(cp.stdout)
         result["stderr_tail"] = _tail(cp.stderr)
     except subprocess.CalledProcessError as exc:
         result["stdout_tail"] = _tail(exc.stdout)
         result["stderr_tail"] = _tail(exc.stderr or f"Exited with {exc.returncode}")
+        # A PDF/MIDI left from an earlier run is not this run's output.
+        return result
 
-    pdf_path = base.with_suffix(".pdf")
-    midi_path = base.with_suffix(".midi")
-    mid_path = base.with_suffix(".mid")
+    result["succeeded"] = True
+    return _collect_outputs(result, base, want_pdf, want_midi)
+
+
+def _memory_limiter(memory_limit_mb):
+    """``preexec_fn`` capping the child's address space, or ``None`` where unsupported."""
+    if not memory_limit_mb:
+        return None
+    try:
+        import resource
+    except ImportError:  # not POSIX
+        return None
+    limit = int(memory_limit_mb) * 1024 * 1024
+
+    def apply():
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return apply
 
-    if want_pdf and pdf_path.exists():
-        result["pdf_ok"] = True
-        result["pdf_path"] = str(pdf_path)
-    if want_midi and (midi_path.exists() or mid_path.exists()):
-        result["midi_ok"] = True
-        result["midi_path"] = str(midi_path if midi_path.exists() else mid_path)
 
+async def _pump(stream, name: str, tail: deque, ly_path: Path, on_event):
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            return
+        line = raw.decode("utf-8", errors="replace").rstrip("\n")
+        tail.append(line)
+        if on_event:
+            on_event({"event": "output", "path": str(ly_path), "stream": name, "line": line})
+
+
+async def _run_lilypond_once(cmd, ly_path: Path, timeout, memory_limit_mb, on_event):
+    """One LilyPond attempt; returns (returncode, stdout_tail, stderr_tail, timed_out)."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        preexec_fn=_memory_limiter(memory_limit_mb),
+        # Own process group, so a timeout also takes down LilyPond's Ghostscript child.
+        start_new_session=(os.name == "posix"),
+    )
+    stdout_tail = deque(maxlen=TAIL_LINES)
+    stderr_tail = deque(maxlen=TAIL_LINES)
+    pumps = asyncio.gather(
+        _pump(proc.stdout, "stdout", stdout_tail, ly_path, on_event),
+        _pump(proc.stderr, "stderr", stderr_tail, ly_path, on_event),
+    )
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.shield(pumps), timeout)
+        await proc.wait()
+    except asyncio.TimeoutError:
+        timed_out = True
+        if os.name == "posix":
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            proc.kill()
+        await proc.wait()
+        await pumps
+    return proc.returncode, "\n".join(stdout_tail), "\n".join(stderr_tail), timed_out
+
+
+async def compile_async(jobs, concurrency=None, timeout=None, memory_limit_mb=None, retries=1, on_event=None, flags=()):
+    """Compile many ``.ly`` files concurrently; returns one result dict per job, in order.
+
+    ``jobs`` is a sequence of ``(ly_path, want_pdf, want_midi)``. At most
+    ``concurrency`` LilyPond processes run at once (default: CPU count). Each
+    attempt is killed after ``timeout`` seconds and may use at most
+    ``memory_limit_mb`` of address space. A run that dies from a signal we did not
+    send, or that fails to start, is retried up to ``retries`` times; timeouts and
+    ordinary compile errors are not. ``on_event`` receives progress dicts
+    (``start``, ``output``, ``retry``, ``done``). Results carry the same keys as
+    ``compile_with_lilypond``. ``flags`` are extra LilyPond options for every
+    job (e.g. ``-dbackend=svg``).
+    """
+    jobs = list(jobs)
+    results = [_empty_result() for _ in jobs]
+    lilypond_exe = shutil.which("lilypond")
+    if lilypond_exe is None:
+        for result in results:
+            result["stderr_tail"] = "ERROR: lilypond not found in PATH."
+        return results
+
+    concurrency = max(1, concurrency or os.cpu_count() or 1)
+    lanes = asyncio.Queue()
+    for lane in range(concurrency):
+        lanes.put_nowait(lane)
+    done = 0
+
+    def emit(event):
+        if on_event:
+            on_event(event)
+
+    async def run_job(index, ly_path, want_pdf, want_midi):
+        nonlocal done
+        ly_path = Path(ly_path)
+        base = ly_path.parent / ly_path.stem
+        cmd = [lilypond_exe, *flags, "-o", str(base), str(ly_path)]
+        result = results[index]
+        result["cmd"] = " ".join(cmd)
+
+        succeeded = False
+        lane = await lanes.get()
+        try:
+            for attempt in range(retries + 1):
+                emit({"event": "start", "path": str(ly_path), "attempt": attempt + 1})
+                try:
+                    with span("lilypond", cat="subprocess", tid=f"lilypond-{lane}", file=ly_path.name):
+                        code, out, err, timed_out = await _run_lilypond_once(cmd, ly_path, timeout, memory_limit_mb, on_event)
+                except FileNotFoundError:
+                    result["stderr_tail"] = f"ERROR: could not start {lilypond_exe}."
+                    break
+                except OSError as exc:  # e.g. EAGAIN/ENOMEM at fork time
+                    code, out, err, timed_out = None, "", f"ERROR: could not start lilypond: {exc}", False
+                result["stdout_tail"] = out
+                result["stderr_tail"] = err or (f"Exited with {code}" if code else "")
+                if timed_out:
+                    result["stderr_tail"] = _tail(f"{err}\nERROR: timed out after {timeout}s; killed.")
+                    break
+                succeeded = code == 0
+                transient = code is None or code < 0
+                if not transient or attempt == retries:
+                    break
+                emit({"event": "retry", "path": str(ly_path), "attempt": attempt + 1, "returncode": code})
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        finally:
+            lanes.put_nowait(lane)
+
+        # After a timeout, a failed exit or a failed start, a PDF/MIDI left on
+        # disk by an earlier run is stale: the job failed whatever is there.
+        if succeeded:
+            result["succeeded"] = True
+            _collect_outputs(result, base, want_pdf, want_midi)
+        done += 1
+        ok = (result["pdf_ok"] or not want_pdf) and (result["midi_ok"] or not want_midi)
+        emit({"event": "done", "path": str(ly_path), "ok": ok, "completed": done, "total": len(jobs)})
+
+    await asyncio.gather(*(run_job(index, *job) for index, job in enumerate(jobs)))
+    return results
+
+
+def compile_many(jobs, **options):
+    """Blocking wrapper around ``compile_async`` for the synchronous CLIs."""
+    return asyncio.run(compile_async(jobs, **options))
+
+
+def _link_or_copy(source: Path, target: Path):
+    try:
+        target.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(source, target)
+    except OSError:  # different filesystem, or links unsupported
+        shutil.copy2(source, target)
+
+
+def stamped_outputs(stamp: Path) -> set:
+    """File names ``publish_outputs`` listed in ``stamp`` (empty if there is no stamp)."""
+    try:
+        return set(Path(stamp).read_text(encoding="utf-8").split())
+    except FileNotFoundError:
+        return set()
+
+
+def publish_outputs(outputs, stamp: Path) -> list:
+    """Rename each ``(produced, final)`` pair of a successful run into place, then write ``stamp``.
+
+    The stamp lists the final names and is written last, so a caller that only
+    trusts stamped outputs never takes a file from a killed or failed run (or
+    an older cache) for a finished one. Returns the final paths.
+    """
+    published = []
+    for produced, final in outputs:
+        os.replace(produced, final)
+        published.append(Path(final))
+    if published:
+        Path(stamp).write_text(" ".join(path.name for path in published) + "\n", encoding="utf-8")
+    return published
+
+
+def _cached_outputs(cache_dir: Path, digest: str, want_pdf: bool, want_midi: bool):
+    """Outputs a successful earlier run left for ``digest``, as a result dict.
+
+    Only outputs listed in ``<digest>.ok`` count, so a PDF/MIDI that merely
+    exists (from a killed run, or an older cache) is never a hit.
+    """
+    result = _empty_result()
+    stamped = stamped_outputs(cache_dir / f"{digest}.ok")
+    for wanted, ok_key, path_key, suffix in ((want_pdf, "pdf_ok", "pdf_path", ".pdf"), (want_midi, "midi_ok", "midi_path", ".midi")):
+        path = cache_dir / f"{digest}{suffix}"
+        if wanted and path.name in stamped and path.exists():
+            result[ok_key] = True
+            result[path_key] = str(path)
+    return result
+
+
+def _publish_outputs(result, partial_ly: Path, cache_dir: Path, digest: str):
+    """Rename the outputs a successful run reported to ``<digest>.*`` and stamp them; drop anything else."""
+    outputs = []
+    for path_key, suffix in (("pdf_path", ".pdf"), ("midi_path", ".midi")):
+        if result[path_key]:
+            target = cache_dir / f"{digest}{suffix}"
+            outputs.append((result[path_key], target))
+            result[path_key] = str(target)
+    publish_outputs(outputs, cache_dir / f"{digest}.ok")
+    # Whatever a failed or killed run left under the temporary name.
+    for suffix in (".pdf", ".midi", ".mid"):
+        partial_ly.with_suffix(suffix).unlink(missing_ok=True)
     return result
+
+
+def compile_deduplicated(jobs, cache_dir, **options):
+    """``compile_many``, but byte-identical sources are engraved only once.
+
+    Each distinct source is compiled under a temporary name in ``cache_dir``
+    and, if LilyPond succeeded, its outputs are renamed to ``<sha256
+    prefix>.pdf``/``.midi`` (not compiled at all when an earlier successful run
+    already left the outputs it needs, since the name is the content); they are
+    then hard-linked (or copied) beside every job's own ``.ly`` under that
+    job's name. Returns one result per job, in order.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    groups = {}
+    for ly_path, want_pdf, want_midi in jobs:
+        digest = hashlib.sha256(Path(ly_path).read_bytes()).hexdigest()[:16]
+        group = groups.setdefault(digest, {"paths": [], "pdf": False, "midi": False})
+        group["paths"].append((Path(ly_path), want_pdf, want_midi))
+        group["pdf"] |= want_pdf
+        group["midi"] |= want_midi
+
+    pending = []
+    cached = {}
+    for digest, group in groups.items():
+        result = _cached_outputs(cache_dir, digest, group["pdf"], group["midi"])
+        if (result["pdf_ok"] or not group["pdf"]) and (result["midi_ok"] or not group["midi"]):
+            cached[digest] = result
+            continue
+        # Engraved under a per-process name, so a killed or failed run never
+        # leaves anything under the content name.
+        partial_ly = cache_dir / f"{digest}-partial-{os.getpid()}.ly"
+        shutil.copyfile(group["paths"][0][0], partial_ly)
+        pending.append((digest, (partial_ly, group["pdf"], group["midi"])))
+
+    compiled = compile_many([job for _digest, job in pending], **options)
+    shared = dict(cached)
+    for (digest, (partial_ly, _want_pdf, _want_midi)), result in zip(pending, compiled):
+        shared[digest] = _publish_outputs(result, partial_ly, cache_dir, digest)
+        os.replace(partial_ly, cache_dir / f"{digest}.ly")
+    print(f"  {len(groups)} distinct of {len(jobs)} file(s): {len(pending)} engraved, {len(cached)} already engraved", flush=True)
+
+    by_path = {}
+    for digest, group in groups.items():
+        source = shared[digest]
+        for ly_path, want_pdf, want_midi in group["paths"]:
+            result = dict(source)
+            base = ly_path.parent / ly_path.stem
+            for wanted, ok_key, path_key, suffix in ((want_pdf, "pdf_ok", "pdf_path", ".pdf"), (want_midi, "midi_ok", "midi_path", ".midi")):
+                if wanted and source[ok_key]:
+                    target = base.with_suffix(suffix)
+                    _link_or_copy(Path(source[path_key]), target)
+                    result[path_key] = str(target)
+                else:
+                    result[ok_key] = False
+                    result[path_key] = None
+            by_path[ly_path] = result
+    return [by_path[Path(ly_path)] for ly_path, _want_pdf, _want_midi in jobs]
+
+
+def print_progress(event):
+    """Default ``on_event`` for the CLIs: one line per finished, retried or timed-out file."""
+    if event["event"] == "done":
+        status = "OK " if event["ok"] else "MISS"
+        print(f"  [{event['completed']}/{event['total']}] {status} {Path(event['path']).name}", flush=True)
+    elif event["event"] == "retry":
+        print(f"  retrying {Path(event['path']).name} (exit {event['returncode']})", flush=True)
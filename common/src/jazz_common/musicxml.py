@@ -0,0 +1,296 @@
+"""Stream MusicXML 4.0 scores as text, a measure at a time, with the standard library only.
+
+No document tree is built: ``score_header`` opens a one-part score,
+``measure_xml`` formats one measure from plain note dicts, and
+``SCORE_FOOTER`` closes it, so an exporter writes each measure as soon as it
+is made and memory stays flat however many charts it exports. ``ScoreFiles``
+takes the scores as one ``.musicxml`` or compressed ``.mxl`` file each in a
+directory, or as ``.mxl`` files in a single ``.zip`` download.
+
+A note is a dict::
+
+    {"pitches": [2, 5], "divisions": 3, "type": "eighth",
+     "lyric": "m3", "beam": "begin", "tuplet": "start", "time_modification": (3, 2)}
+
+where ``pitches`` are abjad pitch numbers (middle C = 0; empty for a rest;
+several for a chord), ``divisions`` the duration in ``DIVISIONS`` per quarter,
+and the other keys optional. Pitches are spelled from the key's ``prefer``
+(``"flats"``/``"sharps"``), as the LilyPond charts are.
+"""
+
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from .chords import parse_chord_symbol
+from .pitch import FLAT_KEYS, LETTER_TO_PC, SHARP_KEYS, pc_to_name
+
+# Divisions per quarter note: eighths are 3, triplet eighths 2.
+DIVISIONS = 6
+MEASURE_DIVISIONS = 4 * DIVISIONS
+NOTE_TYPES = {24: "whole", 12: "half", 6: "quarter", 3: "eighth"}
+CLEFS = {"treble": ("G", 2), "bass": ("F", 4), "alto": ("C", 3), "tenor": ("C", 4)}
+ALTERS = {"": 0, "#": 1, "b": -1}
+# Circle-of-fifths position of each letter's natural major key.
+LETTER_FIFTHS = {"f": -1, "c": 0, "g": 1, "d": 2, "a": 3, "e": 4, "b": 5}
+# jazz_common.chords qualities -> (MusicXML kind, [(degree, alter, type), ...]).
+HARMONY_KINDS = {
+    "": ("major", []),
+    "m": ("minor", []),
+    "6": ("major-sixth", []),
+    "m6": ("minor-sixth", []),
+    "7": ("dominant", []),
+    "9": ("dominant-ninth", []),
+    "13": ("dominant-13th", []),
+    "7sus4": ("dominant", [(4, 0, "add"), (3, 0, "subtract")]),
+    "m7": ("minor-seventh", []),
+    "m9": ("minor-ninth", []),
+    "maj7": ("major-seventh", []),
+    "maj9": ("major-ninth", []),
+    "m(maj7)": ("major-minor", []),
+    "m7b5": ("half-diminished", []),
+    "dim7": ("diminished-seventh", []),
+    "7(b9)": ("dominant", [(9, -1, "add")]),
+    "7(#9)": ("dominant", [(9, 1, "add")]),
+    "7(#11)": ("dominant", [(11, 1, "add")]),
+    "7(b13)": ("dominant", [(13, -1, "add")]),
+    "7(#5)": ("augmented-seventh", []),
+    "7alt": ("dominant", [(9, -1, "add"), (9, 1, "add"), (11, 1, "add"), (13, -1, "add")]),
+    "m7(b9)": ("minor-seventh", [(9, -1, "add")]),
+    "maj7(#11)": ("major-seventh", [(11, 1, "add")]),
+    "maj7(#5)": ("major-seventh", [(5, 1, "alter")]),
+}
+MIMETYPE = "application/vnd.recordare.musicxml"
+FORMATS = ("xml", "mxl", "zip")
+SCORE_FOOTER = "  </part>\n</score-partwise>\n"
+
+
+def key_fifths(pc: int, prefer: str, mode: str = "major") -> int:
+    """Sharps (positive) or flats (negative) in the key signature the LilyPond charts print (``\\key <pc> \\<mode>``).
+
+    >>> key_fifths(5, "flats"), key_fifths(5, "flats", "minor"), key_fifths(10, "flats"), key_fifths(6, "sharps")
+    (-1, -4, -2, 6)
+    """
+    token = (FLAT_KEYS if prefer == "flats" else SHARP_KEYS)[pc % 12]
+    fifths = LETTER_FIFTHS[token[0]]
+    # The accidental suffix only: the plain letter "f" is F, not a flat.
+    if token[1:] == "s":
+        fifths += 7
+    elif token[1:] == "f":
+        fifths -= 7
+    return fifths - 3 if mode == "minor" else fifths
+
+
+def spell(number: int, prefer: str):
+    """``(step, alter, octave)`` of abjad pitch number ``number`` (``-2`` with flats -> ``("B", -1, 3)``)."""
+    name = pc_to_name(number % 12, prefer)
+    step, alter = name[0], ALTERS[name[1:]]
+    return step, alter, (number - alter - LETTER_TO_PC[step]) // 12 + 4
+
+
+def beam_runs(notes, span: int = MEASURE_DIVISIONS):
+    """Set ``"beam"`` on runs of two or more pitched eighths (or shorter) within each ``span`` divisions."""
+    run, offset = [], 0
+
+    def close():
+        if len(run) > 1:
+            run[0]["beam"], run[-1]["beam"] = "begin", "end"
+            for note in run[1:-1]:
+                note["beam"] = "continue"
+        run.clear()
+
+    for note in notes:
+        if offset % span == 0:
+            close()
+        if note["pitches"] and note["divisions"] <= 3:
+            run.append(note)
+        else:
+            close()
+        offset += note["divisions"]
+    close()
+    return notes
+
+
+def _escape(text) -> str:
+    return escape(str(text))
+
+
+def score_header(title: str, composer: str | None = None, rights: str | None = None, part_name: str = "", miscellaneous=()) -> str:
+    """Everything up to the first measure of a one-part score; ``miscellaneous`` is ``[(name, text), ...]``."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>',
+        '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">',
+        '<score-partwise version="4.0">',
+        f"  <work><work-title>{_escape(title)}</work-title></work>",
+        "  <identification>",
+    ]
+    if composer:
+        lines.append(f'    <creator type="composer">{_escape(composer)}</creator>')
+    if rights:
+        lines.append(f"    <rights>{_escape(rights)}</rights>")
+    lines.append("    <encoding><software>jazz-patterns</software></encoding>")
+    if miscellaneous:
+        lines.append("    <miscellaneous>")
+        lines += [f"      <miscellaneous-field name={quoteattr(name)}>{_escape(text)}</miscellaneous-field>" for name, text in miscellaneous]
+        lines.append("    </miscellaneous>")
+    lines += [
+        "  </identification>",
+        f'  <part-list><score-part id="P1"><part-name>{_escape(part_name)}</part-name></score-part></part-list>',
+        '  <part id="P1">',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def attributes_xml(fifths: int, mode: str = "major", clef: str = "treble", time: bool = True) -> str:
+    """An ``<attributes>`` element: divisions, key signature, 4/4 (with ``time``), and clef."""
+    sign, line = CLEFS[clef]
+    parts = [f"<divisions>{DIVISIONS}</divisions>", f"<key><fifths>{fifths}</fifths><mode>{mode}</mode></key>"]
+    if time:
+        parts.append("<time><beats>4</beats><beat-type>4</beat-type></time>")
+    parts.append(f"<clef><sign>{sign}</sign><line>{line}</line></clef>")
+    return "      <attributes>" + "".join(parts) + "</attributes>\n"
+
+
+def harmony_xml(symbol: str) -> str:
+    """A ``<harmony>`` chord symbol for ``symbol`` (e.g. ``"Bbm7(b9)"``), its quality as printed kept in ``text``."""
+    _root_pc, quality = parse_chord_symbol(symbol)
+    root = symbol[:2] if len(symbol) > 1 and symbol[1] in "#b" else symbol[:1]
+    kind, degrees = HARMONY_KINDS[quality]
+    parts = [f"<root><root-step>{root[0]}</root-step>"]
+    if root[1:]:
+        parts.append(f"<root-alter>{ALTERS[root[1:]]}</root-alter>")
+    parts.append(f"</root><kind text={quoteattr(symbol[len(root):])}>{kind}</kind>")
+    for value, alter, kind_of_change in degrees:
+        parts.append(f"<degree><degree-value>{value}</degree-value><degree-alter>{alter}</degree-alter><degree-type>{kind_of_change}</degree-type></degree>")
+    return "      <harmony>" + "".join(parts) + "</harmony>\n"
+
+
+def words_xml(text: str, placement: str = "above") -> str:
+    return f'      <direction placement="{placement}"><direction-type><words>{_escape(text)}</words></direction-type></direction>\n'
+
+
+def tempo_xml(bpm: int) -> str:
+    return (
+        '      <direction placement="above"><direction-type><metronome><beat-unit>quarter</beat-unit>'
+        f"<per-minute>{bpm}</per-minute></metronome></direction-type><sound tempo=\"{bpm}\"/></direction>\n"
+    )
+
+
+def note_xml(note, prefer: str) -> str:
+    """The ``<note>`` elements (one per chord tone) for a note dict."""
+    pitches = note["pitches"] or [None]
+    tuplet = note.get("tuplet")
+    modification = note.get("time_modification")
+    out = []
+    for index, number in enumerate(pitches):
+        parts = ["<chord/>"] if index else []
+        if number is None:
+            parts.append("<rest/>")
+        else:
+            step, alter, octave = spell(number, prefer)
+            alter_xml = f"<alter>{alter}</alter>" if alter else ""
+            parts.append(f"<pitch><step>{step}</step>{alter_xml}<octave>{octave}</octave></pitch>")
+        parts.append(f"<duration>{note['divisions']}</duration><voice>1</voice><type>{note['type']}</type>")
+        if modification:
+            parts.append(f"<time-modification><actual-notes>{modification[0]}</actual-notes><normal-notes>{modification[1]}</normal-notes></time-modification>")
+        if note.get("beam") and not index:
+            parts.append(f'<beam number="1">{note["beam"]}</beam>')
+        if tuplet and not index:
+            parts.append(f'<notations><tuplet type="{tuplet}"/></notations>')
+        if note.get("lyric") and not index:
+            parts.append(f"<lyric><syllabic>single</syllabic><text>{_escape(note['lyric'])}</text></lyric>")
+        out.append("      <note>" + "".join(parts) + "</note>\n")
+    return "".join(out)
+
+
+def measure_xml(number: int, notes, prefer: str, attributes: str = "", directions=(), harmonies=(), new_system: bool = False) -> str:
+    """One ``<measure>``: ``attributes`` first, then each note preceded by the directions and harmonies at its offset.
+
+    ``directions`` are ``(offset, xml)`` pairs (``words_xml``/``tempo_xml``),
+    ``harmonies`` are ``(offset, chord symbol)`` pairs, offsets in divisions.
+    """
+    out = [f'    <measure number="{number}">\n']
+    if new_system:
+        out.append('      <print new-system="yes"/>\n')
+    out.append(attributes)
+    directions = sorted(directions, key=lambda item: item[0])
+    harmonies = sorted(harmonies, key=lambda item: item[0])
+    offset = 0
+    for note in notes:
+        while directions and directions[0][0] <= offset:
+            out.append(directions.pop(0)[1])
+        while harmonies and harmonies[0][0] <= offset:
+            out.append(harmony_xml(harmonies.pop(0)[1]))
+        out.append(note_xml(note, prefer))
+        offset += note["divisions"]
+    out.append("    </measure>\n")
+    return "".join(out)
+
+
+@contextmanager
+def _mxl_stream(raw, filename: str):
+    """A text stream for the one score of a compressed MusicXML file written to the binary stream ``raw``."""
+    with zipfile.ZipFile(raw, "w", zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype entry comes first and is stored uncompressed.
+        archive.writestr(zipfile.ZipInfo("mimetype"), MIMETYPE, compress_type=zipfile.ZIP_STORED)
+        with archive.open(filename, "w") as entry, io.TextIOWrapper(entry, encoding="utf-8") as f:
+            yield f
+        archive.writestr(
+            "META-INF/container.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<container><rootfiles><rootfile full-path={quoteattr(filename)} media-type="{MIMETYPE}+xml"/></rootfiles></container>\n',
+        )
+
+
+class ScoreFiles:
+    """Scores written to ``path`` in one of ``FORMATS``.
+
+    ``xml`` and ``mxl`` make ``path`` a directory of ``.musicxml`` or
+    compressed ``.mxl`` files; ``zip`` makes it one ``.zip`` of ``.mxl``
+    files. An ``.mxl`` always holds a single score: notation apps open only
+    the first rootfile of its container (the others are alternate renditions
+    of the same score). ``open(name)`` gives a text stream for one score
+    (``name`` without suffix).
+    """
+
+    def __init__(self, path, format: str = "xml"):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown score format {format!r} (have {', '.join(FORMATS)})")
+        self.path = Path(path)
+        self.format = format
+        if format == "zip":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Entries are stored: each .mxl is compressed already.
+            self.archive = zipfile.ZipFile(self.path, "w")
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.archive = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def open(self, name: str):
+        if self.format == "xml":
+            filename = f"{name}.musicxml"
+            with open(self.path / filename, "w", encoding="utf-8") as f:
+                yield f
+            return
+        filename = f"{name}.mxl"
+        if self.archive is None:
+            with open(self.path / filename, "wb") as raw, _mxl_stream(raw, f"{name}.musicxml") as f:
+                yield f
+            return
+        buffer = io.BytesIO()
+        with _mxl_stream(buffer, f"{name}.musicxml") as f:
+            yield f
+        self.archive.writestr(filename, buffer.getvalue())
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
@@ -0,0 +1,120 @@
+"""Pitch-class sets as 12-bit masks, and an index for reverse note -> scale lookup.
+
+Bit ``n`` (value ``1 << n``) stands for pitch class ``n`` (C=0 .. B=11), so a
+scale in a key is one small integer and transposing it is a 12-bit rotation.
+"Which scales contain these notes?" is then ``mask & query == query`` and
+"which scales fit inside these notes?" is ``mask & ~query == 0``, evaluated for
+every scale in every key at once over a NumPy ``uint16`` array.
+"""
+
+import numpy as np
+
+from .pitch import NAME_TO_PC
+
+FULL_MASK = 0xFFF
+# Set bits of every 12-bit mask, for vectorized Hamming distances.
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(FULL_MASK + 1)], dtype=np.uint8)
+
+
+def pc_from_name(name: str) -> int:
+    """Pitch class of a note name with an optional octave digit, e.g. ``"Eb"`` or ``"C5"``."""
+    return NAME_TO_PC[name.rstrip("0123456789")]
+
+
+def mask_from_pcs(pcs) -> int:
+    mask = 0
+    for pc in pcs:
+        mask |= 1 << (pc % 12)
+    return mask
+
+
+def mask_from_names(names) -> int:
+    return mask_from_pcs(pc_from_name(name) for name in names)
+
+
+def pcs_from_mask(mask: int):
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def transpose_mask(mask: int, semitones: int) -> int:
+    """Rotate ``mask`` up by ``semitones`` (pitch class ``n`` becomes ``n + semitones``)."""
+    semitones %= 12
+    return ((mask << semitones) | (mask >> (12 - semitones))) & FULL_MASK
+
+
+def is_subset(mask: int, of: int) -> bool:
+    return mask & ~of & FULL_MASK == 0
+
+
+def distance(a: int, b: int) -> int:
+    """Notes in one set but not the other."""
+    return bin((a ^ b) & FULL_MASK).count("1")
+
+
+def as_masks(queries) -> np.ndarray:
+    """Queries (ints, or iterables of pitch classes) as a ``uint16`` column for broadcasting."""
+    masks = [q if isinstance(q, (int, np.integer)) else mask_from_pcs(q) for q in queries]
+    return np.asarray(masks, dtype=np.uint16).reshape(-1, 1)
+
+
+class PitchClassSetIndex:
+    """Every scale in every key as a ``uint16`` mask, with subset/superset/nearest queries.
+
+    ``labels[i]`` is ``(scale name, root pitch class)`` for ``masks[i]``. Single
+    queries take an int mask and return entry indices; the ``*_many`` variants
+    take a sequence of queries and return a ``(queries, entries)`` array.
+    """
+
+    __slots__ = ("labels", "masks")
+
+    def __init__(self, labels, masks):
+        self.labels = list(labels)
+        self.masks = np.asarray(masks, dtype=np.uint16)
+
+    @classmethod
+    def from_scales(cls, scales):
+        """Index ``(name, note names in C)`` pairs in all 12 transpositions, scale-major."""
+        labels = []
+        masks = []
+        for name, notes in scales:
+            base = mask_from_names(notes)
+            for root in range(12):
+                labels.append((name, root))
+                masks.append(transpose_mask(base, root))
+        return cls(labels, masks)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def containing_many(self, queries) -> np.ndarray:
+        """``[q, i]`` is true when entry ``i`` contains every note of query ``q``."""
+        q = as_masks(queries)
+        return (self.masks & q) == q
+
+    def within_many(self, queries) -> np.ndarray:
+        """``[q, i]`` is true when every note of entry ``i`` is in query ``q``."""
+        q = as_masks(queries)
+        return (self.masks & ~q & FULL_MASK) == 0
+
+    def distances_many(self, queries) -> np.ndarray:
+        """``[q, i]`` is the number of notes in exactly one of query ``q`` and entry ``i``."""
+        return POPCOUNT[self.masks ^ as_masks(queries)]
+
+    def containing(self, mask: int):
+        return np.flatnonzero(self.containing_many([mask])[0]).tolist()
+
+    def within(self, mask: int):
+        return np.flatnonzero(self.within_many([mask])[0]).tolist()
+
+    def nearest(self, mask: int, count: int = 5):
+        """The ``count`` closest entries as ``(index, distance)``, ties in index order."""
+        distances = self.distances_many([mask])[0]
+        order = np.argsort(distances, kind="stable")[:count]
+        return [(int(i), int(distances[i])) for i in order]
+
+    def same_notes(self):
+        """Groups of entries (two or more) that share one pitch-class set, e.g. modes of one parent scale."""
+        groups = {}
+        for i, mask in enumerate(self.masks.tolist()):
+            groups.setdefault(mask, []).append(i)
+        return {mask: entries for mask, entries in groups.items() if len(entries) > 1}
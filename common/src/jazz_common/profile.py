@@ -0,0 +1,104 @@
+"""Nested timing spans written as Chrome trace JSON plus a plain-text summary.
+
+Spans are recorded only while a run is being profiled (see ``profiled``); with
+profiling off, ``span`` is a cheap no-op, so call sites can stay in place. The
+trace loads in ``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+_recorder = None
+
+
+class Recorder:
+    """Collects completed spans as Chrome trace "complete" (``ph: X``) events."""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin_ns = time.perf_counter_ns()
+
+    def add(self, name: str, cat: str, start_ns: int, end_ns: int, tid, args: dict):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start_ns - self.origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self.lock:
+            self.events.append(event)
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", tid=None, **args):
+    """Time the enclosed block as one span.
+
+    Spans nest by time containment per thread. Pass ``tid`` to put overlapping
+    work that shares a thread (e.g. concurrent asyncio jobs) on its own track.
+    """
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        recorder.add(name, cat, start, time.perf_counter_ns(), threading.get_ident() if tid is None else tid, args)
+
+
+def summarize(events) -> str:
+    """Per-span-name count / total / mean / max, largest total first."""
+    totals = {}
+    for event in events:
+        count, total, longest = totals.get(event["name"], (0, 0.0, 0.0))
+        totals[event["name"]] = (count + 1, total + event["dur"], max(longest, event["dur"]))
+    wall = max((event["ts"] + event["dur"] for event in events), default=0.0)
+
+    lines = [f"Profile summary (wall {wall / 1e6:.3f} s)", ""]
+    lines.append(f"{'span':<44} {'count':>7} {'total s':>10} {'mean ms':>10} {'max ms':>10}")
+    for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name[:44]:<44} {count:>7} {total / 1e6:>10.3f} {total / count / 1e3:>10.2f} {longest / 1e3:>10.2f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(recorder: Recorder, trace_path: Path) -> Path:
+    """Write ``trace_path`` (Chrome trace JSON) and a ``.txt`` summary beside it."""
+    trace_path = Path(trace_path)
+    trace_path.parent.mkdir(parents=True, exist_ok=True)
+    trace_path.write_text(json.dumps({"traceEvents": recorder.events, "displayTimeUnit": "ms"}) + "\n", encoding="utf-8")
+    summary_path = trace_path.with_suffix(".txt")
+    summary_path.write_text(summarize(recorder.events), encoding="utf-8")
+    return summary_path
+
+
+@contextmanager
+def profiled(trace_path, name: str):
+    """Profile the enclosed run under a root span ``name`` when ``trace_path`` is set.
+
+    On exit the trace and summary are written and the summary path is printed.
+    With ``trace_path`` of ``None`` this does nothing.
+    """
+    global _recorder
+    if trace_path is None:
+        yield
+        return
+    _recorder = Recorder()
+    recorder = _recorder
+    try:
+        with span(name, cat="run"):
+            yield
+    finally:
+        _recorder = None
+        summary_path = write_reports(recorder, trace_path)
+        print(f"Wrote profile {trace_path} and {summary_path}")
@@ -0,0 +1,126 @@
+"""Split a build across runners with ``--shard i/N`` and merge the pieces back.
+
+A shard takes every ``N``-th item of the build's deterministic task list,
+starting at item ``i`` (1-based), so the ``N`` shards cover the list exactly
+once whatever machine runs them. Each shard writes ``shard-manifest.json`` in
+its output directory listing the artifacts it produced (paths relative to that
+directory, with sizes and SHA-256 digests). ``merge_shards`` checks that all
+``N`` manifests of one split are present and agree, verifies every artifact,
+and copies them into one directory, which then looks the same as the output of
+an unsharded build.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+MANIFEST_NAME = "shard-manifest.json"
+
+
+def parse_shard(text: str):
+    """``"i/N"`` -> ``(i, N)`` with ``1 <= i <= N``; raises ``ValueError`` otherwise."""
+    index, _slash, count = text.partition("/")
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Bad shard {text!r}: expected i/N with 1 <= i <= N, e.g. 2/4")
+    return int(index), int(count)
+
+
+def select(items, shard):
+    """This shard's share of ``items``: every ``N``-th from the ``i``-th; all of them for ``None``."""
+    items = list(items)
+    if shard is None:
+        return items
+    index, count = shard
+    return items[index - 1::count]
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(out_dir: Path, shard, paths):
+    """Record ``paths`` (files under ``out_dir``) as shard ``(i, N)``'s artifacts."""
+    out_dir = Path(out_dir)
+    artifacts = []
+    for path in sorted({Path(p).resolve() for p in paths}):
+        artifacts.append({
+            "path": path.relative_to(out_dir.resolve()).as_posix(),
+            "size": path.stat().st_size,
+            "sha256": file_digest(path),
+        })
+    index, count = shard
+    manifest = {"shard": index, "shards": count, "artifacts": artifacts}
+    path = out_dir / MANIFEST_NAME
+    path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def load_manifests(shard_dirs):
+    """``[(shard_dir, manifest), ...]`` ordered by shard; raises ``ValueError`` unless they form one whole split."""
+    loaded = []
+    for shard_dir in shard_dirs:
+        path = Path(shard_dir) / MANIFEST_NAME
+        if not path.exists():
+            raise ValueError(f"{shard_dir}: no {MANIFEST_NAME} (was it built with --shard?)")
+        loaded.append((Path(shard_dir), json.loads(path.read_text(encoding="utf-8"))))
+    counts = {manifest["shards"] for _dir, manifest in loaded}
+    if len(counts) != 1:
+        raise ValueError(f"Shards come from different splits (N = {', '.join(map(str, sorted(counts)))})")
+    (count,) = counts
+    seen = sorted(manifest["shard"] for _dir, manifest in loaded)
+    if seen != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(seen))
+        extra = sorted(i for i in set(seen) if seen.count(i) > 1)
+        problem = f"missing {', '.join(f'{i}/{count}' for i in missing)}" if missing else f"duplicate {', '.join(f'{i}/{count}' for i in extra)}"
+        raise ValueError(f"Incomplete shard set: {problem}")
+    return sorted(loaded, key=lambda item: item[1]["shard"])
+
+
+def _link_or_copy(source: Path, target: Path):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def merge_shards(shard_dirs, out_dir: Path, siblings=()):
+    """Verify and gather every shard's artifacts into ``out_dir``; returns the merged relative paths.
+
+    ``siblings`` are suffixes of files made from an artifact after the manifest
+    was written (e.g. ``.wav`` rendered from a ``.midi``): each one found beside
+    an artifact, under the same stem, is gathered too.
+    An artifact listed by two shards must have the same content in both.
+    """
+    out_dir = Path(out_dir)
+    placed = {}
+    for shard_dir, manifest in load_manifests(shard_dirs):
+        for artifact in manifest["artifacts"]:
+            source = shard_dir / artifact["path"]
+            if not source.exists():
+                raise ValueError(f"{shard_dir}: missing artifact {artifact['path']}")
+            if source.stat().st_size != artifact["size"] or file_digest(source) != artifact["sha256"]:
+                raise ValueError(f"{shard_dir}: {artifact['path']} changed since its manifest was written")
+            previous = placed.get(artifact["path"])
+            if previous is not None and previous != artifact["sha256"]:
+                raise ValueError(f"{artifact['path']} differs between shards")
+            placed[artifact["path"]] = artifact["sha256"]
+            if source.resolve() != (out_dir / artifact["path"]).resolve():
+                _link_or_copy(source, out_dir / artifact["path"])
+            stem = source.name.split(".")[0]
+            for suffix in siblings:
+                sibling = source.with_name(stem + suffix)
+                relative = (Path(artifact["path"]).parent / sibling.name).as_posix()
+                if sibling.exists() and relative not in placed:
+                    placed[relative] = None
+                    if sibling.resolve() != (out_dir / relative).resolve():
+                        _link_or_copy(sibling, out_dir / relative)
+    return sorted(placed)
@@ -0,0 +1,160 @@
+"""An optional artifact store: one SQLite file indexing every chart and media file a build makes.
+
+Each row names an artifact by what it is, ``(project, section, scale, key,
+edition, format)``, and records its SHA-256, size, build metadata (JSON), and
+either a path or, with ``embed``, the content itself in a ``blobs`` table keyed
+by hash (so identical files are stored once). Paths under the database's
+directory are kept relative to it, so a build directory can be moved or
+unpacked elsewhere with its store. Downstream steps query the store instead of
+globbing a directory and reverse-sanitizing filenames:
+
+    store = ArtifactStore("build/artifacts.sqlite")
+    for row in store.find("scales", format="pdf", section="key"):
+        print(row["key"], store.path(row))
+
+``python -m jazz_common.store DB list ...`` prints matching paths for shell
+scripts (``render_wavs.sh`` reads its MIDI list this way).
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    section TEXT NOT NULL DEFAULT '',
+    scale TEXT NOT NULL DEFAULT '',
+    key TEXT NOT NULL DEFAULT '',
+    edition TEXT NOT NULL DEFAULT '',
+    format TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT,
+    meta TEXT NOT NULL DEFAULT '{}',
+    created REAL NOT NULL,
+    UNIQUE (project, section, scale, key, edition, format)
+);
+CREATE INDEX IF NOT EXISTS artifacts_lookup ON artifacts (project, format, edition, section, key, scale);
+CREATE INDEX IF NOT EXISTS artifacts_sha256 ON artifacts (sha256);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+FIELDS = ("project", "section", "scale", "key", "edition", "format")
+
+
+class ArtifactStore:
+    """Artifacts of one or more builds in the SQLite file at ``path`` (created on first use)."""
+
+    def __init__(self, path):
+        self.file = Path(path)
+        self.root = self.file.resolve().parent
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.file)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.db.commit()
+        self.close()
+
+    def _stored_path(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def put(self, project: str, format: str, path, *, section="", scale="", key="", edition="", embed=False, meta=None):
+        """Record the file at ``path`` (replacing the artifact with the same identity); returns its SHA-256."""
+        data = Path(path).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if embed:
+            self.db.execute("INSERT OR IGNORE INTO blobs (sha256, data) VALUES (?, ?)", (digest, data))
+        self.db.execute(
+            "INSERT OR REPLACE INTO artifacts (project, section, scale, key, edition, format, sha256, size, path, meta, created)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (project, section, scale, key, edition, format, digest, len(data),
+             None if embed else self._stored_path(path), json.dumps(meta or {}, sort_keys=True), time.time()),
+        )
+        return digest
+
+    def commit(self):
+        self.db.commit()
+
+    def _where(self, project: str, filters: dict):
+        unknown = set(filters) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown artifact field(s): {', '.join(sorted(unknown))}")
+        return " AND ".join(f"{field} = ?" for field in ("project", *filters)), (project, *filters.values())
+
+    def find(self, project: str, **filters):
+        """Rows of ``project`` matching every given field (``format``, ``section``, ``scale``, ``key``, ``edition``), in insertion order."""
+        where, values = self._where(project, filters)
+        return self.db.execute(f"SELECT * FROM artifacts WHERE {where} ORDER BY id", values).fetchall()
+
+    def delete(self, project: str, **filters) -> int:
+        """Remove the rows ``find`` would return (not committed until ``commit``); returns how many."""
+        where, values = self._where(project, filters)
+        return self.db.execute(f"DELETE FROM artifacts WHERE {where}", values).rowcount
+
+    def get(self, project: str, **identity):
+        """The one row with this identity (fields left out are ``""``), or ``None``."""
+        values = [identity.get(field, "") for field in FIELDS[1:]]
+        return self.db.execute(
+            "SELECT * FROM artifacts WHERE project = ? AND section = ? AND scale = ? AND key = ? AND edition = ? AND format = ?",
+            (project, *values),
+        ).fetchone()
+
+    def path(self, row):
+        """Filesystem path of a row's file, or ``None`` if its content is embedded."""
+        if row["path"] is None:
+            return None
+        return self.root / row["path"]
+
+    def read_bytes(self, row) -> bytes:
+        if row["path"] is None:
+            return self.db.execute("SELECT data FROM blobs WHERE sha256 = ?", (row["sha256"],)).fetchone()[0]
+        return self.path(row).read_bytes()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query an artifact store (SQLite) written with --store.")
+    ap.add_argument("db", type=Path, help="Store file.")
+    ap.add_argument("command", choices=["list"], help="list: print the path of each matching artifact, one per line.")
+    ap.add_argument("--project", required=True, help="Project (e.g. scales, blues).")
+    for field in FIELDS[1:]:
+        ap.add_argument(f"--{field}", default=None, help=f"Only artifacts with this {field}.")
+    args = ap.parse_args(argv)
+
+    if not args.db.exists():
+        raise SystemExit(f"No artifact store at {args.db}")
+    store = ArtifactStore(args.db)
+    filters = {field: getattr(args, field) for field in FIELDS[1:] if getattr(args, field) is not None}
+    for row in store.find(args.project, **filters):
+        path = store.path(row)
+        if path is None:
+            continue
+        if not path.exists():
+            print(f"Skipping {path}: recorded in {args.db} but missing", file=sys.stderr)
+            continue
+        sys.stdout.write(f"{path}\n")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
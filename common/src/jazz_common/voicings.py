@@ -0,0 +1,134 @@
+"""Playable voicings of chord symbols, enumerated in every register as NumPy arrays.
+
+A chord quality (``jazz_common.chords``) is read as five chord degrees: root,
+3rd, 5th, 7th, and 9th, with the quality's own alterations and tensions taking
+those slots (``m7b5`` has a b5, ``7alt`` a #5 and b9, a named #11 or b13 and
+the 13th of ``13`` take the 5th's place, and a triad is played as a sixth
+chord); a 9 is added where the quality names no ninth, as rootless voicings
+add one. Each voicing type stacks degrees bottom to top:
+
+- ``shell``: root, 3rd, 7th (and root, 7th, 3rd)
+- ``rootless-a``: 3rd, 5th, 7th, 9th
+- ``rootless-b``: 7th, 9th, 3rd, 5th
+- ``drop-2`` / ``drop-3``: root, 3rd, 5th, 7th in close position, each
+  inversion, with the second / third voice from the top dropped an octave
+
+Every shape is tried on every bottom note in ``[low, high]`` for all roots at
+once, and candidates are kept when the top stays in range, the span fits one
+hand (``max_span``), and no interval between adjacent voices sits below its
+low-interval limit (no muddy thirds in the bass).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .chords import CHORD_TONES, normalize_quality
+
+VOICING_TYPES = ("shell", "rootless-a", "rootless-b", "drop-2", "drop-3")
+# Default range (MIDI): E2 to G5, and the widest span between bottom and top voice.
+LOW = 40
+HIGH = 79
+MAX_SPAN = 19
+# Lowest MIDI note the bottom of each interval (in semitones) may sit on; 12 and up are free.
+LOW_INTERVAL_LIMITS = np.array([128, 52, 51, 48, 46, 45, 47, 34, 43, 41, 41, 41] + [0] * 13, dtype=np.int16)
+DEGREE_LABELS = {
+    ("root", 0): "1",
+    ("third", 3): "b3", ("third", 4): "3", ("third", 5): "4",
+    ("fifth", 6): "b5", ("fifth", 7): "5", ("fifth", 8): "#5", ("fifth", 9): "13",
+    # A #11 or b13 named over a perfect fifth, in the 5th's place.
+    ("tension", 6): "#11", ("tension", 8): "b13",
+    ("seventh", 9): "6", ("seventh", 10): "b7", ("seventh", 11): "7",
+    ("ninth", 1): "b9", ("ninth", 2): "9", ("ninth", 3): "#9",
+}
+TEMPLATES = {
+    "shell": [("root", "third", "seventh"), ("root", "seventh", "third")],
+    "rootless-a": [("third", "fifth", "seventh", "ninth")],
+    "rootless-b": [("seventh", "ninth", "third", "fifth")],
+}
+CLOSE = ("root", "third", "fifth", "seventh")
+
+
+def chord_degrees(quality: str) -> dict:
+    """Semitones above the root of each degree slot (``root``, ``third``, ``fifth``, ``seventh``, ``ninth``)."""
+    tones = set(CHORD_TONES[normalize_quality(quality)])
+    third = next((tone for tone in (4, 3, 5) if tone in tones), 4)
+    seventh = next((tone for tone in (10, 11, 9) if tone in tones), 9)
+    # maj7(#11), 7(#11), 7(b13): the named tension stands in for the plain 5th.
+    tension = next((tone for tone in (6, 8) if tone in tones and 7 in tones), None)
+    fifth = tension or next((tone for tone in (7, 8, 6) if tone in tones), 9 if seventh != 9 else 7)
+    ninth = next((tone for tone in (2, 1, 3) if tone in tones and tone != third), 2)
+    return {"root": 0, "third": third, "fifth": fifth, "seventh": seventh, "ninth": ninth}
+
+
+def stack(pcs):
+    """Semitones above the first of ``pcs`` when each pitch class is placed just above the one before."""
+    offsets = [pcs[0]]
+    for pc in pcs[1:]:
+        offsets.append(offsets[-1] + ((pc - offsets[-1]) % 12 or 12))
+    return [offset - offsets[0] for offset in offsets]
+
+
+def _label(slot: str, semitones: int, degrees: dict, quality: str) -> str:
+    if slot == "seventh" and semitones == 9 and degrees["fifth"] == 6:
+        return "bb7"
+    if slot == "fifth" and 7 in CHORD_TONES[normalize_quality(quality)] and semitones != 7:
+        return DEGREE_LABELS["tension", semitones]
+    return DEGREE_LABELS[slot, semitones]
+
+
+@lru_cache(maxsize=None)
+def voicing_shapes(quality: str, types=VOICING_TYPES):
+    """``[(type, degree labels, bottom semitones above root, offsets above the bottom), ...]`` for ``quality``."""
+    degrees = chord_degrees(quality)
+    shapes = []
+    for voicing_type in types:
+        if voicing_type in TEMPLATES:
+            for slots in TEMPLATES[voicing_type]:
+                pcs = [degrees[slot] for slot in slots]
+                shapes.append((voicing_type, tuple(_label(slot, degrees[slot], degrees, quality) for slot in slots), pcs[0], tuple(stack(pcs))))
+            continue
+        drop = {"drop-2": 2, "drop-3": 3}[voicing_type]
+        for inversion in range(len(CLOSE)):
+            slots = CLOSE[inversion:] + CLOSE[:inversion]
+            close = stack([degrees[slot] for slot in slots])
+            voices = sorted(zip(close, slots))
+            offset, slot = voices[-drop]
+            voices[-drop] = (offset - 12, slot)
+            voices.sort()
+            bottom = voices[0][0]
+            shapes.append((
+                voicing_type,
+                tuple(_label(slot, degrees[slot], degrees, quality) for _offset, slot in voices),
+                degrees[voices[0][1]],
+                tuple(offset - bottom for offset, _slot in voices),
+            ))
+    return tuple(shapes)
+
+
+def enumerate_voicings(roots, quality: str, low: int = LOW, high: int = HIGH, max_span: int = MAX_SPAN, types=VOICING_TYPES):
+    """Every playable voicing of ``quality`` on each root pitch class in ``roots``.
+
+    Returns one ``(root_index, shape_index, notes)`` triple of arrays per voice
+    count (shells have three voices, the others four): a row per voicing, with
+    ``shape_index`` into ``voicing_shapes(quality, types)`` and ``notes`` the
+    MIDI numbers bottom to top.
+    """
+    shapes = voicing_shapes(quality, tuple(types))
+    roots = np.asarray(roots, dtype=np.int16)
+    midi = np.arange(low, high + 1, dtype=np.int16)
+    results = []
+    for size in sorted({len(offsets) for *_rest, offsets in shapes}):
+        index = np.array([i for i, (*_rest, offsets) in enumerate(shapes) if len(offsets) == size])
+        offsets = np.array([shapes[i][3] for i in index], dtype=np.int16)
+        bottoms = np.array([shapes[i][2] for i in index], dtype=np.int16)
+        # (shapes, bottom notes, voices), the same for every root.
+        notes = midi[None, :, None] + offsets[:, None, :]
+        playable = (notes[..., -1] <= high) & (offsets[:, None, -1] <= max_span)
+        playable &= (notes[..., :-1] >= LOW_INTERVAL_LIMITS[np.minimum(np.diff(notes, axis=-1), 24)]).all(axis=-1)
+        # (roots, shapes, bottom notes): the bottom note must be the shape's bottom degree over that root.
+        fits = (midi[None, None, :] - roots[:, None, None] - bottoms[None, :, None]) % 12 == 0
+        fits &= playable[None]
+        root_index, shape_row, bottom = np.nonzero(fits)
+        results.append((root_index, index[shape_row], notes[shape_row, bottom]))
+    return results
@@ -0,0 +1,141 @@
+"""Polling file watcher and chart fingerprints for the generators' ``--watch`` mode.
+
+Polling ``stat`` results keeps this dependency-free and portable. A chart's
+fingerprint hashes the data it is built from together with the source of the
+functions that build it, so after a module is reloaded only the charts whose
+inputs actually changed need to be rewritten and recompiled.
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from . import lilypond
+
+
+def module_paths(*module_names):
+    """Source files of the named (already imported) modules."""
+    return [Path(sys.modules[name].__file__).resolve() for name in module_names]
+
+
+def reload_modules(*module_names):
+    """Reload modules in order (dependencies first) and return the last one.
+
+    Cached bytecode is removed first: ``.pyc`` validation compares the source's
+    mtime in whole seconds and its size, so a same-length edit made within a
+    second of the previous import would otherwise load the stale code.
+    """
+    importlib.invalidate_caches()
+    module = None
+    for name in module_names:
+        module = importlib.import_module(name)
+        try:
+            os.unlink(importlib.util.cache_from_source(module.__file__))
+        except (OSError, NotImplementedError, ValueError):
+            pass
+        module = importlib.reload(module)
+    return module
+
+
+def fingerprint(*parts) -> str:
+    """SHA-256 over ``parts``: functions and modules by source code, anything else by ``repr``."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if inspect.isfunction(part) or inspect.ismodule(part):
+            text = inspect.getsource(part)
+        else:
+            text = repr(part)
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path) -> str | None:
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _snapshot(paths):
+    stats = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            stats[path] = None
+            continue
+        stats[path] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def watch(paths, on_change, interval: float = 0.2):
+    """Call ``on_change(changed_paths)`` whenever a watched file changes, until Ctrl-C.
+
+    Exceptions from ``on_change`` (e.g. a syntax error in a half-saved module)
+    are printed and watching continues, so the next save can fix them.
+    """
+    paths = [Path(path) for path in paths]
+    last = _snapshot(paths)
+    print("Watching " + ", ".join(str(path) for path in paths) + " (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(interval)
+            current = _snapshot(paths)
+            if current == last:
+                continue
+            changed = [path for path in paths if current[path] != last[path]]
+            last = current
+            try:
+                on_change(changed)
+            except Exception:
+                traceback.print_exc()
+            print("Watching for changes...", flush=True)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+def watch_charts(module_names, make_tasks, compile_options: dict, interval: float = 0.2, extra_paths=()):
+    """The generators' ``--watch`` loop: rebuild only the charts an edit affects.
+
+    ``make_tasks(module)`` returns the chart list of the (re)loaded last module in
+    ``module_names`` as ``(ly_path, inputs, write, want_pdf, want_midi)`` tuples.
+    On each change the modules are reloaded; charts whose ``inputs`` fingerprint
+    moved are rewritten, and of those only the ones whose ``.ly`` bytes changed
+    are recompiled. ``extra_paths`` (e.g. data files the modules load) are
+    watched alongside the module sources.
+    """
+    module = importlib.import_module(module_names[-1])
+    state = {str(path): (fingerprint(*inputs), file_digest(path)) for path, inputs, *_rest in make_tasks(module)}
+
+    def rebuild(changed):
+        start = time.perf_counter()
+        print("Changed: " + ", ".join(path.name for path in changed), flush=True)
+        module = reload_modules(*module_names)
+        jobs = []
+        rewritten = 0
+        for path, inputs, write, want_pdf, want_midi in make_tasks(module):
+            key = fingerprint(*inputs)
+            previous = state.get(str(path))
+            if previous and previous[0] == key:
+                continue
+            write()
+            rewritten += 1
+            digest = file_digest(path)
+            if (not previous or previous[1] != digest) and (want_pdf or want_midi):
+                jobs.append((Path(path), want_pdf, want_midi))
+            state[str(path)] = (key, digest)
+        if jobs:
+            results = lilypond.compile_many(jobs, on_event=lilypond.print_progress, **compile_options)
+            for result in results:
+                if not (result["pdf_ok"] or result["midi_ok"]) and result["stderr_tail"]:
+                    print("  " + "\n  ".join(result["stderr_tail"].splitlines()))
+        print(f"Rewrote {rewritten} chart(s), compiled {len(jobs)} in {time.perf_counter() - start:.2f}s", flush=True)
+
+    watch(module_paths(*module_names) + [Path(path) for path in extra_paths], rebuild, interval)
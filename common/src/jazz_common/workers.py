@@ -0,0 +1,66 @@
+"""Process pools whose workers start warm: forked from a server that already imported abjad and the data.
+
+Building abjad scores is pure Python and holds the GIL, so writing many
+``.ly`` files in parallel needs processes; but a freshly spawned worker would
+import abjad and load the catalogue again before its first chart. ``warm_pool``
+uses the ``forkserver`` start method with ``preload`` modules: the server
+process imports them once, and every worker is forked from it with those
+modules already in memory. Where ``forkserver`` is unavailable (Windows), it
+falls back to ``spawn`` and imports ``preload`` in each worker instead.
+
+Jobs are picklable calls, usually the ``functools.partial`` writers a
+generator's ``chart_tasks`` already builds; ``run_calls`` maps them across the
+pool and returns their results in order. ``preload`` should list the modules
+an entry point imports as well as the entry point itself: run as ``python -m``,
+the entry module is re-executed in each worker, cheaply once its imports are
+warm.
+"""
+
+import importlib
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+def entry_module():
+    """Name of the module run as ``__main__`` (``python -m package.module``), or ``None``."""
+    return getattr(getattr(sys.modules["__main__"], "__spec__", None), "name", None)
+
+
+def _preload(modules, initializer, initargs):
+    for module_name in modules:
+        importlib.import_module(module_name)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def warm_pool(workers: int | None, preload, initializer=None, initargs=()) -> ProcessPoolExecutor:
+    """A ``ProcessPoolExecutor`` of ``workers`` (default: CPU count) forked with ``preload`` already imported.
+
+    ``initializer(*initargs)`` runs once in each worker, e.g. to install the
+    parent's catalogue over the preloaded default.
+    """
+    workers = workers or os.cpu_count() or 1
+    # multiprocessing re-runs the ``__main__`` module in every worker (as
+    # ``__mp_main__``) whatever the server preloaded, so preloading it too would
+    # only run it twice; its imports are what preloading saves.
+    preload = [module_name for module_name in preload if module_name != entry_module()]
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Takes effect when the server starts, i.e. for the first pool of the process.
+        context.set_forkserver_preload(preload)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs)
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_preload, initargs=(tuple(preload), initializer, initargs))
+
+
+def _call(call):
+    return call()
+
+
+def run_calls(calls, workers: int | None, preload, initializer=None, initargs=()):
+    """Results of the zero-argument ``calls``, run across a ``warm_pool``, in order."""
+    workers = min(workers or os.cpu_count() or 1, len(calls)) or 1
+    with warm_pool(workers, preload, initializer, initargs) as pool:
+        return list(pool.map(_call, calls))
@@ -1,11 +1,18 @@
 """Generate first-pass annotated jazz blues studies for Bb, F, and C."""
 
 import argparse
+import inspect
+import time
+from functools import partial
 from pathlib import Path
 
 import abjad
 
-from jazz_common.lilypond import compile_with_lilypond
+from jazz_common.forms import JAZZ_BLUES_FORM
+from jazz_common.lilypond import compile_many, compile_with_lilypond, print_progress, write_ly_incrementally
+from jazz_common.profile import profiled, span
+from jazz_common.watch import watch_charts
+from jazz_common.workers import run_calls
 from jazz_common.pitch import (
     NAME_TO_PC,
     auto_prefer_for_pc,
@@ -15,21 +22,10 @@ from jazz_common.pitch import (
 )
 
 TITLE_BASE = "Jazz Blues Studies in {key}"
-
-JAZZ_BLUES_FORM = [
-    [(0, "7", "I7")],
-    [(5, "7", "IV7")],
-    [(0, "7", "I7")],
-    [(9, "7", "VI7")],
-    [(2, "m7", "ii7")],
-    [(7, "7", "V7")],
-    [(0, "7", "I7")],
-    [(9, "7", "VI7")],
-    [(2, "m7", "ii7")],
-    [(7, "7", "V7")],
-    [(0, "7", "I7"), (9, "7", "VI7")],
-    [(2, "m7", "ii7"), (7, "7", "V7")],
-]
+# Reloaded (in this order) when --watch sees an edit to any of their sources.
+WATCH_MODULES = ("jazz_common.pitch", "jazz_common.forms", "jazz_common.lilypond", "jazz_blues.guide_tones", "jazz_blues.blues_take_1")
+# Imported once by the forkserver that --workers processes are forked from.
+WORKER_PRELOAD = ("abjad", "jazz_common.forms", "jazz_common.lilypond", "jazz_blues.blues_take_1")
 
 CHORUSES = [
     {
@@ -250,7 +246,15 @@ def build_blues_score(key_name: str, chorus: dict, bpm: int = 112):
     return score, pc_to_name(key_pc, prefer_names)
 
 
-def write_blues_lilypond(scores, title: str, outfile: str, make_pdf: bool = False, author: str | None = None, license_text: str | None = None, midi: bool = False):
+def iter_blues_scores(key_name: str, choruses, bpm: int):
+    """Yield ``(chorus name, score, footnotes)`` for each chorus, built on demand."""
+    for chorus in choruses:
+        with span("build_blues_score", chorus=chorus["name"]):
+            score, _printable_key = build_blues_score(key_name, chorus, bpm=bpm)
+        yield chorus["name"], score, chorus.get("footnotes", [])
+
+
+def write_blues_lilypond(scores, title: str, outfile: str, make_pdf: bool = False, author: str | None = None, license_text: str | None = None, midi: bool = False, compile_now: bool = True):
     header_items = [rf'title = \markup {{ \bold "{title}" }}']
     if author:
         header_items.append(rf'composer = "{author}"')
@@ -270,22 +274,25 @@ def write_blues_lilypond(scores, title: str, outfile: str, make_pdf: bool = Fals
         ],
     )
 
-    items = [header, paper]
-    for index, (chorus_name, score, footnotes) in enumerate(scores):
-        if index:
-            items.append(r"\pageBreak")
-        items.append(abjad.Block("markup", items=[rf'\fill-line {{ \fontsize #2 \bold "{chorus_name}" }}']))
-        layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0"])
-        score_block = abjad.Block("score", items=[score, layout_block])
-        if midi:
-            score_block.items.append(abjad.Block("midi"))
-        items.append(score_block)
-        if footnotes:
-            lines = [rf'"[{index}] {text}"' for index, (_bar_number, text) in enumerate(footnotes, start=1)]
-            items.append(abjad.Block("markup", items=[r"\column {", *lines, "}"]))
-
-    lily = abjad.LilyPondFile(items=items)
-    abjad.persist.as_ly(lily, outfile)
+    def items():
+        yield header
+        yield paper
+        for index, (chorus_name, score, footnotes) in enumerate(scores):
+            if index:
+                yield r"\pageBreak"
+            yield abjad.Block("markup", items=[rf'\fill-line {{ \fontsize #2 \bold "{chorus_name}" }}'])
+            layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0"])
+            score_block = abjad.Block("score", items=[score, layout_block])
+            if midi:
+                score_block.items.append(abjad.Block("midi"))
+            yield score_block
+            if footnotes:
+                lines = [rf'"[{index}] {text}"' for index, (_bar_number, text) in enumerate(footnotes, start=1)]
+                yield abjad.Block("markup", items=[r"\column {", *lines, "}"])
+
+    # ``scores`` may be a generator, so each chorus is built, formatted, and flushed in turn.
+    with span("write_ly_incrementally"):
+        write_ly_incrementally(items(), outfile)
 
     result = {
         "ly_path": str(outfile),
@@ -297,48 +304,133 @@ def write_blues_lilypond(scores, title: str, outfile: str, make_pdf: bool = Fals
         "stdout_tail": "",
         "stderr_tail": "",
     }
-    if make_pdf or midi:
+    # Batch callers pass compile_now=False and compile later (``midi`` still adds the \midi block).
+    if compile_now and (make_pdf or midi):
         result.update(compile_with_lilypond(Path(outfile), want_pdf=make_pdf, want_midi=midi))
     return result
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Generate first-pass annotated jazz blues studies.")
-    ap.add_argument("--keys", nargs="+", default=["Bb", "F", "C"], help="Keys to generate (default: Bb F C).")
-    ap.add_argument("--output-dir", type=Path, default=Path("build/blues"), help="Directory for generated outputs (default: build/blues).")
-    ap.add_argument("--pdf", action="store_true", help="Compile a PDF for each study (runs lilypond).")
-    ap.add_argument("--midi", action="store_true", help="Also produce a .midi for each study (runs lilypond).")
-    ap.add_argument("--bpm", type=int, default=112, help="Tempo in quarter-notes per minute (default 112).")
-    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Author/composer name printed under the title.")
-    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="License text printed in the footer (copyright field).")
-    args = ap.parse_args()
+def study_choruses(args):
+    """``CHORUSES``, or ``--generate N`` choruses from the guide-tone solver (the same for every key)."""
+    if not args.generate:
+        return CHORUSES
+    # Imported here so the hand-written studies never pay for NumPy.
+    from .guide_tones import generate_choruses
 
-    args.output_dir.mkdir(parents=True, exist_ok=True)
-    results = []
-    for key_name in args.keys:
-        if key_name not in NAME_TO_PC:
-            raise SystemExit(f"Unknown key: {key_name}")
-        scores = []
-        printable_key = None
-        for chorus in CHORUSES:
-            score, printable_key = build_blues_score(key_name, chorus, bpm=args.bpm)
-            scores.append((chorus["name"], score, chorus.get("footnotes", [])))
+    with span("generate_choruses"):
+        return generate_choruses(args.generate, args.seed)
+
+
+def write_key_study(args, key_name: str, outfile: Path, choruses=CHORUSES):
+    with span(f"key {key_name}", cat="key"):
+        key_pc = NAME_TO_PC[key_name]
+        printable_key = pc_to_name(key_pc, auto_prefer_for_pc(key_pc))
+        scores = iter_blues_scores(key_name, choruses, args.bpm)
         title = TITLE_BASE.format(key=printable_key)
-        outfile = args.output_dir / f"blues_take_1_{sanitize_key_for_filename(printable_key)}.ly"
-        result = write_blues_lilypond(
+        return write_blues_lilypond(
             scores,
             title,
             str(outfile),
-            make_pdf=args.pdf,
             author=args.author,
             license_text=args.license,
             midi=args.midi,
+            compile_now=False,
         )
-        results.append(result)
+
+
+def chart_tasks(args):
+    """Every study this run writes, as ``(ly_path, inputs, write, want_pdf, want_midi)``.
+
+    ``inputs`` lists the data, settings, and functions a study is built from;
+    ``--watch`` fingerprints it to find the studies an edit affects.
+    """
+    choruses = study_choruses(args)
+    shared = (
+        inspect.getmodule(pc_to_name), write_ly_incrementally,
+        duration_to_lily, transpose_pitch_name, transpose_component, make_rh_bar, degree_pc, chord_symbol,
+        make_chord_symbol_bar, attach_footnote_marker, build_blues_score, iter_blues_scores, write_blues_lilypond,
+        TITLE_BASE, JAZZ_BLUES_FORM, choruses, args.bpm, args.author, args.license, args.midi,
+    )
+    tasks = []
+    for key_name in args.keys:
+        key_pc = NAME_TO_PC[key_name]
+        printable_key = pc_to_name(key_pc, auto_prefer_for_pc(key_pc))
+        outfile = args.output_dir / f"blues_take_1_{sanitize_key_for_filename(printable_key)}.ly"
+        tasks.append((outfile, (*shared, key_name), partial(write_key_study, args, key_name, outfile, choruses), args.pdf, args.midi))
+    return tasks
+
+
+def compile_options(args):
+    return {
+        "concurrency": args.jobs,
+        "timeout": args.timeout,
+        "memory_limit_mb": args.memory_limit,
+        "retries": args.retries,
+    }
+
+
+def write_studies(args, tasks):
+    """Each task's result dict, in order: written here, or across ``--workers`` processes forked warm."""
+    writes = [write for _path, _inputs, write, _want_pdf, _want_midi in tasks]
+    if args.workers > 1 and len(writes) > 1:
+        return run_calls(writes, args.workers, WORKER_PRELOAD)
+    return [write() for write in writes]
+
+
+def run(args):
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with span("write studies", workers=args.workers):
+        results = write_studies(args, chart_tasks(args))
+    elapsed = time.perf_counter() - start
 
     print("Wrote blues study files:")
     for result in results:
         print("  ", result["ly_path"])
+    rate = len(results) / elapsed if elapsed else 0.0
+    print(f"Wrote {len(results)} .ly file(s) in {elapsed:.2f}s with {args.workers} worker(s) ({rate:.1f}/s)")
+
+    if args.pdf or args.midi:
+        print(f"\nCompiling {len(results)} file(s) with lilypond:")
+        compiled = compile_many(
+            [(Path(result["ly_path"]), args.pdf, args.midi) for result in results],
+            on_event=print_progress,
+            **compile_options(args),
+        )
+        for result, res in zip(results, compiled):
+            result.update(res)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate first-pass annotated jazz blues studies.")
+    ap.add_argument("--keys", nargs="+", default=["Bb", "F", "C"], help="Keys to generate (default: Bb F C).")
+    ap.add_argument("--output-dir", type=Path, default=Path("build/blues"), help="Directory for generated outputs (default: build/blues).")
+    ap.add_argument("--pdf", action="store_true", help="Compile a PDF for each study (runs lilypond).")
+    ap.add_argument("--midi", action="store_true", help="Also produce a .midi for each study (runs lilypond).")
+    ap.add_argument("--bpm", type=int, default=112, help="Tempo in quarter-notes per minute (default 112).")
+    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Author/composer name printed under the title.")
+    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="License text printed in the footer (copyright field).")
+    ap.add_argument("--generate", type=int, default=0, metavar="N", help="Engrave N choruses from the guide-tone line solver instead of the hand-written ones.")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed for --generate; the same seed gives the same choruses (default 0).")
+    ap.add_argument("--workers", type=int, default=1, help="Processes building studies (one per key) and writing .ly files, forked from a server with abjad and CHORUSES preloaded (default 1: in this process).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--timeout", type=float, default=None, help="Kill a lilypond run after this many seconds (default: no limit).")
+    ap.add_argument("--memory-limit", type=int, default=None, metavar="MB", help="Address-space cap per lilypond process in MB (POSIX only; default: none).")
+    ap.add_argument("--retries", type=int, default=1, help="Retries for a lilypond run that crashes on a signal or fails to start (default 1).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    ap.add_argument("--watch", action="store_true", help="After building, poll the module sources and rebuild only the studies an edit affects (Ctrl-C to stop).")
+    args = ap.parse_args(argv)
+
+    for key_name in args.keys:
+        if key_name not in NAME_TO_PC:
+            raise SystemExit(f"Unknown key: {key_name}")
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+
+    with profiled(args.profile, "jazz_blues.blues_take_1"):
+        run(args)
+    if args.watch:
+        watch_charts(WATCH_MODULES, lambda module: module.chart_tasks(args), compile_options(args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+"""Generate eighth-note blues choruses with a dynamic-programming line solver.
+
+A chorus is one pitch per eighth-note slot (12 bars x 8 over
+``JAZZ_BLUES_FORM``, in C like the hand-written ``CHORUSES``). Each slot scores
+every pitch in range: chord tones on the beat, guide tones (3rd and 7th) where
+a chord arrives, chord-scale tones between, and a pull toward the middle of the
+range. Each move between slots scores the interval: steps over leaps, no
+repeated notes, a guide tone resolving by step to the next chord's guide tone,
+and a chromatic passing note resolving by half step onto a chord tone. Viterbi
+finds the best line under these scores. Random noise added to the slot scores
+makes every chorus different and reproducible from its seed, and a whole batch
+is solved at once as ``(choruses, pitches, pitches)`` NumPy arrays.
+
+Choruses come out as ``{"name", "footnotes", "bars"}`` dicts with LilyPond
+templates in C, the format of ``blues_take_1.CHORUSES``, so the transposition,
+footnote, and engraving code there takes them unchanged.
+"""
+
+import argparse
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import abjad
+import numpy as np
+
+from jazz_common.chords import CHORD_TONES
+from jazz_common.forms import FORMS, JAZZ_BLUES_FORM
+from jazz_common.profile import profiled, span
+
+SLOTS_PER_BAR = 8
+# Written range in C (abjad pitch numbers, middle C = 0): a to f''.
+LOW = -3
+HIGH = 17
+# Chord-scale tones above the root for the qualities in jazz_common.forms.
+CHORD_SCALES = {
+    "7": (0, 2, 4, 5, 7, 9, 10),
+    "m7": (0, 2, 3, 5, 7, 9, 10),
+    "maj7": (0, 2, 4, 5, 7, 9, 11),
+    "m7b5": (0, 1, 3, 5, 6, 8, 10),
+    "dim7": (0, 2, 3, 5, 6, 8, 9, 11),
+    "m(maj7)": (0, 2, 3, 5, 7, 9, 11),
+    "m6": (0, 2, 3, 5, 7, 9, 11),
+    "7alt": (0, 1, 3, 4, 6, 8, 10),
+    "7(b9)": (0, 1, 3, 4, 6, 7, 9, 10),
+}
+# Slot (emission) scores.
+CHORD_TONE_STRONG = 2.0
+CHORD_TONE_WEAK = 0.5
+GUIDE_TONE_ARRIVAL = 3.0
+CHROMATIC_STRONG = -4.0
+CHROMATIC_WEAK = -2.0
+RANGE_WEIGHT = 0.02
+# Move (transition) scores.
+STEP = 1.0
+REPEAT = -2.0
+LEAP_WEIGHT = 0.5
+MAX_LEAP = 12
+FORBIDDEN = -1e3
+GUIDE_TONE_RESOLUTION = 2.5
+CHROMATIC_RESOLUTION = 2.0
+# Gumbel noise scale: higher gives freer, less predictable lines.
+TEMPERATURE = 1.0
+MAX_FOOTNOTES = 4
+DEGREE_NAMES = {3: "3rd", 4: "3rd", 9: "6th", 10: "7th", 11: "7th"}
+
+
+def guide_tones(quality: str):
+    """Pitch classes above the root of the 3rd and 7th (6th for sixth chords)."""
+    tones = CHORD_TONES[quality]
+    # The major 3rd first: 7alt and 7(#9) also hold a 3 (the #9), and no minor quality holds a 4.
+    third = next((tone for tone in (4, 3) if tone in tones), 4)
+    seventh = next((tone for tone in (10, 11, 9) if tone in tones), 10)
+    return third, seventh
+
+
+def slot_chords(form):
+    """``(root pc, quality, roman)`` sounding at each eighth-note slot; each bar splits evenly."""
+    return [events[slot * len(events) // SLOTS_PER_BAR] for events in form for slot in range(SLOTS_PER_BAR)]
+
+
+def _pc_mask(root: int, intervals) -> np.ndarray:
+    mask = np.zeros(12, dtype=bool)
+    mask[[(root + interval) % 12 for interval in intervals]] = True
+    return mask
+
+
+@lru_cache(maxsize=None)
+def score_tables(form_key, low: int = LOW, high: int = HIGH):
+    """``(slot scores (T, P), move scores (T, P, P), chords)`` for a form given as nested tuples."""
+    chords = slot_chords(form_key)
+    pitches = np.arange(low, high + 1)
+    pcs = pitches % 12
+    center = (low + high) / 2
+    n = len(chords)
+    emission = np.empty((n, len(pitches)), dtype=np.float32)
+    moves = np.empty((n, len(pitches), len(pitches)), dtype=np.float32)
+
+    interval = np.abs(pitches[None, :] - pitches[:, None])
+    base_move = np.where(interval <= 2, STEP, -LEAP_WEIGHT * np.maximum(interval - 4, 0)).astype(np.float32)
+    base_move[interval == 0] = REPEAT
+    base_move[interval > MAX_LEAP] = FORBIDDEN
+
+    previous = None
+    for t, (root, quality, _roman) in enumerate(chords):
+        chord = _pc_mask(root, CHORD_TONES[quality])[pcs]
+        scale = _pc_mask(root, CHORD_SCALES.get(quality, CHORD_TONES[quality]))[pcs]
+        guides = _pc_mask(root, guide_tones(quality))[pcs]
+        strong = t % 2 == 0
+        arrival = t == 0 or (root, quality) != previous[:2]
+        row = np.where(chord, CHORD_TONE_STRONG if strong else CHORD_TONE_WEAK, 0.0)
+        row = np.where(scale | chord, row, CHROMATIC_STRONG if strong else CHROMATIC_WEAK)
+        if arrival:
+            row = row + np.where(guides, GUIDE_TONE_ARRIVAL, 0.0)
+        emission[t] = row - RANGE_WEIGHT * (pitches - center) ** 2
+
+        move = base_move.copy()
+        if t and arrival:
+            prev_root, prev_quality, _ = previous
+            prev_guides = _pc_mask(prev_root, guide_tones(prev_quality))[pcs]
+            move += np.where(prev_guides[:, None] & guides[None, :] & (interval <= 2), GUIDE_TONE_RESOLUTION, 0.0).astype(np.float32)
+        if t and strong:
+            prev_root, prev_quality, _ = previous
+            prev_scale = _pc_mask(prev_root, CHORD_SCALES.get(prev_quality, CHORD_TONES[prev_quality]))[pcs]
+            move += np.where(~prev_scale[:, None] & chord[None, :] & (interval == 1), CHROMATIC_RESOLUTION, 0.0).astype(np.float32)
+        moves[t] = move
+        previous = (root, quality, _roman)
+    return emission, moves, chords
+
+
+def form_key(form):
+    return tuple(tuple(tuple(event) for event in bar) for bar in form)
+
+
+def solve_lines(form, count: int, seed: int = 0, low: int = LOW, high: int = HIGH, temperature: float = TEMPERATURE) -> np.ndarray:
+    """``count`` best lines (``(count, slots)`` abjad pitch numbers) under per-chorus noise from ``seed``."""
+    emission, moves, _chords = score_tables(form_key(form), low, high)
+    rng = np.random.default_rng(seed)
+    noisy = emission[None] + temperature * rng.gumbel(size=(count, *emission.shape)).astype(np.float32)
+    slots, size = emission.shape
+    back = np.empty((count, slots, size), dtype=np.int8)
+    score = noisy[:, 0]
+    for t in range(1, slots):
+        candidates = score[:, :, None] + moves[t][None]
+        back[:, t] = candidates.argmax(axis=1)
+        score = candidates.max(axis=1) + noisy[:, t]
+    path = np.empty((count, slots), dtype=np.intp)
+    path[:, -1] = score.argmax(axis=1)
+    rows = np.arange(count)
+    for t in range(slots - 1, 0, -1):
+        path[:, t - 1] = back[rows, t, path[:, t]]
+    return path + low
+
+
+@lru_cache(maxsize=None)
+def lily_name(number: int) -> str:
+    """LilyPond name in C for a pitch number, flats for the black keys (``bf'``)."""
+    return abjad.NamedPitch(number).respell("flats").name()
+
+
+def footnotes_for_line(line, chords):
+    """Up to ``MAX_FOOTNOTES`` notes on guide tones resolving by step into a new chord, spread over the chorus."""
+    found = []
+    for t in range(1, len(line)):
+        root, quality, roman = chords[t]
+        prev_root, prev_quality, prev_roman = chords[t - 1]
+        if (root, quality) == (prev_root, prev_quality):
+            continue
+        before = (int(line[t - 1]) - prev_root) % 12
+        after = (int(line[t]) - root) % 12
+        if before in guide_tones(prev_quality) and after in guide_tones(quality) and abs(int(line[t]) - int(line[t - 1])) <= 2:
+            text = f"Guide tones: the {DEGREE_NAMES.get(before, before)} of {prev_roman} moves by step to the {DEGREE_NAMES.get(after, after)} of {roman}."
+            found.append((t // SLOTS_PER_BAR + 1, text))
+    if len(found) > MAX_FOOTNOTES:
+        picks = np.linspace(0, len(found) - 1, MAX_FOOTNOTES).round().astype(int)
+        found = [found[i] for i in sorted(set(picks.tolist()))]
+    return found
+
+
+def generate_choruses(count: int, seed: int = 0, form=JAZZ_BLUES_FORM, low: int = LOW, high: int = HIGH, temperature: float = TEMPERATURE):
+    """``count`` choruses as ``{"name", "footnotes", "bars"}`` templates in C; the same seed gives the same choruses."""
+    lines = solve_lines(form, count, seed, low, high, temperature)
+    _emission, _moves, chords = score_tables(form_key(form), low, high)
+    choruses = []
+    for index, line in enumerate(lines, start=1):
+        names = [lily_name(number) + "8" for number in line.tolist()]
+        bars = [" ".join(names[start:start + SLOTS_PER_BAR]) for start in range(0, len(names), SLOTS_PER_BAR)]
+        choruses.append({
+            "name": f"Generated Chorus {index} (seed {seed})",
+            "footnotes": footnotes_for_line(line, chords),
+            "bars": bars,
+        })
+    return choruses
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate eighth-note choruses over a form as JSON templates for blues_take_1.")
+    ap.add_argument("--count", type=int, default=100, help="Choruses to generate (default 100).")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same choruses (default 0).")
+    ap.add_argument("--form", choices=list(FORMS), default="jazz-blues", help="Form from jazz_common.forms (default jazz-blues).")
+    ap.add_argument("--temperature", type=float, default=TEMPERATURE, help=f"Noise scale; higher is freer (default {TEMPERATURE}).")
+    ap.add_argument("--output", type=Path, default=Path("build/blues/choruses.json"), help="JSON file to write (default: build/blues/choruses.json).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    with profiled(args.profile, "jazz_blues.guide_tones"):
+        start = time.perf_counter()
+        with span("generate_choruses"):
+            choruses = generate_choruses(args.count, args.seed, FORMS[args.form], temperature=args.temperature)
+        elapsed = time.perf_counter() - start
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with span("write json"):
+            args.output.write_text(json.dumps(choruses, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Generated {len(choruses)} choruses in {elapsed:.3f}s ({len(choruses) / elapsed:.0f}/s)")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
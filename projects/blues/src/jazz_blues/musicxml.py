@@ -0,0 +1,153 @@
+"""Export the blues choruses in every study key as MusicXML, streamed without building abjad scores.
+
+Each (key, chorus) is a score of twelve measures: the right-hand line
+transposed and spelled as ``blues_take_1`` prints it, the form's chord symbols
+as ``<harmony>`` elements, and the footnote markers below their bars (the
+footnote texts go in the score's identification). The chorus templates are
+read with a small tokenizer for the LilyPond they use (notes, ``<...>``
+chords, rests, and ``\\tuplet`` groups), so nothing is parsed by abjad.
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from jazz_common.forms import JAZZ_BLUES_FORM
+from jazz_common.musicxml import (
+    FORMATS,
+    MEASURE_DIVISIONS,
+    NOTE_TYPES,
+    SCORE_FOOTER,
+    ScoreFiles,
+    attributes_xml,
+    beam_runs,
+    key_fifths,
+    measure_xml,
+    score_header,
+    tempo_xml,
+    words_xml,
+)
+from jazz_common.pitch import LETTER_TO_PC, NAME_TO_PC, auto_prefer_for_pc, pc_to_name, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+
+from .blues_take_1 import TITLE_BASE, chord_symbol, study_choruses
+
+TOKEN = re.compile(r"\\tuplet\s+(\d+)/(\d+)\s*\{|(\})|<([^>]*)>(\d+)|(r|[a-g](?:ss|ff|s|f)?[',]*)(\d+)|(\S+)")
+ACCIDENTALS = {"": 0, "s": 1, "f": -1, "ss": 2, "ff": -2}
+PITCH = re.compile(r"([a-g])(ss|ff|s|f)?([',]*)$")
+
+
+def lily_number(name: str) -> int:
+    """Abjad pitch number of a LilyPond pitch in ``\\language "english"`` (``"bf'"`` -> ``-2``)."""
+    match = PITCH.match(name)
+    if match is None:
+        raise ValueError(f"Unsupported pitch in chorus template: {name!r}")
+    letter, accidental, marks = match.groups()
+    return LETTER_TO_PC[letter.upper()] + ACCIDENTALS[accidental or ""] + 12 * (marks.count("'") - marks.count(",") - 1)
+
+
+def template_notes(template: str, semitone_offset: int = 0):
+    """Note dicts (``jazz_common.musicxml``) for one bar template, transposed up ``semitone_offset``."""
+    notes, tuplet, group = [], None, []
+    for match in TOKEN.finditer(template):
+        actual, normal, close, chord, chord_duration, name, duration, other = match.groups()
+        if actual:
+            tuplet, group = (int(actual), int(normal)), []
+            continue
+        if close:
+            if group:
+                group[0]["tuplet"], group[-1]["tuplet"] = "start", "stop"
+            tuplet = None
+            continue
+        if other:
+            raise ValueError(f"Unsupported LilyPond in chorus template: {other!r}")
+        if chord:
+            pitches, duration = [lily_number(part) + semitone_offset for part in chord.split()], chord_duration
+        else:
+            pitches = [] if name == "r" else [lily_number(name) + semitone_offset]
+        if int(duration) not in (1, 2, 4, 8):
+            raise ValueError(f"Unsupported duration in chorus template: {duration!r}")
+        divisions = MEASURE_DIVISIONS // int(duration)
+        note = {"pitches": pitches, "divisions": divisions, "type": NOTE_TYPES[divisions]}
+        if tuplet:
+            note["divisions"] = divisions * tuplet[1] // tuplet[0]
+            note["time_modification"] = tuplet
+            group.append(note)
+        notes.append(note)
+    # Beamed by the half bar, as LilyPond beams 4/4 eighths.
+    return beam_runs(notes, MEASURE_DIVISIONS // 2)
+
+
+def bar_harmonies(events, key_pc: int, prefer: str):
+    """``(offset, chord symbol)`` for a form bar's events, the bar split evenly between them."""
+    return [(index * MEASURE_DIVISIONS // len(events), chord_symbol(key_pc, offset, quality, prefer)) for index, (offset, quality, _roman) in enumerate(events)]
+
+
+def write_chorus(f, key_name: str, chorus: dict, args):
+    key_pc = NAME_TO_PC[key_name]
+    prefer = auto_prefer_for_pc(key_pc)
+    footnotes = chorus.get("footnotes", [])
+    markers = {bar_number: index for index, (bar_number, _text) in enumerate(footnotes, start=1)}
+    title = f"{TITLE_BASE.format(key=pc_to_name(key_pc, prefer))}: {chorus['name']}"
+    miscellaneous = [(f"footnote-{index}", f"[{index}] {text}") for index, (_bar_number, text) in enumerate(footnotes, start=1)]
+    f.write(score_header(title, args.author, args.license, part_name="Right Hand", miscellaneous=miscellaneous))
+    for index, template in enumerate(chorus["bars"]):
+        directions = []
+        attributes = ""
+        if index == 0:
+            attributes = attributes_xml(key_fifths(key_pc, prefer))
+            directions.append((0, words_xml(chorus["name"])))
+            if args.bpm:
+                directions.append((0, tempo_xml(args.bpm)))
+        marker = markers.get(index + 1)
+        if marker is not None:
+            directions.append((0, words_xml(f"[{marker}]", placement="below")))
+        harmonies = bar_harmonies(JAZZ_BLUES_FORM[index], key_pc, prefer)
+        notes = template_notes(template, key_pc)
+        f.write(measure_xml(index + 1, notes, prefer, attributes, directions, harmonies, new_system=index > 0 and index % 4 == 0))
+    f.write(SCORE_FOOTER)
+
+
+def export(args, choruses) -> int:
+    """Write every chorus in every ``--keys`` key to ``args.output``; returns the score count."""
+    count = 0
+    with ScoreFiles(args.output, args.format) as files:
+        for key_name in args.keys:
+            with span(f"key {key_name}", cat="key"):
+                for index, chorus in enumerate(choruses, start=1):
+                    with files.open(f"jazz_blues_{sanitize_key_for_filename(key_name)}_{index:03d}") as f:
+                        write_chorus(f, key_name, chorus, args)
+                    count += 1
+    return count
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export the blues choruses in each key as MusicXML (a .musicxml or .mxl file per chorus, or one .zip of them).")
+    ap.add_argument("--keys", nargs="+", default=["Bb", "F", "C"], help="Keys to export (default: Bb F C).")
+    ap.add_argument("--format", choices=FORMATS, default="xml", help="xml / mxl: a .musicxml / compressed .mxl file per chorus in --output; zip: one .zip of .mxl files at --output (default xml).")
+    ap.add_argument("--output", type=Path, default=None, help="Directory (xml, mxl) or archive (zip) to write (default: build/blues/musicxml, build/blues/mxl or build/blues/jazz_blues_mxl.zip).")
+    ap.add_argument("--bpm", type=int, default=112, help="Tempo marked on each chorus in quarter-notes per minute; 0 for none (default 112).")
+    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Composer recorded in each score.")
+    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="Rights recorded in each score.")
+    ap.add_argument("--generate", type=int, default=0, metavar="N", help="Export N choruses from the guide-tone line solver instead of the hand-written ones.")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed for --generate; the same seed gives the same choruses (default 0).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    unknown = [key for key in args.keys if key not in NAME_TO_PC]
+    if unknown:
+        raise SystemExit(f"Unknown key(s): {', '.join(unknown)}")
+    if args.output is None:
+        args.output = {"xml": Path("build/blues/musicxml"), "mxl": Path("build/blues/mxl"), "zip": Path("build/blues/jazz_blues_mxl.zip")}[args.format]
+
+    with profiled(args.profile, "jazz_blues.musicxml"):
+        start = time.perf_counter()
+        choruses = study_choruses(args)
+        count = export(args, choruses)
+        elapsed = time.perf_counter() - start
+    print(f"Wrote {args.output} ({count} choruses, {len(args.keys)} keys) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,10 +25,13 @@ python -m jazz_scales.generator \
   --pdf --midi --bpm 96
 
 bash "$ROOT_DIR/src/jazz_scales/render_wavs.sh" "$BUILD_DIR" "$BUILD_DIR"
-
-MPLCONFIGDIR="$ROOT_DIR/.matplotlib" MPLBACKEND=Agg \
-  python -m jazz_scales.cover --output-dir "$BUILD_DIR"
-
-python -m jazz_scales.book --output-dir "$BUILD_DIR"
+python -m jazz_scales.audio --input-dir "$BUILD_DIR"
+python -m jazz_scales.musicxml --format zip --bpm 96 --output "$BUILD_DIR/jazz_scales_mxl.zip"
+python -m jazz_scales.voicings --output-dir "$BUILD_DIR"
+
+# Pin the cover date to the last commit so rebuilds of the same tree are identical.
+# Cover and book run as one `jazz` process.
+SOURCE_DATE_EPOCH="${SOURCE_DATE_EPOCH:-$(git -C "$ROOT_DIR" log -1 --format=%ct 2>/dev/null || date +%s)}" \
+  jazz cover --output-dir "$BUILD_DIR" + book --output-dir "$BUILD_DIR"
 
 echo "Build complete in $BUILD_DIR"
@@ -0,0 +1,278 @@
+"""Post-process rendered WAVs: trim the release tail, level the set, write waveform peaks.
+
+``render_wavs.sh`` leaves each key with FluidSynth's long silent release and
+its own level. This stage runs after it, in two passes over memory-mapped
+samples, one worker process per file:
+
+1. analyze: the last frame above ``--silence-db``, the peak, and the RMS level
+   of the audible part;
+2. write: the file trimmed to ``--tail`` seconds past that frame (faded out
+   over the tail), scaled by its gain, as 16-bit PCM; plus
+   ``<name>.peaks.json``, min/max pairs per ``samples_per_pixel`` frames in the
+   8-bit JSON format of ``audiowaveform`` (what peaks.js and similar scrubbing
+   UIs load).
+
+Gains bring every file to the same RMS level. The level is ``--target-db``,
+lowered for the whole set when any file would otherwise peak above
+``--ceiling-db``, so keys stay matched to each other. Samples are read and
+written ``CHUNK_FRAMES`` at a time, so memory stays flat however long a file is.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from jazz_common.profile import profiled, span
+from jazz_common.store import ArtifactStore
+
+# Frames per read/write (rounded down to whole peak pixels when writing).
+CHUNK_FRAMES = 1 << 16
+PCM = 1
+IEEE_FLOAT = 3
+EXTENSIBLE = 0xFFFE
+SAMPLE_TYPES = {(PCM, 16): np.dtype("<i2"), (PCM, 32): np.dtype("<i4"), (IEEE_FLOAT, 32): np.dtype("<f4")}
+PEAKS_SUFFIX = ".peaks.json"
+
+
+def db_to_gain(db: float) -> float:
+    return 10 ** (db / 20)
+
+
+def gain_to_db(gain: float) -> float:
+    return 20 * np.log10(gain) if gain > 0 else float("-inf")
+
+
+def read_wav(path: Path):
+    """``(samples, sample_rate)``: a read-only ``(frames, channels)`` memmap of the data chunk."""
+    with open(path, "rb") as f:
+        riff, _size, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                tag, channels, rate, _byte_rate, _align, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == EXTENSIBLE:
+                    tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (tag, channels, rate, bits)
+            elif chunk_id == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+    if fmt is None:
+        raise ValueError(f"{path}: data chunk before fmt chunk")
+    tag, channels, rate, bits = fmt
+    dtype = SAMPLE_TYPES.get((tag, bits))
+    if dtype is None:
+        raise ValueError(f"{path}: unsupported sample format (tag {tag}, {bits}-bit); expected 16/32-bit PCM or 32-bit float")
+    # A writer that never patched the size (streaming) leaves it too large; clamp to the file.
+    size = min(size, path.stat().st_size - offset)
+    frames = size // (dtype.itemsize * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.float32), rate
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels)), rate
+
+
+def full_scale(samples) -> float:
+    return 1.0 if samples.dtype.kind == "f" else float(-np.iinfo(samples.dtype).min)
+
+
+def chunks(frames: int, size: int = CHUNK_FRAMES):
+    for begin in range(0, frames, size):
+        yield begin, min(begin + size, frames)
+
+
+def analyze(path: Path, silence_db: float) -> dict:
+    """The audible length (last frame above ``silence_db``), peak, and RMS level of one file."""
+    samples, rate = read_wav(path)
+    scale = full_scale(samples)
+    threshold = db_to_gain(silence_db) * scale
+    frames = len(samples)
+    # Walk back from the end to the last audible frame; usually only the tail is read.
+    end = 0
+    for begin in range((frames - 1) // CHUNK_FRAMES * CHUNK_FRAMES if frames else -1, -1, -CHUNK_FRAMES):
+        loud = np.flatnonzero(np.abs(samples[begin:begin + CHUNK_FRAMES].astype(np.float32)).max(axis=1) > threshold)
+        if len(loud):
+            end = begin + int(loud[-1]) + 1
+            break
+    peak = 0.0
+    squares = 0.0
+    for begin, stop in chunks(end):
+        block = samples[begin:stop].astype(np.float64) / scale
+        peak = max(peak, float(np.abs(block).max()))
+        squares += float(np.square(block).sum())
+    rms = (squares / (end * samples.shape[1])) ** 0.5 if end else 0.0
+    return {
+        "path": str(path),
+        "sample_rate": rate,
+        "channels": samples.shape[1],
+        "frames": frames,
+        "audible_frames": end,
+        "peak_db": gain_to_db(peak),
+        "rms_db": gain_to_db(rms),
+    }
+
+
+def set_level(stats, target_db: float, ceiling_db: float) -> float:
+    """One RMS level for every file: ``target_db``, or lower if a file would peak above ``ceiling_db``."""
+    headroom = [ceiling_db - s["peak_db"] + s["rms_db"] for s in stats if s["audible_frames"]]
+    return min([target_db, *headroom])
+
+
+def peaks_json(lows, highs, sample_rate: int, samples_per_pixel: int) -> dict:
+    """audiowaveform's JSON (version 2, one channel, 8 bits): interleaved min/max per pixel."""
+    data = np.empty(2 * len(lows), dtype=np.int16)
+    data[0::2] = np.round(np.clip(lows, -1, 1) * 127)
+    data[1::2] = np.round(np.clip(highs, -1, 1) * 127)
+    return {
+        "version": 2,
+        "channels": 1,
+        "sample_rate": sample_rate,
+        "samples_per_pixel": samples_per_pixel,
+        "bits": 8,
+        "length": len(lows),
+        "data": data.tolist(),
+    }
+
+
+def process(path: Path, outfile: Path, gain_db: float, end: int, tail: float, pixels_per_second: int) -> dict:
+    """Write the trimmed, gained, faded file as 16-bit PCM and its peaks; returns the new length."""
+    samples, rate = read_wav(path)
+    scale = full_scale(samples)
+    gain = db_to_gain(gain_db) / scale
+    frames = min(len(samples), end + round(tail * rate))
+    fade_from = min(end, frames)
+    samples_per_pixel = max(1, rate // pixels_per_second)
+    lows, highs = [], []
+
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=outfile.parent, prefix=outfile.name, suffix=".tmp")
+    os.close(fd)
+    shutil.copymode(path, tmp)
+    try:
+        with wave.open(tmp, "wb") as out:
+            out.setnchannels(samples.shape[1])
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            for begin, stop in chunks(frames, max(1, CHUNK_FRAMES // samples_per_pixel) * samples_per_pixel):
+                block = samples[begin:stop].astype(np.float32) * gain
+                if stop > fade_from:
+                    # Linear fade over the kept tail, so the cut never clicks.
+                    position = np.arange(begin, stop)
+                    block *= np.clip((frames - position) / max(frames - fade_from, 1), 0, 1)[:, None]
+                np.clip(block, -1, 32767 / 32768, out=block)
+                out.writeframes((block * 32768).astype("<i2").tobytes())
+                # Chunks hold whole pixels, so only the last pixel of the file can be short.
+                starts = np.arange(0, stop - begin, samples_per_pixel)
+                lows.append(np.minimum.reduceat(block.min(axis=1), starts))
+                highs.append(np.maximum.reduceat(block.max(axis=1), starts))
+        del samples
+        os.replace(tmp, outfile)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    lows = np.concatenate(lows) if lows else np.zeros(0)
+    highs = np.concatenate(highs) if highs else np.zeros(0)
+    peaks_path = outfile.with_suffix(PEAKS_SUFFIX)
+    peaks_path.write_text(json.dumps(peaks_json(lows, highs, rate, samples_per_pixel), separators=(",", ":")) + "\n", encoding="utf-8")
+    return {"path": str(outfile), "peaks": str(peaks_path), "frames": frames, "seconds": frames / rate}
+
+
+def _analyze(job):
+    return analyze(*job)
+
+
+def _process(job):
+    return process(*job)
+
+
+def stored_wavs(store: ArtifactStore):
+    """``{wav path: MIDI row}`` for the store's MIDI files that have a rendered WAV beside them."""
+    found = {}
+    for row in store.find("scales", format="midi"):
+        path = store.path(row)
+        if path is not None and path.with_suffix(".wav").exists():
+            found[path.with_suffix(".wav")] = row
+    return found
+
+
+def run(args):
+    store = ArtifactStore(args.store) if args.store else None
+    if store is not None:
+        sources = stored_wavs(store)
+        paths = sorted(sources)
+    else:
+        paths = sorted(args.input_dir.glob(args.pattern))
+    if not paths:
+        raise SystemExit(f"No WAV files matching {args.pattern} in {args.input_dir}" if store is None else f"No rendered WAVs for the MIDI in {args.store}")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        with span("analyze"):
+            stats = list(pool.map(_analyze, [(path, args.silence_db) for path in paths]))
+        level = set_level(stats, args.target_db, args.ceiling_db)
+        gains = [level - s["rms_db"] if s["audible_frames"] and not args.no_normalize else 0.0 for s in stats]
+        jobs = [
+            (path, (args.output_dir or path.parent) / path.name, gain, s["audible_frames"], args.tail, args.pixels_per_second)
+            for path, s, gain in zip(paths, stats, gains)
+        ]
+        with span("write"):
+            results = list(pool.map(_process, jobs))
+    elapsed = time.perf_counter() - start
+
+    if store is not None:
+        with span("record artifacts"):
+            for path, result, gain in zip(paths, results, gains):
+                row = sources[path]
+                identity = {field: row[field] for field in ("section", "scale", "key", "edition")}
+                meta = {"gain_db": round(gain, 2), "seconds": round(result["seconds"], 3)}
+                store.put("scales", "wav", result["path"], meta=meta, **identity)
+                store.put("scales", "peaks", result["peaks"], meta={"pixels_per_second": args.pixels_per_second}, **identity)
+        store.commit()
+        store.close()
+    if not args.no_normalize:
+        print(f"Set level {level:.1f} dBFS RMS (target {args.target_db:.1f}, ceiling {args.ceiling_db:.1f} dBFS peak)")
+    for s, gain, result in zip(stats, gains, results):
+        trimmed = (s["frames"] - result["frames"]) / s["sample_rate"]
+        print(f"  {Path(result['path']).name}: {result['seconds']:.2f}s (trimmed {trimmed:.2f}s), gain {gain:+.1f} dB")
+    print(f"Processed {len(results)} file(s) in {elapsed:.2f}s; peaks beside each as *{PEAKS_SUFFIX}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Trim, level, and summarize rendered WAVs (after render_wavs.sh).")
+    ap.add_argument("--input-dir", type=Path, default=Path("build"), help="Directory of rendered WAVs (default: build).")
+    ap.add_argument("--output-dir", type=Path, default=None, help="Where to write the processed WAVs and peaks (default: in place, in --input-dir).")
+    ap.add_argument("--pattern", type=str, default="jazz_scales_abjad_*.wav", help="Glob for the WAVs to process (default: jazz_scales_abjad_*.wav).")
+    ap.add_argument("--silence-db", type=float, default=-60.0, help="Level below which the tail counts as silence, in dBFS (default -60).")
+    ap.add_argument("--tail", type=float, default=0.5, help="Seconds kept (and faded out) after the last audible frame (default 0.5).")
+    ap.add_argument("--target-db", type=float, default=-20.0, help="RMS level every file is brought to, in dBFS (default -20).")
+    ap.add_argument("--ceiling-db", type=float, default=-1.0, help="Highest peak allowed after gain, in dBFS; lowers the set level if needed (default -1).")
+    ap.add_argument("--no-normalize", action="store_true", help="Only trim and write peaks; keep each file's level.")
+    ap.add_argument("--pixels-per-second", type=int, default=100, help="Peak resolution: min/max pairs per second of audio (default 100).")
+    ap.add_argument("--store", type=Path, default=None, metavar="DB", help="Process the WAVs rendered from the MIDI files in this artifact store (generator --store) and record the results in it.")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    with profiled(args.profile, "jazz_scales.audio"):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
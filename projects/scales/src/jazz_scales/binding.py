@@ -0,0 +1,110 @@
+"""Bind front matter, a table of contents, and chapter pages into one PDF with an outline.
+
+Shared by ``jazz_scales.book`` and ``jazz_scales.packet``. Only pypdf and
+reportlab are imported here, so a packet never pays for loading abjad or the
+scale catalogue.
+"""
+
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from jazz_common.profile import span
+
+# Page-range index written beside the book, read by jazz_scales.packet.
+INDEX_NAME = "book-index.json"
+INDEX_VERSION = 2
+
+
+def make_toc(sections, out_dir: Path, name: str = "toc.pdf", title: str = "Table of Contents"):
+    # sections: [(heading, [(label, page), ...]), ...]
+    toc_path = out_dir / name
+    c = canvas.Canvas(str(toc_path), pagesize=letter)
+    W, H = letter
+    y = H - 72
+    c.setFont("Helvetica-Bold", 24)
+    c.drawString(72, y, title)
+    y -= 36
+    for heading, entries in sections:
+        if y < 100:
+            c.showPage()
+            y = H - 72
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(72, y, heading)
+        y -= 22
+        c.setFont("Helvetica", 12)
+        for label, page in entries:
+            c.drawString(90, y, label)
+            c.drawRightString(W - 72, y, str(page))
+            y -= 18
+            if y < 72:
+                c.showPage()
+                y = H - 72
+                c.setFont("Helvetica", 12)
+    c.save()
+    return toc_path
+
+
+def assemble(content, front, out_dir: Path, out_path: Path, toc_name: str = "toc.pdf", title: str = "Table of Contents"):
+    """Write ``front`` pages, a TOC, and the ``content`` chapters (each limited to its ``pages`` if given) with an outline.
+
+    Returns each chapter's 0-based start page in ``out_path``.
+    """
+    front = list(front)
+
+    def chapter_pages(item):
+        pages = PdfReader(item["path"]).pages
+        return [pages[i] for i in item["pages"]] if item.get("pages") is not None else list(pages)
+
+    def build_sections(front_pages):
+        # Display (1-based) page of the first content chapter follows the front matter.
+        page = front_pages + 1
+        ordered = []
+        index = {}
+        for item in content:
+            section = item["section"]
+            if section not in index:
+                index[section] = len(ordered)
+                ordered.append((section, []))
+            ordered[index[section]][1].append((item["label"], page))
+            page += len(item["pages"]) if item.get("pages") is not None else item["npages"]
+        return ordered
+
+    # Resolve the TOC page count to a fixed point: the line/page count depends on the
+    # number of entries, not on the page numbers, so this converges in a couple rounds.
+    toc_pages = 1
+    toc_path = None
+    for _ in range(5):
+        sections = build_sections(len(front) + toc_pages)
+        with span("make_toc"):
+            toc_path = make_toc(sections, out_dir, toc_name, title)
+        actual = len(PdfReader(str(toc_path)).pages)
+        if actual == toc_pages:
+            break
+        toc_pages = actual
+
+    toc_reader = PdfReader(str(toc_path))
+
+    final = PdfWriter()
+    for p in front:
+        final.add_page(p)
+    for p in toc_reader.pages:
+        final.add_page(p)
+
+    # Append chapters, remembering each chapter's 0-based start page for bookmarks.
+    start_indices = []
+    for item in content:
+        with span(f"append {item['label']}", cat="chapter"):
+            start_indices.append(len(final.pages))
+            for p in chapter_pages(item):
+                final.add_page(p)
+
+    for item, idx in zip(content, start_indices):
+        final.add_outline_item(item["label"], idx)
+
+    with span("write book"):
+        with open(out_path, "wb") as f:
+            final.write(f)
+    return start_indices
@@ -1,10 +1,22 @@
 import argparse
+import io
+import json
 from pathlib import Path
-from pypdf import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from pypdf import PdfReader
 
+from jazz_common.pitch import NAME_TO_PC
+from jazz_common.profile import profiled, span
+from jazz_common.shard import merge_shards
+from jazz_common.store import ArtifactStore
+
+from .binding import INDEX_NAME, INDEX_VERSION, assemble
+from .editions import EDITIONS
 from .generator import SCALES, scale_slug
+from .patterns import INTERVAL_PATTERNS
+
+# Files rendered from a shard's artifacts after its manifest was written
+# (render_wavs.sh, jazz_scales.audio); gathered with them on merge.
+SHARD_SIBLINGS = (".wav", ".peaks.json")
 
 def pretty_from_filename(fn: str) -> str:
     base = Path(fn).stem  # jazz_scales_abjad_<key>
@@ -20,7 +32,10 @@ ENHARMONIC_AFTER = {"C#": "Db", "F#": "Gb"}
 
 
 def key_sort_key(fn: str):
-    name = pretty_from_filename(fn)
+    return key_order(pretty_from_filename(fn))
+
+
+def key_order(name: str):
     if name in ENHARMONIC_AFTER:
         # Sort just after the flat twin (same primary key, secondary rank 1).
         return (ENHARMONIC_AFTER[name], 1)
@@ -32,7 +47,7 @@ def collect_key_pdfs(out_dir: Path):
     # Alphabetical by pretty key, with each sharp enharmonic nested after its
     # flat twin (Db→C#, Gb→F#).
     files = sorted(files, key=key_sort_key)
-    return files
+    return [(pretty_from_filename(fp), fp) for fp in files]
 
 def collect_scale_pdfs(out_dir: Path):
     # In canonical SCALES order; titles come from the real scale names.
@@ -43,114 +58,156 @@ def collect_scale_pdfs(out_dir: Path):
             items.append((name, str(path)))
     return items
 
-def make_toc(sections, out_dir: Path):
-    # sections: [(heading, [(label, page), ...]), ...]
-    toc_path = out_dir / "toc.pdf"
-    c = canvas.Canvas(str(toc_path), pagesize=letter)
-    W, H = letter
-    y = H - 72
-    c.setFont("Helvetica-Bold", 24)
-    c.drawString(72, y, "Table of Contents")
-    y -= 36
-    for heading, entries in sections:
-        if y < 100:
-            c.showPage()
-            y = H - 72
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(72, y, heading)
-        y -= 22
-        c.setFont("Helvetica", 12)
-        for label, page in entries:
-            c.drawString(90, y, label)
-            c.drawRightString(W - 72, y, str(page))
-            y -= 18
-            if y < 72:
-                c.showPage()
-                y = H - 72
-                c.setFont("Helvetica", 12)
-    c.save()
-    return toc_path
-
-def main():
-    ap = argparse.ArgumentParser(description="Merge per-key and per-scale PDFs into the combined jazz scales book.")
-    ap.add_argument("--output-dir", type=Path, default=Path("build"),
-                    help="Directory containing chapter PDFs and receiving the merged book (default: build).")
-    args = ap.parse_args()
-    out_dir = args.output_dir
-    out_dir.mkdir(parents=True, exist_ok=True)
+def collect_pattern_pdfs(out_dir: Path):
+    # Generator --patterns chapters: INTERVAL_PATTERNS order, then SCALES order.
+    items = []
+    for pattern_id, label, _skip in INTERVAL_PATTERNS:
+        for name, *_rest in SCALES:
+            path = out_dir / f"jazz_scales_pattern_{pattern_id}_{scale_slug(name)}.pdf"
+            if path.exists():
+                items.append((f"In {label}", name, str(path)))
+    return items
 
+def collect_from_store(store: ArtifactStore, edition: str = ""):
+    """The three chapter lists of a generator ``--store`` build, without scanning a directory.
+
+    Chapters are ``(key, source)``, ``(scale, source)``, and ``(section, scale,
+    source)``, ordered as the collect_* functions order them; a source is a path,
+    or a stream when the store holds the PDF's content.
+    """
+    def source(row):
+        path = store.path(row)
+        return str(path) if path is not None else io.BytesIO(store.read_bytes(row))
+
+    def find(section):
+        # A recorded file that was since deleted is reported and left out, not a crash.
+        rows = []
+        for row in store.find("scales", format="pdf", section=section, edition=edition):
+            path = store.path(row)
+            if path is not None and not path.exists():
+                print(f"Skipping {path}: recorded in {store.file} but missing")
+                continue
+            rows.append(row)
+        return rows
+
+    keys = sorted(find("key"), key=lambda row: key_order(row["key"]))
+    by_scale = {row["scale"]: row for row in find("scale")}
+    scale_items = [(name, source(by_scale[name])) for name, *_rest in SCALES if name in by_scale]
+    pattern_items = []
+    for pattern_id, label, _skip in INTERVAL_PATTERNS:
+        rows = {row["scale"]: row for row in find(f"pattern:{pattern_id}")}
+        pattern_items += [(f"In {label}", name, source(rows[name])) for name, *_rest in SCALES if name in rows]
+    return [(row["key"], source(row)) for row in keys], scale_items, pattern_items
+
+
+def page_labels(page, names):
+    """Which of ``names`` appear on ``page`` as a whole line of text (a markup above a system)."""
+    lines = {line.strip() for line in page.extract_text().splitlines()}
+    return [name for name in names if name in lines]
+
+
+def build_book(out_dir: Path, store: ArtifactStore | None = None, edition: str = ""):
     cover = out_dir / "cover.pdf"
     if not cover.exists():
         raise FileNotFoundError(f"Missing cover.pdf in {out_dir}/ — run jazz_scales.cover first.")
 
-    key_pdfs = collect_key_pdfs(out_dir)
-    scale_items = collect_scale_pdfs(out_dir)
+    if store is not None:
+        key_pdfs, scale_items, pattern_items = collect_from_store(store, edition)
+    else:
+        key_pdfs = collect_key_pdfs(out_dir)
+        scale_items = collect_scale_pdfs(out_dir)
+        pattern_items = collect_pattern_pdfs(out_dir)
     if not key_pdfs and not scale_items:
         raise FileNotFoundError(
-            f"No chapter PDFs found in {out_dir}/ "
+            f"No chapter PDFs found in {store.file if store is not None else out_dir} "
             f"(expected jazz_scales_abjad_*.pdf or jazz_scales_byscale_*.pdf)."
         )
 
-    # Ordered content: by-key chapters first, then by-scale chapters.
+    # Ordered content: by-key chapters first, then by-scale, then pattern chapters.
+    # Each chapter's pages are indexed by the scale names (by-key chapters) or
+    # "Key of X" headings (the others) printed on them, for jazz_scales.packet.
+    scale_names = [name for name, *_rest in SCALES]
+    key_headings = [f"Key of {key}" for key, _fp in key_pdfs] or [f"Key of {name}" for name in NAME_TO_PC]
     content = []
-    for fp in key_pdfs:
-        content.append({"label": f"Key of {pretty_from_filename(fp)}", "path": fp,
-                        "section": "By Key", "npages": len(PdfReader(fp).pages)})
-    for name, fp in scale_items:
-        content.append({"label": name, "path": fp,
-                        "section": "By Scale", "npages": len(PdfReader(fp).pages)})
-
-    cover_reader = PdfReader(str(cover))
-    cover_pages = len(cover_reader.pages)
-
-    def build_sections(front_pages):
-        # Display (1-based) page of the first content chapter follows the front matter.
-        page = front_pages + 1
-        ordered = []
-        index = {}
-        for item in content:
-            section = item["section"]
-            if section not in index:
-                index[section] = len(ordered)
-                ordered.append((section, []))
-            ordered[index[section]][1].append((item["label"], page))
-            page += item["npages"]
-        return ordered
-
-    # Resolve the TOC page count to a fixed point: the line/page count depends on the
-    # number of entries, not on the page numbers, so this converges in a couple rounds.
-    toc_pages = 1
-    toc_path = None
-    for _ in range(5):
-        sections = build_sections(cover_pages + toc_pages)
-        toc_path = make_toc(sections, out_dir)
-        actual = len(PdfReader(str(toc_path)).pages)
-        if actual == toc_pages:
-            break
-        toc_pages = actual
-
-    toc_reader = PdfReader(str(toc_path))
-
-    final = PdfWriter()
-    for p in cover_reader.pages:
-        final.add_page(p)
-    for p in toc_reader.pages:
-        final.add_page(p)
-
-    # Append chapters, remembering each chapter's 0-based start page for bookmarks.
-    start_indices = []
-    for item in content:
-        start_indices.append(len(final.pages))
-        for p in PdfReader(item["path"]).pages:
-            final.add_page(p)
-
-    for item, idx in zip(content, start_indices):
-        final.add_outline_item(item["label"], idx)
+    with span("index chapter pages"):
+        for key, fp in key_pdfs:
+            pages = [page_labels(page, scale_names) for page in PdfReader(fp).pages]
+            content.append({"label": f"Key of {key}", "path": fp, "section": "By Key", "key": key,
+                            "npages": len(pages), "page_labels": pages})
+        for section, name, fp in [("By Scale", name, fp) for name, fp in scale_items] + pattern_items:
+            pages = [page_labels(page, key_headings) for page in PdfReader(fp).pages]
+            content.append({"label": name, "path": fp, "section": section, "scale": name,
+                            "npages": len(pages), "page_labels": pages})
 
     book = out_dir / "Jazz-Scales-Book.pdf"
-    with open(book, "wb") as f:
-        final.write(f)
+    starts = assemble(content, PdfReader(str(cover)).pages, out_dir, book)
+    write_index(out_dir, book, content, starts)
     print("Wrote", book)
 
+
+def index_path(path: str, out_dir: Path) -> str:
+    """A chapter file for the index: relative to ``out_dir`` when under it, else absolute (a ``--store`` elsewhere)."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(out_dir.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def write_index(out_dir: Path, book: Path, content, starts):
+    """``book-index.json``: every chapter's place in the book, its own file, and the labels on each page."""
+    chapters = []
+    for item, start in zip(content, starts):
+        path = item["path"]
+        chapters.append({
+            "section": item["section"],
+            "label": item["label"],
+            "key": item.get("key"),
+            "scale": item.get("scale"),
+            "path": index_path(path, out_dir) if isinstance(path, str) else None,
+            "start": start,
+            "npages": item["npages"],
+            # Per page, the scales (by-key chapters) or "Key of X" headings found on it;
+            # null when the PDF has no extractable text, so a packet takes the whole chapter.
+            "page_labels": item["page_labels"] if any(item["page_labels"]) else None,
+        })
+    # The catalogue's names and slugs, so a packet resolves --scales without importing it.
+    scales = [{"name": name, "slug": scale_slug(name)} for name, *_rest in SCALES]
+    index = {"version": INDEX_VERSION, "book": book.name, "scales": scales, "chapters": chapters}
+    (out_dir / INDEX_NAME).write_text(json.dumps(index, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Merge per-key and per-scale PDFs into the combined jazz scales book.")
+    ap.add_argument("--output-dir", type=Path, default=Path("build"),
+                    help="Directory containing chapter PDFs and receiving the merged book (default: build).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON",
+                    help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    ap.add_argument("--editions", nargs="+", choices=list(EDITIONS), default=None,
+                    help="Merge one book per edition from <output-dir>/<edition>/ (default: a single book from <output-dir>).")
+    ap.add_argument("--store", type=Path, default=None, metavar="DB",
+                    help="Find the chapter PDFs in this artifact store (generator --store) instead of scanning the directory.")
+    ap.add_argument("--shards", nargs="+", type=Path, default=None, metavar="SHARD_DIR",
+                    help="First gather the outputs of generator --shard runs (every i/N of one split) into --output-dir.")
+    args = ap.parse_args(argv)
+    out_dir = args.output_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with profiled(args.profile, "jazz_scales.book"):
+        if args.shards:
+            with span("merge shards"):
+                try:
+                    merged = merge_shards(args.shards, out_dir, siblings=SHARD_SIBLINGS)
+                except ValueError as e:
+                    raise SystemExit(str(e))
+            print(f"Merged {len(merged)} file(s) from {len(args.shards)} shard(s) into {out_dir}")
+        store = ArtifactStore(args.store) if args.store else None
+        if not args.editions:
+            build_book(out_dir, store)
+        for name in args.editions or []:
+            with span(f"edition {name}", cat="edition"):
+                build_book(out_dir / name, store, name)
+        if store is not None:
+            store.close()
+
 if __name__ == "__main__":
     main()
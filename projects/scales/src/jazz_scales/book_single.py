@@ -1,4 +1,5 @@
 # scripts/make_book.py
+import argparse
 from pathlib import Path
 from pypdf import PdfReader, PdfWriter
 from reportlab.lib.pagesizes import letter
@@ -24,7 +25,8 @@ def make_toc(entries):
             c.showPage(); y = H - 72; c.setFont("Helvetica", 12)
     c.save()
 
-def main():
+def main(argv=None):
+    argparse.ArgumentParser(description="Merge out/cover.pdf and out/jazz_scales_abjad.pdf into out/Jazz-Scales-Book.pdf (legacy single-chart book).").parse_args(argv)
     if not COVER.exists():
         raise FileNotFoundError(f"Missing cover: {COVER}")
     if not CONTENT.exists():
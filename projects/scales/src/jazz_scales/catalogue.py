@@ -0,0 +1,125 @@
+"""The scale catalogue: ``data/scales.json``, validated once and compiled to a binary cache.
+
+Each entry is ``{"name", "notes", "intervals", "chord"}`` with notes in C
+(``"C5"`` for the octave) and the chord written on C. Loading hashes the file
+and unpickles ``<cache dir>/scales-<hash>.pickle``: ``SCALES``-shaped tuples
+with interned labels, plus each scale's notes as integer pitch numbers
+(abjad's numbering, middle C = 0). Only when the file is new or edited is it
+parsed, validated, and compiled again, so importing the catalogue costs a hash
+and an unpickle rather than re-deriving pitches from note names.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+from jazz_common.pitch import NAME_TO_PC, numbered_pitch_from_name
+
+CATALOGUE_PATH = Path(__file__).with_name("data") / "scales.json"
+# Bump when the compiled layout changes, so stale caches are ignored.
+CACHE_VERSION = 1
+# A chart bar holds eight eighth notes.
+MAX_NOTES = 8
+FIELDS = ("name", "notes", "intervals", "chord")
+
+# Note names -> pitch numbers, filled from the compiled cache and on demand.
+_PITCHES = {}
+
+
+def cache_dir() -> Path:
+    """``$JAZZ_CACHE_DIR``, else ``$XDG_CACHE_HOME/jazz-scales``, else ``~/.cache/jazz-scales``."""
+    if os.environ.get("JAZZ_CACHE_DIR"):
+        return Path(os.environ["JAZZ_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "jazz-scales"
+
+
+def validate(entries, source="catalogue"):
+    """Raise ``ValueError`` naming the first malformed entry; returns ``entries``."""
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{source}: expected a non-empty list of scales")
+    seen = set()
+    for number, entry in enumerate(entries, start=1):
+        where = f"{source}: entry {number}"
+        if not isinstance(entry, dict) or set(entry) != set(FIELDS):
+            raise ValueError(f"{where}: expected exactly the fields {', '.join(FIELDS)}")
+        name, notes, intervals, chord = (entry[field] for field in FIELDS)
+        where = f"{source}: {name!r}"
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"{source}: entry {number}: empty name")
+        if name in seen:
+            raise ValueError(f"{where}: duplicate name")
+        seen.add(name)
+        if not 1 <= len(notes) <= MAX_NOTES:
+            raise ValueError(f"{where}: {len(notes)} notes (a chart bar holds 1-{MAX_NOTES})")
+        for note in notes:
+            if not isinstance(note, str) or note.rstrip("0123456789") not in NAME_TO_PC:
+                raise ValueError(f"{where}: unknown note {note!r}")
+        numbers = [numbered_pitch_from_name(note).number() for note in notes]
+        if any(b <= a for a, b in zip(numbers, numbers[1:])):
+            raise ValueError(f"{where}: notes must ascend")
+        if len(intervals) != len(notes) - 1:
+            raise ValueError(f"{where}: {len(intervals)} interval labels for {len(notes)} notes (need {len(notes) - 1})")
+        if not isinstance(chord, str) or not chord.startswith("C"):
+            raise ValueError(f"{where}: chord {chord!r} must be written on C")
+    return entries
+
+
+def compile_entries(entries):
+    """``(scales, pitches)``: ``SCALES`` tuples with interned strings, and their pitch numbers."""
+    scales = []
+    pitches = []
+    for entry in entries:
+        notes = tuple(sys.intern(note) for note in entry["notes"])
+        intervals = tuple(sys.intern(label) for label in entry["intervals"])
+        scales.append((sys.intern(entry["name"]), notes, intervals, sys.intern(entry["chord"])))
+        pitches.append(tuple(numbered_pitch_from_name(note).number() for note in notes))
+    return scales, pitches
+
+
+def _write_cache(path: Path, compiled):
+    """Write atomically; a read-only cache directory just means recompiling next time."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_compiled(path=CATALOGUE_PATH):
+    """``(scales, pitches)`` for the catalogue at ``path``, from the cache when it matches the file."""
+    raw = Path(path).read_bytes()
+    cache_path = cache_dir() / f"scales-{hashlib.sha256(raw).hexdigest()[:16]}.pickle"
+    try:
+        with open(cache_path, "rb") as f:
+            version, scales, pitches = pickle.load(f)
+        if version == CACHE_VERSION:
+            return scales, pitches
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+    scales, pitches = compile_entries(validate(json.loads(raw), str(path)))
+    _write_cache(cache_path, (CACHE_VERSION, scales, pitches))
+    return scales, pitches
+
+
+def load_scales(path=CATALOGUE_PATH):
+    """The catalogue as a fresh ``SCALES`` list; registers each scale's pitch numbers."""
+    scales, pitches = load_compiled(path)
+    for scale, numbers in zip(scales, pitches):
+        _PITCHES[scale[1]] = numbers
+    return list(scales)
+
+
+def pitch_numbers(notes):
+    """Pitch numbers of ``notes`` (names in C), compiled ones first, else parsed once and kept."""
+    notes = tuple(notes)
+    numbers = _PITCHES.get(notes)
+    if numbers is None:
+        numbers = _PITCHES[notes] = tuple(numbered_pitch_from_name(note).number() for note in notes)
+    return numbers
@@ -0,0 +1,250 @@
+"""One scale in one key: the ``Chart`` model shared by every scales entry point.
+
+The print generator, JSON export, SVG snippets, chart server, and the legacy
+single-key script all need the same facts about a chart: transposed pitches,
+their spelling, the chord symbol, the web JSON record, and the abjad bars.
+``get_chart`` returns a single shared ``Chart`` per (scale, key, anchor) from a
+bounded LRU, and each view is derived on first access and memoized on it.
+"""
+
+from functools import lru_cache
+
+import abjad
+
+from jazz_common.pitch import FLAT_NAMES, SHARP_NAMES
+
+from .catalogue import pitch_numbers
+from .patterns import PATTERN_IDS, degree_count, pattern_labels, resolve, sequence_table
+
+# abjad NumberedPitch 0 == middle C == MIDI 60.
+MIDDLE_C_MIDI = 60
+# Every key x scale x anchor of the default catalogue is ~1100 charts.
+CHART_CACHE_SIZE = 2048
+
+
+def pc_to_register_offset(pc: int, anchor: str) -> int:
+    pc %= 12
+    if anchor == "up":
+        return pc
+    if anchor == "down":
+        return pc - (12 if pc else 0)
+    return pc if pc <= 5 else pc - 12
+
+
+def transpose_scale_notes(notes_spec, semitone_offset):
+    return [abjad.NumberedPitch(number + semitone_offset) for number in pitch_numbers(notes_spec)]
+
+
+def transpose_chord_text(chord_text_c_root: str, key_name: str) -> str:
+    if not chord_text_c_root:
+        return ""
+    return key_name + chord_text_c_root[1:]
+
+
+def format_pitch_for_key(pitch, prefer_names: str) -> str:
+    named_pitch = abjad.NamedPitch(pitch.name()).respell(prefer_names)
+    return named_pitch.name()
+
+
+def note_from_midi(midi: int, prefer: str) -> dict:
+    pc = midi % 12
+    flat_spelled = FLAT_NAMES[pc]
+    sharp_spelled = SHARP_NAMES[pc]
+    spelled = flat_spelled if prefer == "flats" else sharp_spelled
+    return {
+        "name": spelled[0],
+        "accidental": spelled[1:],  # "", "#", or "b"
+        "octave": midi // 12 - 1,   # scientific pitch notation
+        "midi": midi,
+        "flat_name": flat_spelled[0],
+        "flat_accidental": flat_spelled[1:],
+        "sharp_name": sharp_spelled[0],
+        "sharp_accidental": sharp_spelled[1:],
+    }
+
+
+def make_bar(names, intervals, chord_text, scale_name):
+    leaves = [abjad.Note(f"{name}8") for name in names]
+    while len(leaves) < 8:
+        leaves.append(abjad.Rest("r8"))
+    container = abjad.Container(leaves)
+
+    pitched = [leaf for leaf in abjad.select.leaves(container) if isinstance(leaf, abjad.Note)]
+    if len(pitched) >= 2:
+        abjad.beam(pitched)
+
+    first_leaf = abjad.select.leaf(container, 0)
+    if scale_name:
+        abjad.attach(abjad.Markup(f'"{scale_name}"'), first_leaf, direction=abjad.UP)
+    if chord_text:
+        abjad.attach(abjad.Markup(f'"{chord_text}"'), first_leaf, direction=abjad.UP)
+
+    i = 0
+    for leaf in abjad.select.leaves(container):
+        if isinstance(leaf, abjad.Note):
+            label = "-" if i == 0 else (intervals[i - 1] if i - 1 < len(intervals) else "")
+            if label:
+                abjad.attach(abjad.Markup(f'"{label}"'), leaf, direction=abjad.DOWN)
+            i += 1
+    return container
+
+
+def make_retrograde_bar(names, intervals, chord_text, scale_name):
+    reversed_intervals = list(reversed(intervals))
+    leaves = [abjad.Note(f"{name}8") for name in reversed(names)]
+    while len(leaves) < 8:
+        leaves.append(abjad.Rest("r8"))
+    container = abjad.Container(leaves)
+
+    pitched = [leaf for leaf in abjad.select.leaves(container) if isinstance(leaf, abjad.Note)]
+    if len(pitched) >= 2:
+        abjad.beam(pitched)
+
+    first_leaf = abjad.select.leaf(container, 0)
+    heading = f"{scale_name} - Retrograde" if scale_name else "Retrograde"
+    abjad.attach(abjad.Markup(f'"{heading}"'), first_leaf, direction=abjad.UP)
+    if chord_text:
+        abjad.attach(abjad.Markup(f'"{chord_text}"'), first_leaf, direction=abjad.UP)
+
+    i = 0
+    for leaf in abjad.select.leaves(container):
+        if isinstance(leaf, abjad.Note):
+            label = "-" if i == 0 else (reversed_intervals[i - 1] if i - 1 < len(reversed_intervals) else "")
+            if label:
+                abjad.attach(abjad.Markup(f'"{label}"'), leaf, direction=abjad.DOWN)
+            i += 1
+    return container
+
+
+def make_pattern_bars(names, labels, chord_text, heading):
+    """Two beamed bars of eighths for an interval pattern, ``labels`` under the notes."""
+    bars = []
+    for start in range(0, len(names), 8):
+        leaves = [abjad.Note(f"{name}8") for name in names[start:start + 8]]
+        container = abjad.Container(leaves)
+        if len(leaves) >= 2:
+            abjad.beam(leaves)
+        for leaf, label in zip(leaves, labels[start:start + 8]):
+            if label:
+                abjad.attach(abjad.Markup(f'"{label}"'), leaf, direction=abjad.DOWN)
+        bars.append(container)
+
+    first_leaf = abjad.select.leaf(bars[0], 0)
+    if heading:
+        abjad.attach(abjad.Markup(f'"{heading}"'), first_leaf, direction=abjad.UP)
+    if chord_text:
+        abjad.attach(abjad.Markup(f'"{chord_text}"'), first_leaf, direction=abjad.UP)
+    return tuple(bars)
+
+
+class Chart:
+    """A ``SCALES`` entry in the key ``spec`` (``(pc, prefer, name)`` from ``key_cycle``).
+
+    ``octave`` shifts the anchored register (the bass clef edition uses -1).
+    Views are computed on first access; use ``get_chart`` rather than
+    constructing charts directly so every caller shares them.
+    """
+
+    __slots__ = ("scale", "spec", "anchor", "octave", "_pitches", "_names", "_chord", "_record", "_bars", "_patterns", "_pattern_bars")
+
+    def __init__(self, scale, spec, anchor: str = "nearest", octave: int = 0):
+        self.scale = scale
+        self.spec = spec
+        self.anchor = anchor
+        self.octave = octave
+        self._pitches = None
+        self._names = None
+        self._chord = None
+        self._record = None
+        self._bars = {}
+        self._patterns = None
+        self._pattern_bars = {}
+
+    def __repr__(self):
+        return f"Chart({self.scale[0]!r}, {self.spec[2]!r}, {self.anchor!r}, octave={self.octave})"
+
+    @property
+    def pitches(self):
+        """Transposed ``abjad.NumberedPitch`` list, anchored around middle C."""
+        if self._pitches is None:
+            offset = pc_to_register_offset(self.spec[0], self.anchor) + 12 * self.octave
+            self._pitches = transpose_scale_notes(self.scale[1], offset)
+        return self._pitches
+
+    @property
+    def names(self):
+        """LilyPond pitch names spelled for the key (e.g. ``"bf'"``)."""
+        if self._names is None:
+            self._names = [format_pitch_for_key(p, self.spec[1]) for p in self.pitches]
+        return self._names
+
+    @property
+    def chord(self) -> str:
+        if self._chord is None:
+            self._chord = transpose_chord_text(self.scale[3], self.spec[2])
+        return self._chord
+
+    @property
+    def record(self) -> dict:
+        """The chart as exported to the web app's ``scales.json``."""
+        if self._record is None:
+            self._record = {
+                "key": self.spec[2],
+                "scale": self.scale[0],
+                "chord": self.chord,
+                "intervals": list(self.scale[2]),
+                "notes": [note_from_midi(p.number() + MIDDLE_C_MIDI, self.spec[1]) for p in self.pitches],
+            }
+        return self._record
+
+    def bars(self, label: str):
+        """Fresh ``(forward, retrograde)`` abjad bars with ``label`` above each (none if empty).
+
+        abjad components can only live in one score, so the first pair built
+        per label is kept as a prototype and callers get copies of it.
+        """
+        prototype = self._bars.get(label)
+        if prototype is None:
+            prototype = (
+                make_bar(self.names, self.scale[2], self.chord, label),
+                make_retrograde_bar(self.names, self.scale[2], self.chord, label),
+            )
+            self._bars[label] = prototype
+        return abjad.mutate.copy(prototype[0]), abjad.mutate.copy(prototype[1])
+
+    @property
+    def patterns(self):
+        """Pitch numbers of every ``INTERVAL_PATTERNS`` phrase, as a ``(patterns, 16)`` array."""
+        if self._patterns is None:
+            numbers = [p.number() for p in self.pitches]
+            self._patterns = resolve(numbers, sequence_table(degree_count(numbers)))
+        return self._patterns
+
+    def pattern_bars(self, pattern_id: str, label: str):
+        """Fresh two-bar phrase for ``pattern_id`` (see ``jazz_scales.patterns``), copied like ``bars``."""
+        key = (pattern_id, label)
+        prototype = self._pattern_bars.get(key)
+        if prototype is None:
+            row = PATTERN_IDS.index(pattern_id)
+            m = degree_count([p.number() for p in self.pitches])
+            indices = sequence_table(m)[row].tolist()
+            names = [format_pitch_for_key(abjad.NumberedPitch(n), self.spec[1]) for n in self.patterns[row].tolist()]
+            prototype = make_pattern_bars(names, pattern_labels(pattern_id, indices, self.scale[2], m), self.chord, label)
+            self._pattern_bars[key] = prototype
+        return tuple(abjad.mutate.copy(bar) for bar in prototype)
+
+    def lilypond(self, label: str) -> str:
+        """LilyPond source of the two bars, e.g. for quick previews and diffs."""
+        forward, retrograde = self.bars(label)
+        return abjad.lilypond(forward) + "\n" + abjad.lilypond(retrograde)
+
+
+def get_chart(scale, spec, anchor: str = "nearest", octave: int = 0) -> Chart:
+    """The shared ``Chart`` for ``scale`` in ``spec``; keyed by content, so edited entries get new charts."""
+    name, notes, intervals, chord = scale
+    return _cached_chart((name, tuple(notes), tuple(intervals), chord), tuple(spec), anchor, octave)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _cached_chart(scale, spec, anchor: str, octave: int) -> Chart:
+    return Chart(scale, spec, anchor, octave)
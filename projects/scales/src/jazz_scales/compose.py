@@ -0,0 +1,238 @@
+"""Build the chapter PDFs by engraving each key x scale pair once and composing pages.
+
+The by-key and by-scale chapters hold the same music — one forward/retrograde
+pair per key x scale — under different headings. Here each pair is engraved a
+single time, heading-free, as a cropped PDF snippet (in parallel, and only if
+its LilyPond source is new), and both sections' pages are then laid out with
+reportlab and pypdf: titles and headings are drawn at composition time and the
+snippets placed beneath them. The chapter PDFs keep the generator's filenames,
+so ``jazz_scales.cover`` and ``jazz_scales.book`` work on the result unchanged,
+and reordering or regrouping chapters never re-engraves anything.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import shutil
+from pathlib import Path
+
+import abjad
+from pypdf import PdfReader, PdfWriter, Transformation
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from jazz_common.lilypond import compile_many, print_progress, publish_outputs, stamped_outputs, write_ly_incrementally
+from jazz_common.pitch import NAME_TO_PC, key_cycle, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+
+from .editions import EDITIONS
+from .generator import SCALE_TITLE_BASE, SCALES, TITLE_BASE, build_pair_score, edition_key_cycle, scale_slug
+
+PAIR_FLAGS = ["-dcrop", "-dno-print-pages"]
+# Letter page with 0.75in margins: snippets are engraved to exactly the text width.
+MARGIN = 54
+LINE_WIDTH_MM = 165
+HEADING_SIZE = 11
+HEADING_GAP = 4
+PAIR_GAP = 22
+
+
+def pair_stem(scale_name: str, key_name: str) -> str:
+    return f"{scale_slug(scale_name)}__{sanitize_key_for_filename(key_name)}"
+
+
+def write_pair_source(scale, spec, anchor: str, mode: str, clef: str, octave: int, outfile: Path) -> str:
+    """Write one heading-free pair justified to the page's text width; returns a digest of the source."""
+    score = build_pair_score(scale, spec, anchor, mode, 0, "", clef, octave)
+    header = abjad.Block("header", items=['tagline = ""'])
+    paper = abjad.Block("paper", items=[rf"line-width = {LINE_WIDTH_MM}\mm"])
+    layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0", "ragged-right = ##f"])
+    write_ly_incrementally([header, paper, abjad.Block("score", items=[score, layout_block])], outfile)
+    return hashlib.sha256(outfile.read_bytes()).hexdigest()[:16]
+
+
+def engrave_pairs(pair_dir: Path, src_dir: Path, specs, anchor: str, mode: str, clef: str, octave: int, force: bool = False, **compile_options):
+    """Engrave every pair for ``specs`` once; returns ``{(scale name, key name): cropped PDF}``.
+
+    Sources are written under readable names in ``src_dir`` and engraved as
+    ``pair_dir/<digest>.ly``, so a pair already engraved by an earlier run, or
+    by another edition with the same written music, is reused as is. Each
+    digest is compiled under a per-process name and only renamed to
+    ``<digest>.cropped.pdf`` (and stamped ``<digest>.ok``) if LilyPond
+    succeeded; a pair whose run failed is left out of the result.
+    """
+    snippets = {}
+    pending = {}
+    with span("write pair sources"):
+        for spec in specs:
+            for scale in SCALES:
+                source = src_dir / f"{pair_stem(scale[0], spec[2])}.ly"
+                digest = write_pair_source(scale, spec, anchor, mode, clef, octave, source)
+                cropped = pair_dir / f"{digest}.cropped.pdf"
+                snippets[(scale[0], spec[2])] = cropped
+                engraved = cropped.name in stamped_outputs(pair_dir / f"{digest}.ok") and cropped.exists()
+                if (force or not engraved) and digest not in pending:
+                    partial_ly = pair_dir / f"{digest}-partial-{os.getpid()}.ly"
+                    shutil.copyfile(source, partial_ly)
+                    pending[digest] = partial_ly
+
+    distinct = len(set(snippets.values()))
+    print(f"{len(snippets)} pairs, {distinct} distinct, {len(pending)} to engrave")
+    if pending:
+        jobs = [(ly_path, False, False) for ly_path in pending.values()]
+        results = compile_many(jobs, flags=PAIR_FLAGS, on_event=print_progress, **compile_options)
+        failed = set()
+        for (digest, partial_ly), result in zip(pending.items(), results):
+            produced = partial_ly.with_suffix(".cropped.pdf")
+            if result["succeeded"] and produced.exists():
+                publish_outputs([(produced, pair_dir / f"{digest}.cropped.pdf")], pair_dir / f"{digest}.ok")
+            else:
+                produced.unlink(missing_ok=True)
+                failed.add(pair_dir / f"{digest}.cropped.pdf")
+            partial_ly.with_suffix(".pdf").unlink(missing_ok=True)
+            os.replace(partial_ly, pair_dir / f"{digest}.ly")
+        snippets = {pair: cropped for pair, cropped in snippets.items() if cropped not in failed}
+    return snippets
+
+
+def compose_chapter(title: str, entries, outfile: Path, author: str | None = None, license_text: str | None = None, readers=None):
+    """Lay out ``entries`` (``(heading, snippet PDF or None)`` pairs) under ``title`` as ``outfile``.
+
+    Text is drawn with reportlab first while recording where each snippet goes;
+    the snippets are then stamped onto those pages with pypdf. ``readers``
+    caches open snippet PDFs across chapters. Returns the number of missing snippets.
+    """
+    readers = {} if readers is None else readers
+    W, H = letter
+    width = W - 2 * MARGIN
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+    c.setTitle(title)
+
+    y = H - MARGIN
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(W / 2, y - 18, title)
+    y -= 30
+    if author:
+        c.setFont("Helvetica", 11)
+        c.drawRightString(W - MARGIN, y - 11, author)
+        y -= 22
+    if license_text:
+        c.setFont("Helvetica", 8)
+        c.drawCentredString(W / 2, MARGIN / 2, license_text)
+    y -= PAIR_GAP / 2
+
+    placements = []
+    missing = 0
+    for heading, snippet in entries:
+        if snippet is None or not snippet.exists():
+            print(f"  [MISS] {heading} — no snippet {snippet.name if snippet else '(engraving failed)'}.")
+            missing += 1
+            continue
+        if snippet not in readers:
+            readers[snippet] = PdfReader(snippet).pages[0]
+        box = readers[snippet].mediabox
+        scale = min(1.0, width / float(box.width))
+        height = float(box.height) * scale
+        needed = HEADING_SIZE + HEADING_GAP + height
+        if y - needed < MARGIN and y < H - MARGIN:
+            c.showPage()
+            y = H - MARGIN
+        c.setFont("Helvetica-Bold", HEADING_SIZE)
+        c.drawString(MARGIN, y - HEADING_SIZE, heading)
+        y -= HEADING_SIZE + HEADING_GAP + height
+        placements.append((c.getPageNumber() - 1, snippet, MARGIN - float(box.left) * scale, y - float(box.bottom) * scale, scale))
+        y -= PAIR_GAP
+    c.save()
+
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(buffer.getvalue())))
+    for page_index, snippet, x, y, scale in placements:
+        transform = Transformation().scale(scale, scale).translate(x, y)
+        writer.pages[page_index].merge_transformed_page(readers[snippet], transform)
+    tmp = outfile.with_name(outfile.name + ".tmp")
+    with open(tmp, "wb") as f:
+        writer.write(f)
+    os.replace(tmp, outfile)
+    return missing
+
+
+def compose_chapters(args, specs, out_dir: Path, snippets) -> list:
+    """Write the by-key and/or by-scale chapter PDFs for ``specs`` into ``out_dir``."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    readers = {}
+    written = []
+    chapters = []
+    if args.sections in ("key", "both"):
+        for spec in specs:
+            entries = [(scale[0], snippets.get((scale[0], spec[2]))) for scale in SCALES]
+            outfile = out_dir / f"jazz_scales_abjad_{sanitize_key_for_filename(spec[2])}.pdf"
+            chapters.append((TITLE_BASE.format(key=spec[2]), entries, outfile))
+    if args.sections in ("scale", "both"):
+        for scale in SCALES:
+            entries = [(f"Key of {spec[2]}", snippets.get((scale[0], spec[2]))) for spec in specs]
+            outfile = out_dir / f"jazz_scales_byscale_{scale_slug(scale[0])}.pdf"
+            chapters.append((SCALE_TITLE_BASE.format(scale=scale[0]), entries, outfile))
+    for title, entries, outfile in chapters:
+        with span(f"compose {outfile.stem}", cat="chapter"):
+            missing = compose_chapter(title, entries, outfile, args.author, args.license, readers)
+        status = "OK " if not missing else "MISS"
+        print(f"  [{status}] {outfile}")
+        written.append(outfile)
+    return written
+
+
+def run(args):
+    pair_dir = args.output_dir / "pairs"
+    pair_dir.mkdir(parents=True, exist_ok=True)
+    options = {"concurrency": args.jobs, "timeout": args.timeout}
+    if not args.editions:
+        builds = [(args.output_dir, key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics), "treble", 0, "concert")]
+    else:
+        builds = []
+        for name in args.editions:
+            transpose, clef, octave, _line = EDITIONS[name]
+            builds.append((args.output_dir / name, edition_key_cycle(args, transpose), clef, octave, name))
+
+    plans = []
+    with span("engrave pairs"):
+        for out_dir, specs, clef, octave, name in builds:
+            snippets = engrave_pairs(
+                pair_dir, pair_dir / "src" / name, specs, args.anchor, args.mode, clef, octave,
+                force=args.force, **options,
+            )
+            plans.append((out_dir, specs, snippets))
+    print("\nComposing chapters:")
+    for out_dir, specs, snippets in plans:
+        compose_chapters(args, specs, out_dir, snippets)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Engrave each key x scale pair once and compose the by-key and by-scale chapter PDFs from the snippets.")
+    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for chapter PDFs; engraved pairs go to <output-dir>/pairs (default: build).")
+    ap.add_argument("--start", type=str, default="C", help="Starting key (default C).")
+    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
+    ap.add_argument("--count", type=int, default=12, help="How many keys (default 12).")
+    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style (default auto).")
+    ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring (default nearest).")
+    ap.add_argument("--mode", type=str, choices=["major", "minor"], default="major", help="Key signature mode (default major).")
+    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Author/composer name printed under each chapter title.")
+    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="License text printed in each chapter's first-page footer.")
+    ap.add_argument("--sections", type=str, choices=["key", "scale", "both"], default="both", help="Which chapters to compose: by key, by scale, or both (default: both).")
+    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
+    ap.add_argument("--editions", nargs="+", choices=list(EDITIONS), default=None, help="Compose these instrument editions into <output-dir>/<edition>/ (default: one concert-pitch build in <output-dir>).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--timeout", type=float, default=None, help="Kill a lilypond run after this many seconds (default: no limit).")
+    ap.add_argument("--force", action="store_true", help="Re-engrave every pair, even if its source is unchanged.")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    if args.start not in NAME_TO_PC:
+        raise SystemExit(f"Unknown start key: {args.start}")
+
+    with profiled(args.profile, "jazz_scales.compose"):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 """Generate a styled cover page PDF for the Jazz Scales book."""
 
 import argparse
-from datetime import date
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from jazz_common.profile import profiled, span
+
+from .editions import EDITIONS
 
 TITLE = "JAZZ SCALES"
 SUBTITLE = "Practice Book"
@@ -15,45 +24,116 @@ ORG = "Loyola University Chicago"
 URL = "https://gkt.sh"
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Generate the PDF cover for the jazz scales book.")
-    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for generated cover.pdf (default: build).")
-    args = ap.parse_args()
-    args.output_dir.mkdir(parents=True, exist_ok=True)
+def build_date(value: str | None) -> date:
+    """The date printed on the cover: ``--date``, else ``SOURCE_DATE_EPOCH``, else today."""
+    if value:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise SystemExit(f"Invalid --date {value!r}: expected YYYY-MM-DD")
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        try:
+            return datetime.fromtimestamp(int(epoch), tz=timezone.utc).date()
+        except (ValueError, OverflowError, OSError):
+            raise SystemExit(f"Invalid SOURCE_DATE_EPOCH {epoch!r}: expected seconds since 1970-01-01")
+    return date.today()
 
-    w, h = 8.5, 11
-    fig = plt.figure(figsize=(w, h))
-    ax = plt.axes([0, 0, 1, 1])
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    ax.axis("off")
-    ax.add_patch(plt.Rectangle((0, 0), 1, 1, color="#0f1320"))
+
+def cover_fingerprint(compiled: date, line: str) -> str:
+    """Hash of everything that affects the cover: its text, the date, and this module's code."""
+    inputs = {
+        "text": [TITLE, SUBTITLE, line, AUTHOR, ROLE, ORG, URL],
+        "date": compiled.isoformat(),
+        "code": hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def draw_cover(cover_path: Path, compiled: date, line: str):
+    # Layout is in page fractions (0..1 on each axis) scaled to points.
+    W, H = letter
+    c = canvas.Canvas(str(cover_path), pagesize=letter, invariant=1)
+    c.setTitle(f"{TITLE.title()} {SUBTITLE}")
+    c.setAuthor(AUTHOR)
+
+    c.setFillColor(HexColor("#0f1320"))
+    c.rect(0, 0, W, H, stroke=0, fill=1)
 
     y0, gap = 0.64, 0.015
+    c.setStrokeColor(HexColor("#6b7796"))
+    c.setStrokeAlpha(0.55)
+    c.setLineWidth(2.2)
     for i in range(5):
-        ax.plot([0.08, 0.92], [y0 - i * gap, y0 - i * gap], lw=2.2, color="#6b7796", alpha=0.55)
+        c.line(0.08 * W, (y0 - i * gap) * H, 0.92 * W, (y0 - i * gap) * H)
+
     note_xs = [0.18, 0.27, 0.36, 0.45, 0.54]
     note_ys = [y0 - gap * 0.5, y0 - gap * 1.5, y0 - gap * 1.0, y0 - gap * 2.0, y0 - gap * 1.5]
+    r = 0.012
+    c.setFillColor(HexColor("#a4c2f4"))
     for x, y in zip(note_xs, note_ys):
-        ax.add_patch(plt.Circle((x, y), 0.012, color="#a4c2f4"))
-    ax.plot([note_xs[0] - 0.01, note_xs[-1] + 0.02], [note_ys[0] + 0.035, note_ys[-1] + 0.035], lw=6, color="#a4c2f4", alpha=0.85)
+        c.ellipse((x - r) * W, (y - r) * H, (x + r) * W, (y + r) * H, stroke=0, fill=1)
+    c.setStrokeColor(HexColor("#a4c2f4"))
+    c.setStrokeAlpha(0.85)
+    c.setLineWidth(6)
+    c.line((note_xs[0] - 0.01) * W, (note_ys[0] + 0.035) * H, (note_xs[-1] + 0.02) * W, (note_ys[-1] + 0.035) * H)
+    c.setStrokeAlpha(1)
 
-    ax.text(0.08, 0.78, TITLE, fontsize=46, weight="bold", color="#ecf1ff")
-    ax.text(0.08, 0.73, SUBTITLE, fontsize=28, weight="bold", color="#aab8db")
-    ax.text(0.08, 0.69, LINE, fontsize=16, color="#cbd5f0")
+    def text(x, y, string, size, color, bold=False):
+        c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+        c.setFillColor(HexColor(color))
+        c.drawString(x * W, y * H, string)
 
-    ax.text(0.08, 0.235, AUTHOR, fontsize=18, weight="bold", color="#e7ecff")
-    ax.text(0.08, 0.212, ROLE, fontsize=14, color="#cbd5f0")
-    ax.text(0.08, 0.194, ORG, fontsize=14, color="#cbd5f0")
-    ax.text(0.08, 0.172, URL, fontsize=13, color="#9fc0ff")
+    text(0.08, 0.78, TITLE, 46, "#ecf1ff", bold=True)
+    text(0.08, 0.73, SUBTITLE, 28, "#aab8db", bold=True)
+    text(0.08, 0.69, line, 16, "#cbd5f0")
 
-    today = date.today().strftime("%B %d, %Y")
-    ax.text(0.08, 0.14, f"Compiled {today}", fontsize=12, color="#9fb0d8")
+    text(0.08, 0.235, AUTHOR, 18, "#e7ecff", bold=True)
+    text(0.08, 0.212, ROLE, 14, "#cbd5f0")
+    text(0.08, 0.194, ORG, 14, "#cbd5f0")
+    text(0.08, 0.172, URL, 13, "#9fc0ff")
 
-    ax.add_patch(plt.Rectangle((0, 0.04), 1, 0.03, color="#24314b"))
-    cover_path = args.output_dir / "cover.pdf"
-    fig.savefig(cover_path, format="pdf")
+    text(0.08, 0.14, f"Compiled {compiled.strftime('%B %d, %Y')}", 12, "#9fb0d8")
+
+    c.setFillColor(HexColor("#24314b"))
+    c.rect(0, 0.04 * H, W, 0.03 * H, stroke=0, fill=1)
+    c.save()
+
+
+def render_cover(output_dir: Path, compiled: date, line: str = LINE, force: bool = False) -> Path:
+    """Write ``cover.pdf`` unless an identical one (same inputs) is already there."""
+    cover_path = output_dir / "cover.pdf"
+    stamp_path = output_dir / "cover.pdf.inputs"
+    fingerprint = cover_fingerprint(compiled, line)
+    if not force and cover_path.exists() and stamp_path.exists() and stamp_path.read_text().strip() == fingerprint:
+        print("Up to date", cover_path)
+        return cover_path
+
+    with span("draw cover"):
+        draw_cover(cover_path, compiled, line)
+    stamp_path.write_text(fingerprint + "\n")
     print("Wrote", cover_path)
+    return cover_path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate the PDF cover for the jazz scales book.")
+    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for generated cover.pdf (default: build).")
+    ap.add_argument("--date", type=str, default=None, help="Build date printed on the cover, YYYY-MM-DD (default: $SOURCE_DATE_EPOCH, else today).")
+    ap.add_argument("--force", action="store_true", help="Re-render even if cover.pdf is up to date.")
+    ap.add_argument("--editions", nargs="+", choices=list(EDITIONS), default=None, help="Write one cover per edition into <output-dir>/<edition>/, naming the instruments on each.")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    compiled = build_date(args.date)
+
+    with profiled(args.profile, "jazz_scales.cover"):
+        if not args.editions:
+            render_cover(args.output_dir, compiled, force=args.force)
+        for name in args.editions or []:
+            edition_dir = args.output_dir / name
+            edition_dir.mkdir(parents=True, exist_ok=True)
+            render_cover(edition_dir, compiled, line=EDITIONS[name][3], force=args.force)
 
 
 if __name__ == "__main__":
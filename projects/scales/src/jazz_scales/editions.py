@@ -0,0 +1,12 @@
+"""Printed editions of the scales book for C and transposing instruments.
+
+Each edition maps to ``(semitones written above concert pitch, clef, octave
+shift, cover line)``. Editions are written into ``<output-dir>/<name>/``.
+"""
+
+EDITIONS = {
+    "C": (0, "treble", 0, "C instruments"),
+    "Bb": (2, "treble", 0, "Bb instruments"),
+    "Eb": (9, "treble", 0, "Eb instruments"),
+    "bass": (0, "bass", -1, "Bass clef instruments"),
+}
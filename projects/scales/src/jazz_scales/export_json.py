@@ -3,86 +3,111 @@
 This is the data contract between the Python music model (the single source of
 truth) and the interactive web app: it emits fully-resolved note data so the
 TypeScript side renders and plays without duplicating any music theory.
+Beside it, ``pcsets.json`` carries every scale in every key as a 12-bit
+pitch-class mask so the app can answer "which scales contain these notes?" with
+a bitwise AND per entry.
 """
 
 import argparse
 import json
 from pathlib import Path
 
-from jazz_common.pitch import (
-    FLAT_NAMES,
-    NAME_TO_PC,
-    SHARP_NAMES,
-    key_cycle,
-)
-
-from .generator import (
-    SCALES,
-    pc_to_register_offset,
-    scale_slug,
-    transpose_chord_text,
-    transpose_scale_notes,
-)
-
-# abjad NumberedPitch 0 == middle C == MIDI 60.
-MIDDLE_C_MIDI = 60
-
-
-def note_from_midi(midi: int, prefer: str) -> dict:
-    pc = midi % 12
-    flat_spelled = FLAT_NAMES[pc]
-    sharp_spelled = SHARP_NAMES[pc]
-    spelled = flat_spelled if prefer == "flats" else sharp_spelled
-    return {
-        "name": spelled[0],
-        "accidental": spelled[1:],  # "", "#", or "b"
-        "octave": midi // 12 - 1,   # scientific pitch notation
-        "midi": midi,
-        "flat_name": flat_spelled[0],
-        "flat_accidental": flat_spelled[1:],
-        "sharp_name": sharp_spelled[0],
-        "sharp_accidental": sharp_spelled[1:],
-    }
+from jazz_common.pcset import PitchClassSetIndex
+from jazz_common.pitch import NAME_TO_PC, key_cycle
+from jazz_common.profile import profiled, span
+
+from .chart import get_chart
+from .generator import SCALES, scale_slug
+from .modes import install_catalogue, parse_catalogue
+from .patterns import INTERVAL_PATTERNS, degree_count, sequence_table
+
+
+def chart_data(scale, spec, anchor: str) -> dict:
+    """One resolved chart: ``scale`` (a ``SCALES`` entry) in the key ``spec`` from ``key_cycle``."""
+    return get_chart(scale, spec, anchor).record
 
 
 def build_data(start: str, step: int, count: int, prefer_arg: str, anchor: str, extras: bool = True) -> dict:
     keys = []
     charts = []
-    for pc, prefer, key_name in key_cycle(start, step, count, prefer_arg, extras=extras):
-        keys.append(key_name)
-        semitone_offset = pc_to_register_offset(pc, anchor)
-        for scale_name, notes_spec, intervals, chord_text_c in SCALES:
-            pitches = transpose_scale_notes(notes_spec, semitone_offset)
-            charts.append({
-                "key": key_name,
-                "scale": scale_name,
-                "chord": transpose_chord_text(chord_text_c, key_name),
-                "intervals": list(intervals),
-                "notes": [note_from_midi(p.number() + MIDDLE_C_MIDI, prefer) for p in pitches],
-            })
+    for spec in key_cycle(start, step, count, prefer_arg, extras=extras):
+        keys.append(spec[2])
+        with span(f"key {spec[2]}", cat="key"):
+            for scale in SCALES:
+                charts.append(chart_data(scale, spec, anchor))
 
     scales_meta = [{"name": name, "slug": scale_slug(name)} for name, *_ in SCALES]
-    return {"keys": keys, "scales": scales_meta, "charts": charts}
+    return {"keys": keys, "scales": scales_meta, "charts": charts, **build_pattern_data(charts)}
+
+
+def build_pattern_data(charts) -> dict:
+    """``INTERVAL_PATTERNS`` and their degree-index sequences per scale degree count, for the web app."""
+    counts = sorted({degree_count([note["midi"] for note in chart["notes"]]) for chart in charts})
+    return {
+        "patterns": [{"id": pattern_id, "label": label, "skip": skip} for pattern_id, label, skip in INTERVAL_PATTERNS],
+        "sequences": {
+            str(m): {pattern_id: row for (pattern_id, _label, _skip), row in zip(INTERVAL_PATTERNS, sequence_table(m).tolist())}
+            for m in counts
+        },
+    }
 
 
-def main():
+def build_pcset_data(keys) -> dict:
+    """The ``PitchClassSetIndex`` of ``SCALES`` as JSON: ``masks[scale][root pc]`` plus key names per pc."""
+    index = PitchClassSetIndex.from_scales((name, notes) for name, notes, *_ in SCALES)
+    masks = index.masks.reshape(len(SCALES), 12).tolist()
+    names_by_pc = [[] for _ in range(12)]
+    for key in keys:
+        names_by_pc[NAME_TO_PC[key]].append(key)
+    same_notes = [[list(divmod(i, 12)) for i in entries] for entries in index.same_notes().values()]
+    return {
+        "bits": "bit n (value 1 << n) is pitch class n, C = 0",
+        "scales": [scale_slug(name) for name, *_ in SCALES],
+        "keys": names_by_pc,
+        "masks": masks,
+        "same_notes": same_notes,
+    }
+
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Export resolved scale charts as JSON for the web app.")
     ap.add_argument("--output", type=Path, required=True, help="Path to write scales.json.")
+    ap.add_argument("--pcsets", type=Path, default=None, help="Path to write the pitch-class set index (default: pcsets.json beside --output).")
     ap.add_argument("--start", type=str, default="C", help="Starting key (default C).")
     ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
     ap.add_argument("--count", type=int, default=12, help="How many keys (default 12).")
     ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style (default auto).")
     ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring (default nearest).")
     ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
-    args = ap.parse_args()
+    ap.add_argument("--catalogue", nargs="+", default=None, metavar="SOURCE", help="Export a derived catalogue instead of SCALES: scales, modes, sets:N, sets:N:modes (see jazz_scales.modes).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
 
     if args.start not in NAME_TO_PC:
         raise SystemExit(f"Unknown start key: {args.start}")
-
-    data = build_data(args.start, args.step, args.count, args.prefer, args.anchor, extras=not args.no_enharmonics)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    if args.catalogue:
+        try:
+            parse_catalogue(args.catalogue)
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    with profiled(args.profile, "jazz_scales.export_json"):
+        if args.catalogue:
+            with span("install_catalogue"):
+                install_catalogue(args.catalogue, SCALES)
+        with span("build_data"):
+            data = build_data(args.start, args.step, args.count, args.prefer, args.anchor, extras=not args.no_enharmonics)
+        with span("write json"):
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        with span("build_pcset_data"):
+            pcsets = build_pcset_data(data["keys"])
+        pcsets_path = args.pcsets or args.output.with_name("pcsets.json")
+        with span("write pcsets json"):
+            pcsets_path.parent.mkdir(parents=True, exist_ok=True)
+            pcsets_path.write_text(json.dumps(pcsets, indent=2) + "\n", encoding="utf-8")
     print(f"Wrote {args.output} ({len(data['charts'])} charts, {len(data['keys'])} keys)")
+    print(f"Wrote {pcsets_path} ({len(pcsets['scales'])} scales x 12 pitch-class sets)")
 
 
 if __name__ == "__main__":
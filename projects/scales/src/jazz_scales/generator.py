@@ -1,36 +1,47 @@
 """Generate multi-key jazz scale charts with forward and retrograde systems."""
 
 import argparse
+import inspect
 import re
+import time
+from functools import partial
 from pathlib import Path
 
 import abjad
 
-from jazz_common.lilypond import compile_with_lilypond
+from jazz_common.lilypond import compile_deduplicated, compile_many, compile_with_lilypond, print_progress, write_ly_incrementally
+from jazz_common.profile import profiled, span
+from jazz_common.shard import parse_shard, select, write_manifest
+from jazz_common.store import ArtifactStore
+from jazz_common.watch import watch_charts
+from jazz_common.workers import run_calls
 from jazz_common.pitch import (
     NAME_TO_PC,
+    auto_prefer_for_pc,
     key_cycle,
-    numbered_pitch_from_name,
     pc_to_lily_key,
     pc_to_name,
     sanitize_key_for_filename,
 )
 
+from .catalogue import CATALOGUE_PATH, load_scales
+from .chart import get_chart
+from .editions import EDITIONS
+from .modes import install_catalogue, parse_catalogue
+from .patterns import PATTERN_IDS, PATTERN_LABELS, sequence_table
+
 TITLE_BASE = "Common Jazz Scales in Key of {key}"
+SCALE_TITLE_BASE = "{scale} — All Keys"
+PATTERN_TITLE_BASE = "{scale} in {pattern} — All Keys"
 SYSTEM_DISTANCE = 24
 TOP_SYSTEM_DISTANCE = 18
 # Minimum clear gap (staff-spaces) between adjacent systems' skylines, so the
 # step labels below one system never collide with the markups above the next.
 SYSTEM_PADDING = 7
-
-
-def pc_to_register_offset(pc: int, anchor: str) -> int:
-    pc %= 12
-    if anchor == "up":
-        return pc
-    if anchor == "down":
-        return pc - (12 if pc else 0)
-    return pc if pc <= 5 else pc - 12
+# Reloaded (in this order) when --watch sees an edit to any of their sources.
+WATCH_MODULES = ("jazz_common.pitch", "jazz_common.lilypond", "jazz_scales.catalogue", "jazz_scales.patterns", "jazz_scales.chart", "jazz_scales.modes", "jazz_scales.generator")
+# Imported once by the forkserver that --workers processes are forked from.
+WORKER_PRELOAD = ("abjad", "numpy", "jazz_common.lilypond", "jazz_scales.chart", "jazz_scales.editions", "jazz_scales.modes", "jazz_scales.generator")
 
 
 def scale_slug(name: str) -> str:
@@ -38,112 +49,19 @@ def scale_slug(name: str) -> str:
     return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
 
 
-SCALES = [
-    ("Major (Ionian)", ["C", "D", "E", "F", "G", "A", "B", "C5"], ["W", "W", "H", "W", "W", "W", "H"], "Cmaj7"),
-    ("Natural Minor (Aeolian)", ["C", "D", "Eb", "F", "G", "Ab", "Bb", "C5"], ["W", "H", "W", "W", "H", "W", "W"], "Cm7"),
-    ("Harmonic Minor", ["C", "D", "Eb", "F", "G", "Ab", "B", "C5"], ["W", "H", "W", "W", "H", "W+H", "H"], "Cm(maj7)"),
-    ("Melodic Minor (Jazz)", ["C", "D", "Eb", "F", "G", "A", "B", "C5"], ["W", "H", "W", "W", "W", "W", "H"], "Cm(maj7)"),
-    ("Dominant 7th (Mixolydian)", ["C", "D", "E", "F", "G", "A", "Bb", "C5"], ["W", "W", "H", "W", "W", "H", "W"], "C7"),
-    ("Dorian", ["C", "D", "Eb", "F", "G", "A", "Bb", "C5"], ["W", "H", "W", "W", "W", "H", "W"], "Cm7"),
-    ("Phrygian", ["C", "Db", "Eb", "F", "G", "Ab", "Bb", "C5"], ["H", "W", "W", "W", "H", "W", "W"], "Cm7(b9)"),
-    ("Lydian", ["C", "D", "E", "F#", "G", "A", "B", "C5"], ["W", "W", "W", "H", "W", "W", "H"], "Cmaj7(#11)"),
-    ("Locrian", ["C", "Db", "Eb", "F", "Gb", "Ab", "Bb", "C5"], ["H", "W", "W", "H", "W", "W", "W"], "Cm7b5"),
-    ("Half-Dim #2 (Locrian ♮2)", ["C", "D", "Eb", "F", "Gb", "Ab", "Bb", "C5"], ["W", "H", "W", "H", "W", "W", "W"], "Cm7b5"),
-    ("Whole Tone", ["C", "D", "E", "F#", "G#", "A#", "C5"], ["W", "W", "W", "W", "W", "W"], "C7(#5)"),
-    ("Octatonic (Half–Whole)", ["C", "Db", "Eb", "E", "F#", "G", "A", "Bb"], ["H", "W", "H", "W", "H", "W", "H"], "C7(b9)"),
-    ("Octatonic (Whole–Half)", ["C", "D", "Eb", "F", "Gb", "Ab", "A", "B"], ["W", "H", "W", "H", "W", "H", "W"], "Cdim7"),
-    ("Blues (major)", ["C", "D", "Eb", "E", "G", "A", "C5"], ["W", "H", "H", "m3", "W", "W+H"], "C6"),
-    ("Blues (minor)", ["C", "Eb", "F", "Gb", "G", "Bb", "C5"], ["m3", "W", "H", "H", "m3", "W"], "Cm7"),
-    ("Pentatonic Major", ["C", "D", "E", "G", "A", "C5"], ["W", "W", "W+H", "W", "W+H"], "C6"),
-    ("Pentatonic Minor", ["C", "Eb", "F", "G", "Bb", "C5"], ["W+H", "W", "W", "W+H", "W"], "Cm"),
-    ("Altered", ["C", "Db", "Eb", "E", "Gb", "Ab", "Bb", "C5"], ["H", "W", "H", "W", "W", "W", "W"], "C7alt"),
-    ("Lydian Dominant", ["C", "D", "E", "F#", "G", "A", "Bb", "C5"], ["W", "W", "W", "H", "W", "H", "W"], "C7(#11)"),
-    ("Bebop Dominant", ["C", "D", "E", "F", "G", "A", "Bb", "B"], ["W", "W", "H", "W", "W", "H", "H"], "C7"),
-    ("Mixolydian b6", ["C", "D", "E", "F", "G", "Ab", "Bb", "C5"], ["W", "W", "H", "W", "H", "W", "W"], "C7(b13)"),
-    ("Minor Pentatonic b5", ["C", "Eb", "F", "Gb", "Bb", "C5"], ["m3", "W", "H", "M3", "W"], "Cm7(b5)"),
-    ("Dorian b2", ["C", "Db", "Eb", "F", "G", "A", "Bb", "C5"], ["H", "W", "W", "W", "W", "H", "W"], "Cm7(b9)"),
-    ("Bebop Major", ["C", "D", "E", "F", "G", "Ab", "A", "B"], ["W", "W", "H", "W", "H", "H", "W"], "Cmaj7"),
-    ("Lydian Augmented", ["C", "D", "E", "F#", "G#", "A", "B", "C5"], ["W", "W", "W", "W", "H", "W", "H"], "Cmaj7(#5)"),
-    ("Dominant Pentatonic", ["C", "D", "E", "G", "Bb", "C5"], ["W", "W", "W+H", "W+H", "W"], "C7"),
-]
-
-
-def transpose_scale_notes(notes_spec, semitone_offset):
-    return [abjad.NumberedPitch(numbered_pitch_from_name(n).number() + semitone_offset) for n in notes_spec]
-
-
-def transpose_chord_text(chord_text_c_root: str, key_name: str) -> str:
-    return key_name + chord_text_c_root[1:]
-
-
-def format_pitch_for_key(pitch, prefer_names: str) -> str:
-    named_pitch = abjad.NamedPitch(pitch.name()).respell(prefer_names)
-    return named_pitch.name()
-
-
-def make_bar(pitches, intervals, chord_text, scale_name, prefer_names: str):
-    leaves = [abjad.Note(f"{format_pitch_for_key(p, prefer_names)}8") for p in pitches]
-    while len(leaves) < 8:
-        leaves.append(abjad.Rest("r8"))
-    container = abjad.Container(leaves)
-
-    pitched = [leaf for leaf in abjad.select.leaves(container) if isinstance(leaf, abjad.Note)]
-    if len(pitched) >= 2:
-        abjad.beam(pitched)
-
-    first_leaf = abjad.select.leaf(container, 0)
-    abjad.attach(abjad.Markup(f'"{scale_name}"'), first_leaf, direction=abjad.UP)
-    if chord_text:
-        abjad.attach(abjad.Markup(f'"{chord_text}"'), first_leaf, direction=abjad.UP)
-
-    i = 0
-    for leaf in abjad.select.leaves(container):
-        if isinstance(leaf, abjad.Note):
-            label = "-" if i == 0 else (intervals[i - 1] if i - 1 < len(intervals) else "")
-            if label:
-                abjad.attach(abjad.Markup(f'"{label}"'), leaf, direction=abjad.DOWN)
-            i += 1
-    return container
-
-
-def make_retrograde_bar(pitches, intervals, chord_text, scale_name, prefer_names: str):
-    reversed_pitches = list(reversed(pitches))
-    reversed_intervals = list(reversed(intervals))
-    leaves = [abjad.Note(f"{format_pitch_for_key(p, prefer_names)}8") for p in reversed_pitches]
-    while len(leaves) < 8:
-        leaves.append(abjad.Rest("r8"))
-    container = abjad.Container(leaves)
-
-    pitched = [leaf for leaf in abjad.select.leaves(container) if isinstance(leaf, abjad.Note)]
-    if len(pitched) >= 2:
-        abjad.beam(pitched)
-
-    first_leaf = abjad.select.leaf(container, 0)
-    abjad.attach(abjad.Markup(f'"{scale_name} - Retrograde"'), first_leaf, direction=abjad.UP)
-    if chord_text:
-        abjad.attach(abjad.Markup(f'"{chord_text}"'), first_leaf, direction=abjad.UP)
-
-    i = 0
-    for leaf in abjad.select.leaves(container):
-        if isinstance(leaf, abjad.Note):
-            label = "-" if i == 0 else (reversed_intervals[i - 1] if i - 1 < len(reversed_intervals) else "")
-            if label:
-                abjad.attach(abjad.Markup(f'"{label}"'), leaf, direction=abjad.DOWN)
-            i += 1
-    return container
-
-
-def build_score_for_key(pc: int, prefer_names: str, anchor: str, mode: str, bpm: int):
+# The catalogue lives in data/scales.json (see jazz_scales.catalogue). A list,
+# so alternative catalogues can be installed in place for every importer.
+SCALES = load_scales()
+
+
+def build_score_for_key(pc: int, prefer_names: str, anchor: str, mode: str, bpm: int, clef: str = "treble", octave: int = 0):
     key_name = pc_to_name(pc, prefer_names)
     lily_key = pc_to_lily_key(pc, prefer_names)
-    semitone_offset = pc_to_register_offset(pc, anchor)
+    spec = (pc, prefer_names, key_name)
 
     voice = abjad.Voice(name="Music")
-    for scale_name, notes, intervals, chord_text_c in SCALES:
-        pitches = transpose_scale_notes(notes, semitone_offset)
-        chord_text = transpose_chord_text(chord_text_c, key_name)
-        bar = make_bar(pitches, intervals, chord_text, scale_name, prefer_names)
-        retrograde_bar = make_retrograde_bar(pitches, intervals, chord_text, scale_name, prefer_names)
+    for scale in SCALES:
+        bar, retrograde_bar = get_chart(scale, spec, anchor, octave).bars(scale[0])
         voice.append(bar)
         voice.append(retrograde_bar)
         last_leaf = abjad.select.leaf(retrograde_bar, -1)
@@ -152,7 +70,7 @@ def build_score_for_key(pc: int, prefer_names: str, anchor: str, mode: str, bpm:
     staff = abjad.Staff([voice], name="Staff")
     first_leaf = abjad.select.leaf(staff, 0)
     abjad.attach(abjad.TimeSignature((4, 4)), first_leaf)
-    abjad.attach(abjad.Clef("treble"), first_leaf)
+    abjad.attach(abjad.Clef(clef), first_leaf)
     abjad.attach(abjad.LilyPondLiteral(rf"\key {lily_key} \{mode}"), first_leaf)
     if bpm:
         abjad.attach(abjad.MetronomeMark(abjad.Duration(1, 4), bpm), first_leaf)
@@ -162,8 +80,53 @@ def build_score_for_key(pc: int, prefer_names: str, anchor: str, mode: str, bpm:
     return score, title, key_name
 
 
-def build_movements_for_scale(scale, specs, anchor: str, mode: str, bpm: int):
-    """Build one self-contained movement (score) per key for a single scale.
+def build_pair_score(scale, spec, anchor: str, mode: str, bpm: int, label: str, clef: str = "treble", octave: int = 0):
+    """One two-measure score (forward + retrograde) for ``scale`` in the key ``spec``.
+
+    ``spec`` is a ``(pc, prefer, name)`` entry from ``key_cycle`` and ``label`` the
+    text printed above each bar. A tempo mark is attached only when ``bpm`` is set.
+    ``octave`` shifts the anchored register (e.g. -1 for the bass clef edition).
+    """
+    pc, prefer_names, _key_name = spec
+    lily_key = pc_to_lily_key(pc, prefer_names)
+    bar, retrograde_bar = get_chart(scale, spec, anchor, octave).bars(label)
+
+    voice = abjad.Voice([bar, retrograde_bar], name="Music")
+    staff = abjad.Staff([voice], name="Staff")
+    first_leaf = abjad.select.leaf(staff, 0)
+    abjad.attach(abjad.TimeSignature((4, 4)), first_leaf)
+    abjad.attach(abjad.Clef(clef), first_leaf)
+    abjad.attach(abjad.LilyPondLiteral(rf"\key {lily_key} \{mode}"), first_leaf)
+    if bpm:
+        abjad.attach(abjad.MetronomeMark(abjad.Duration(1, 4), bpm), first_leaf)
+    return abjad.Score([staff], name="Score")
+
+
+def build_pattern_score(scale, spec, pattern_id: str, anchor: str, mode: str, bpm: int, label: str, clef: str = "treble", octave: int = 0):
+    """Like ``build_pair_score``, with the two measures holding the ``pattern_id`` phrase."""
+    pc, prefer_names, _key_name = spec
+    lily_key = pc_to_lily_key(pc, prefer_names)
+    bars = get_chart(scale, spec, anchor, octave).pattern_bars(pattern_id, label)
+
+    voice = abjad.Voice(list(bars), name="Music")
+    staff = abjad.Staff([voice], name="Staff")
+    first_leaf = abjad.select.leaf(staff, 0)
+    abjad.attach(abjad.TimeSignature((4, 4)), first_leaf)
+    abjad.attach(abjad.Clef(clef), first_leaf)
+    abjad.attach(abjad.LilyPondLiteral(rf"\key {lily_key} \{mode}"), first_leaf)
+    if bpm:
+        abjad.attach(abjad.MetronomeMark(abjad.Duration(1, 4), bpm), first_leaf)
+    return abjad.Score([staff], name="Score")
+
+
+def iter_pattern_movements(scale, pattern_id: str, specs, anchor: str, mode: str, bpm: int, clef: str = "treble", octave: int = 0):
+    """One movement per key of ``scale`` played in the ``pattern_id`` phrase (see ``iter_movements_for_scale``)."""
+    for index, spec in enumerate(specs):
+        yield build_pattern_score(scale, spec, pattern_id, anchor, mode, bpm if index == 0 else 0, f"Key of {spec[2]}", clef, octave)
+
+
+def iter_movements_for_scale(scale, specs, anchor: str, mode: str, bpm: int, clef: str = "treble", octave: int = 0):
+    """Yield one self-contained movement (score) per key for a single scale.
 
     ``specs`` is the resolved ``(pc, prefer, name)`` list from ``key_cycle`` —
     the same order used for the per-key chapters, so by-scale and by-key
@@ -174,35 +137,17 @@ def build_movements_for_scale(scale, specs, anchor: str, mode: str, bpm: int):
     each key self-contained and avoids the courtesy key-change LilyPond would
     otherwise print at the end of the previous line when the key changes.
     """
-    scale_name, notes, intervals, chord_text_c = scale
-
-    movements = []
-    for index, (pc, prefer_names, key_name) in enumerate(specs):
-        lily_key = pc_to_lily_key(pc, prefer_names)
-        semitone_offset = pc_to_register_offset(pc, anchor)
+    for index, spec in enumerate(specs):
+        yield build_pair_score(scale, spec, anchor, mode, bpm if index == 0 else 0, f"Key of {spec[2]}", clef, octave)
 
-        pitches = transpose_scale_notes(notes, semitone_offset)
-        chord_text = transpose_chord_text(chord_text_c, key_name)
-        system_label = f"Key of {key_name}"
-        bar = make_bar(pitches, intervals, chord_text, system_label, prefer_names)
-        retrograde_bar = make_retrograde_bar(pitches, intervals, chord_text, system_label, prefer_names)
 
-        voice = abjad.Voice([bar, retrograde_bar], name="Music")
-        staff = abjad.Staff([voice], name="Staff")
-        first_leaf = abjad.select.leaf(staff, 0)
-        abjad.attach(abjad.TimeSignature((4, 4)), first_leaf)
-        abjad.attach(abjad.Clef("treble"), first_leaf)
-        abjad.attach(abjad.LilyPondLiteral(rf"\key {lily_key} \{mode}"), first_leaf)
-        if bpm and index == 0:
-            abjad.attach(abjad.MetronomeMark(abjad.Duration(1, 4), bpm), first_leaf)
-
-        movements.append(abjad.Score([staff], name="Score"))
-
-    title = f"{scale_name} — All Keys"
-    return movements, title
+def build_movements_for_scale(scale, specs, anchor: str, mode: str, bpm: int):
+    """All movements for ``scale`` as a list, plus the chapter title."""
+    movements = list(iter_movements_for_scale(scale, specs, anchor, mode, bpm))
+    return movements, SCALE_TITLE_BASE.format(scale=scale[0])
 
 
-def write_lilypond(score, title: str, outfile: str, make_pdf: bool = False, author: str | None = None, license_text: str | None = None, midi: bool = False):
+def write_lilypond(score, title: str, outfile: str, make_pdf: bool = False, author: str | None = None, license_text: str | None = None, midi: bool = False, compile_now: bool = True):
     header_items = [rf'title = \markup {{ \bold "{title}" }}']
     if author:
         header_items.append(rf'composer = "{author}"')
@@ -223,8 +168,8 @@ def write_lilypond(score, title: str, outfile: str, make_pdf: bool = False, auth
     if midi:
         score_block.items.append(abjad.Block("midi"))
 
-    lily = abjad.LilyPondFile(items=[header, paper, score_block])
-    abjad.persist.as_ly(lily, outfile)
+    with span("write_ly_incrementally"):
+        write_ly_incrementally([header, paper, score_block], outfile)
 
     result = {
         "ly_path": str(outfile),
@@ -236,13 +181,18 @@ def write_lilypond(score, title: str, outfile: str, make_pdf: bool = False, auth
         "stdout_tail": "",
         "stderr_tail": "",
     }
-    if make_pdf or midi:
+    # Batch callers pass compile_now=False and compile later (``midi`` still adds the \midi block).
+    if compile_now and (make_pdf or midi):
         result.update(compile_with_lilypond(Path(outfile), want_pdf=make_pdf, want_midi=midi))
     return result
 
 
 def write_lilypond_movements(scores, title: str, outfile: str, make_pdf: bool = False, author: str | None = None, license_text: str | None = None):
-    """Write multiple scores (movements) into one LilyPond file, each self-contained."""
+    """Write multiple scores (movements) into one LilyPond file, each self-contained.
+
+    ``scores`` may be a generator: each movement is formatted and flushed to disk
+    before the next is built, so memory stays flat as chapters grow.
+    """
     header_items = [rf'title = \markup {{ \bold "{title}" }}']
     if author:
         header_items.append(rf'composer = "{author}"')
@@ -265,15 +215,17 @@ def write_lilypond_movements(scores, title: str, outfile: str, make_pdf: bool =
         ],
     )
 
-    items = [header, paper]
-    for score in scores:
-        # ragged-right = ##f forces each single-system movement to justify to full
-        # page width (LilyPond leaves single-system scores ragged by default).
-        layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0", "ragged-right = ##f"])
-        items.append(abjad.Block("score", items=[score, layout_block]))
+    def items():
+        yield header
+        yield paper
+        for score in scores:
+            # ragged-right = ##f forces each single-system movement to justify to full
+            # page width (LilyPond leaves single-system scores ragged by default).
+            layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0", "ragged-right = ##f"])
+            yield abjad.Block("score", items=[score, layout_block])
 
-    lily = abjad.LilyPondFile(items=items)
-    abjad.persist.as_ly(lily, outfile)
+    with span("write_ly_incrementally"):
+        write_ly_incrementally(items(), outfile)
 
     result = {
         "ly_path": str(outfile),
@@ -290,68 +242,213 @@ def write_lilypond_movements(scores, title: str, outfile: str, make_pdf: bool =
     return result
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Generate jazz scale charts in multiple keys.")
-    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
-    ap.add_argument("--count", type=int, default=12, help="How many keys to generate (default 12).")
-    ap.add_argument("--start", type=str, default="C", help="Starting key (e.g., C, F#, Gb, Bb).")
-    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style for key names & signatures (default auto).")
-    ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring around middle C (default nearest).")
-    ap.add_argument("--mode", type=str, choices=["major", "minor"], default="major", help="Key signature mode for each chart (major or minor).")
-    ap.add_argument("--pdf", action="store_true", help="Compile a PDF for each chart (runs lilypond).")
-    ap.add_argument("--midi", action="store_true", help="Also produce a .midi for each chart (runs lilypond).")
-    ap.add_argument("--bpm", type=int, default=120, help="MIDI tempo in quarter-notes per minute (default 120).")
-    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Author/composer name printed under the title.")
-    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="License text printed in the footer (copyright field).")
-    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for generated .ly/.pdf/.midi outputs (default: build).")
-    ap.add_argument("--sections", type=str, choices=["key", "scale", "both"], default="both", help="Which chapters to generate: by key, by scale, or both (default: both).")
-    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
-    args = ap.parse_args()
+def write_key_chart(args, spec, outfile: Path, clef: str, octave: int):
+    pc, prefer, name = spec
+    with span(f"key {name}", cat="key"):
+        with span("build_score_for_key"):
+            score, title, key_name = build_score_for_key(pc, prefer, args.anchor, args.mode, args.bpm, clef, octave)
+        res = write_lilypond(
+            score,
+            title,
+            str(outfile),
+            author=args.author,
+            license_text=args.license,
+            midi=args.midi,
+            compile_now=False,
+        )
+    res["label"] = f"Key {key_name}"
+    res["artifact"] = {"section": "key", "key": name}
+    return res
+
+
+def write_scale_chart(args, scale, specs, outfile: Path, clef: str, octave: int):
+    with span(f"scale {scale[0]}", cat="scale"):
+        movements = iter_movements_for_scale(scale, specs, args.anchor, args.mode, args.bpm, clef, octave)
+        title = SCALE_TITLE_BASE.format(scale=scale[0])
+        res = write_lilypond_movements(
+            movements,
+            title,
+            str(outfile),
+            author=args.author,
+            license_text=args.license,
+        )
+    res["label"] = f"Scale {scale[0]}"
+    res["artifact"] = {"section": "scale", "scale": scale[0]}
+    return res
+
+
+def write_pattern_chart(args, scale, pattern_id: str, specs, outfile: Path, clef: str, octave: int):
+    with span(f"pattern {pattern_id} {scale[0]}", cat="pattern"):
+        movements = iter_pattern_movements(scale, pattern_id, specs, args.anchor, args.mode, args.bpm, clef, octave)
+        title = PATTERN_TITLE_BASE.format(scale=scale[0], pattern=PATTERN_LABELS[pattern_id])
+        res = write_lilypond_movements(
+            movements,
+            title,
+            str(outfile),
+            author=args.author,
+            license_text=args.license,
+        )
+    res["label"] = f"Pattern {pattern_id} {scale[0]}"
+    res["artifact"] = {"section": f"pattern:{pattern_id}", "scale": scale[0]}
+    return res
+
+
+def chart_tasks(args, specs, out_dir: Path, clef: str = "treble", octave: int = 0, want_midi: bool = False):
+    """Every chart written for ``specs`` into ``out_dir``, as ``(ly_path, inputs, write, want_pdf, want_midi)``.
+
+    ``write()`` builds the chart and writes its ``.ly``, returning the result dict.
+    ``inputs`` lists everything the chart is built from (data, settings, and the
+    functions that build it); ``--watch`` fingerprints it to find the charts an
+    edit affects.
+    """
+    shared = (
+        inspect.getmodule(pc_to_name), write_ly_incrementally,
+        inspect.getmodule(get_chart), SYSTEM_DISTANCE, TOP_SYSTEM_DISTANCE,
+        args.anchor, args.mode, args.bpm, args.author, args.license, clef, octave,
+    )
+    tasks = []
+    if args.sections in ("key", "both"):
+        for spec in specs:
+            outfile = out_dir / f"jazz_scales_abjad_{sanitize_key_for_filename(spec[2])}.ly"
+            inputs = (*shared, build_score_for_key, write_lilypond, TITLE_BASE, SCALES, spec, args.midi)
+            tasks.append((outfile, inputs, partial(write_key_chart, args, spec, outfile, clef, octave), args.pdf, want_midi))
+    if args.sections in ("scale", "both"):
+        for scale in SCALES:
+            outfile = out_dir / f"jazz_scales_byscale_{scale_slug(scale[0])}.ly"
+            inputs = (*shared, build_pair_score, iter_movements_for_scale, write_lilypond_movements, SCALE_TITLE_BASE, SYSTEM_PADDING, scale, specs)
+            tasks.append((outfile, inputs, partial(write_scale_chart, args, scale, specs, outfile, clef, octave), args.pdf, False))
+    for pattern_id in selected_patterns(args):
+        for scale in SCALES:
+            outfile = out_dir / f"jazz_scales_pattern_{pattern_id}_{scale_slug(scale[0])}.ly"
+            inputs = (*shared, inspect.getmodule(sequence_table), build_pattern_score, iter_pattern_movements, write_lilypond_movements, PATTERN_TITLE_BASE, SYSTEM_PADDING, pattern_id, scale, specs)
+            tasks.append((outfile, inputs, partial(write_pattern_chart, args, scale, pattern_id, specs, outfile, clef, octave), args.pdf, False))
+    return tasks
 
-    if args.start not in NAME_TO_PC:
-        raise SystemExit(f"Unknown start key: {args.start}")
 
+def selected_patterns(args):
+    """``--patterns`` ids in ``INTERVAL_PATTERNS`` order (``all`` for every pattern)."""
+    chosen = args.patterns or []
+    return [pattern_id for pattern_id in PATTERN_IDS if pattern_id in chosen or "all" in chosen]
+
+
+def edition_key_cycle(args, transpose: int):
+    """The written keys for an edition reading ``transpose`` semitones above concert.
+
+    The concert ``key_cycle`` with its start moved by ``transpose``: the same
+    step, count, spelling preference, and enharmonic extras, in written keys.
+    """
+    pc = (NAME_TO_PC[args.start] + transpose) % 12
+    start = pc_to_name(pc, auto_prefer_for_pc(pc) if args.prefer == "auto" else args.prefer)
+    return key_cycle(start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+
+
+def all_chart_tasks(args):
+    """Charts for the concert run, or for every edition in ``--editions``.
+
+    Only concert-pitch editions collect MIDI: a transposing edition's audio would
+    sound at written pitch, and players practise along with the concert audio.
+    The ``\\midi`` block is still written everywhere so that the same written
+    chart is byte-identical, and engraved once, across editions.
+    A ``--catalogue`` is installed into ``SCALES`` here, so ``--watch`` reloads keep it.
+    With ``--shard i/N`` only this shard's share of the charts is returned.
+    """
+    if args.catalogue:
+        install_catalogue(args.catalogue, SCALES)
+    if not args.editions:
+        specs = key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+        return select(chart_tasks(args, specs, args.output_dir, want_midi=args.midi), args.shard)
+    tasks = []
+    for name in args.editions:
+        transpose, clef, octave, _line = EDITIONS[name]
+        specs = edition_key_cycle(args, transpose)
+        tasks += chart_tasks(args, specs, args.output_dir / name, clef, octave, want_midi=args.midi and not transpose)
+    return select(tasks, args.shard)
+
+
+def compile_options(args):
+    return {
+        "concurrency": args.jobs,
+        "timeout": args.timeout,
+        "memory_limit_mb": args.memory_limit,
+        "retries": args.retries,
+    }
+
+
+def record_artifacts(args, results):
+    """Index every chart's ``.ly`` and compiled outputs in the ``--store`` database.
+
+    The ``.ly``/``.pdf``/``.midi`` rows of each (edition, section) this build
+    wrote are replaced as a whole, in one transaction, so charts an earlier
+    build made (other keys, a longer cycle) do not outlive it in the store.
+    """
+    meta = {"anchor": args.anchor, "mode": args.mode, "bpm": args.bpm, "prefer": args.prefer}
+    count = 0
+    identities = []
+    for result in results:
+        ly_path = Path(result["ly_path"])
+        edition = ly_path.relative_to(args.output_dir).parts[0] if args.editions else ""
+        identities.append(dict(result["artifact"], edition=edition))
+    with ArtifactStore(args.store) as store:
+        pruned = 0
+        for edition, section in dict.fromkeys((identity["edition"], identity["section"]) for identity in identities):
+            for fmt in ("ly", "pdf", "midi"):
+                pruned += store.delete("scales", edition=edition, section=section, format=fmt)
+        for result, identity in zip(results, identities):
+            ly_path = Path(result["ly_path"])
+            outputs = [("ly", ly_path)]
+            if result.get("pdf_ok"):
+                outputs.append(("pdf", Path(result["pdf_path"])))
+            if result.get("midi_ok"):
+                outputs.append(("midi", Path(result["midi_path"])))
+            for fmt, path in outputs:
+                store.put("scales", fmt, path, embed=args.store_blobs, meta=dict(meta, label=result["label"]), **identity)
+                count += 1
+    print(f"\nRecorded {count} artifact(s) in {args.store} (replacing {pruned})")
+
+
+def init_worker(scales):
+    """Start a ``--workers`` process on the parent's catalogue (a ``--catalogue`` or a caller's ``SCALES``)."""
+    SCALES[:] = scales
+
+
+def write_charts(args, tasks):
+    """Each task's result dict, in order: written here, or across ``--workers`` processes forked warm."""
+    writes = [write for _path, _inputs, write, _want_pdf, _want_midi in tasks]
+    if args.workers > 1 and len(writes) > 1:
+        return run_calls(writes, args.workers, WORKER_PRELOAD, init_worker, (list(SCALES),))
+    return [write() for write in writes]
+
+
+def run(args):
     args.output_dir.mkdir(parents=True, exist_ok=True)
-    specs = key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+    tasks = all_chart_tasks(args)
 
-    key_results = []
-    if args.sections in ("key", "both"):
-        for pc, prefer, _name in specs:
-            score, title, key_name = build_score_for_key(pc, prefer, args.anchor, args.mode, args.bpm)
-            safe_key = sanitize_key_for_filename(key_name)
-            outfile = args.output_dir / f"jazz_scales_abjad_{safe_key}.ly"
-            res = write_lilypond(
-                score,
-                title,
-                str(outfile),
-                make_pdf=args.pdf,
-                author=args.author,
-                license_text=args.license,
-                midi=args.midi,
-            )
-            res["label"] = f"Key {key_name}"
-            key_results.append(res)
-
-    scale_results = []
-    if args.sections in ("scale", "both"):
-        for scale in SCALES:
-            movements, title = build_movements_for_scale(scale, specs, args.anchor, args.mode, args.bpm)
-            outfile = args.output_dir / f"jazz_scales_byscale_{scale_slug(scale[0])}.ly"
-            res = write_lilypond_movements(
-                movements,
-                title,
-                str(outfile),
-                make_pdf=args.pdf,
-                author=args.author,
-                license_text=args.license,
-            )
-            res["label"] = f"Scale {scale[0]}"
-            scale_results.append(res)
-
-    all_results = key_results + scale_results
+    start = time.perf_counter()
+    with span("write charts", workers=args.workers):
+        all_results = write_charts(args, tasks)
+    elapsed = time.perf_counter() - start
+    midi_results = [result for result, task in zip(all_results, tasks) if task[4]]
     print("Wrote .ly files:")
     for result in all_results:
         print("  ", result["ly_path"])
+    rate = len(all_results) / elapsed if elapsed else 0.0
+    print(f"Wrote {len(all_results)} .ly file(s) in {elapsed:.2f}s with {args.workers} worker(s) ({rate:.1f}/s)")
+
+    # Compile everything in one bounded-concurrency batch once all sources exist.
+    jobs = [(Path(result["ly_path"]), task[3], task[4]) for result, task in zip(all_results, tasks) if task[3] or task[4]]
+    if jobs:
+        print(f"\nCompiling {len(jobs)} file(s) with lilypond:")
+        if args.editions or args.patterns:
+            # Editions share most written content (e.g. the by-key chart for written D
+            # is the same for C and Bb players); engrave each distinct source once.
+            # Pattern chapters multiply the chart count by up to seven, so they take
+            # the same content-addressed path: a rerun engraves only changed sources.
+            compiled = compile_deduplicated(jobs, args.output_dir / "engraved", on_event=print_progress, **compile_options(args))
+        else:
+            compiled = compile_many(jobs, on_event=print_progress, **compile_options(args))
+        by_path = {str(job[0]): res for job, res in zip(jobs, compiled)}
+        for result in all_results:
+            result.update(by_path.get(result["ly_path"], {}))
 
     if args.pdf:
         ok_pdf = sum(1 for result in all_results if result["pdf_ok"])
@@ -367,15 +464,78 @@ def main():
                     print("         lilypond stderr (tail):")
                     print("         " + "\n         ".join(result["stderr_tail"].splitlines()))
 
-    if args.midi and key_results:
-        ok_midi = sum(1 for result in key_results if result["midi_ok"])
-        print(f"\nMIDI summary: {ok_midi}/{len(key_results)} OK")
-        for result in key_results:
+    if midi_results:
+        ok_midi = sum(1 for result in midi_results if result["midi_ok"])
+        print(f"\nMIDI summary: {ok_midi}/{len(midi_results)} OK")
+        for result in midi_results:
             if result["midi_ok"]:
                 print(f"  [OK]  {result['midi_path']}")
             else:
                 print(f"  [MISS] ({result['label']}) — no MIDI.")
 
+    if args.store:
+        with span("record artifacts"):
+            record_artifacts(args, all_results)
+
+    if args.shard:
+        artifacts = [result["ly_path"] for result in all_results]
+        artifacts += [result["pdf_path"] for result in all_results if result.get("pdf_ok")]
+        artifacts += [result["midi_path"] for result in midi_results if result.get("midi_ok")]
+        manifest = write_manifest(args.output_dir, args.shard, artifacts)
+        print(f"\nShard {args.shard[0]}/{args.shard[1]}: {len(all_results)} chart(s); manifest {manifest}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate jazz scale charts in multiple keys.")
+    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
+    ap.add_argument("--count", type=int, default=12, help="How many keys to generate (default 12).")
+    ap.add_argument("--start", type=str, default="C", help="Starting key (e.g., C, F#, Gb, Bb).")
+    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style for key names & signatures (default auto).")
+    ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring around middle C (default nearest).")
+    ap.add_argument("--mode", type=str, choices=["major", "minor"], default="major", help="Key signature mode for each chart (major or minor).")
+    ap.add_argument("--pdf", action="store_true", help="Compile a PDF for each chart (runs lilypond).")
+    ap.add_argument("--midi", action="store_true", help="Also produce a .midi for each chart (runs lilypond).")
+    ap.add_argument("--bpm", type=int, default=120, help="MIDI tempo in quarter-notes per minute (default 120).")
+    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Author/composer name printed under the title.")
+    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="License text printed in the footer (copyright field).")
+    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for generated .ly/.pdf/.midi outputs (default: build).")
+    ap.add_argument("--sections", type=str, choices=["key", "scale", "both"], default="both", help="Which chapters to generate: by key, by scale, or both (default: both).")
+    ap.add_argument("--patterns", nargs="+", choices=PATTERN_IDS + ["all"], default=None, help="Also write a chapter per scale for each of these interval patterns (jazz_scales.patterns), or all.")
+    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
+    ap.add_argument("--workers", type=int, default=1, help="Processes building charts and writing .ly files, forked from a server with abjad and SCALES preloaded (default 1: in this process).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--timeout", type=float, default=None, help="Kill a lilypond run after this many seconds (default: no limit).")
+    ap.add_argument("--memory-limit", type=int, default=None, metavar="MB", help="Address-space cap per lilypond process in MB (POSIX only; default: none).")
+    ap.add_argument("--retries", type=int, default=1, help="Retries for a lilypond run that crashes on a signal or fails to start (default 1).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    ap.add_argument("--editions", nargs="+", choices=list(EDITIONS), default=None, help="Build these instrument editions into <output-dir>/<edition>/, engraving shared content once (default: one concert-pitch build in <output-dir>).")
+    ap.add_argument("--catalogue", nargs="+", default=None, metavar="SOURCE", help="Build from a derived catalogue instead of SCALES: scales, modes, sets:N, sets:N:modes (deduplicated in order; see jazz_scales.modes).")
+    ap.add_argument("--store", type=Path, default=None, metavar="DB", help="Also index every chart and its outputs in this SQLite artifact store (jazz_common.store).")
+    ap.add_argument("--store-blobs", action="store_true", help="With --store, keep the files' content in the store instead of their paths.")
+    ap.add_argument("--shard", type=str, default=None, metavar="I/N", help="Build only every N-th chart starting at the I-th, and list the outputs in shard-manifest.json (merge with jazz_scales.book --shards).")
+    ap.add_argument("--watch", action="store_true", help="After building, poll the generator sources and rebuild only the charts an edit affects (Ctrl-C to stop).")
+    args = ap.parse_args(argv)
+
+    if args.start not in NAME_TO_PC:
+        raise SystemExit(f"Unknown start key: {args.start}")
+    if args.catalogue:
+        try:
+            parse_catalogue(args.catalogue)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    with profiled(args.profile, "jazz_scales.generator"):
+        run(args)
+    if args.watch:
+        watch_charts(WATCH_MODULES, lambda module: module.all_chart_tasks(args), compile_options(args), extra_paths=[CATALOGUE_PATH])
+
 
 if __name__ == "__main__":
     main()
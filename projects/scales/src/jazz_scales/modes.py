@@ -0,0 +1,171 @@
+"""Derived scale catalogues: every mode of the parent scales, and every pitch-class set.
+
+``SCALES`` is written by hand. The entries here are computed instead, in the
+same ``(name, notes in C, step labels, chord in C)`` shape, so any of them can
+go through the generator and the JSON export:
+
+- ``modes``: each mode of each ``PARENTS`` scale, by rotating its step array
+  (all rotations of a parent are one NumPy fancy-index);
+- ``sets:N``: one scale per ``N``-note pitch-class set up to transposition, in
+  normal form (the rotation packed most tightly toward the root);
+- ``sets:N:modes``: every ``N``-note set containing C, i.e. every mode of every
+  such set, grouped by set class.
+
+Step labels come from the semitone steps and the chord from the most specific
+``jazz_common.chords`` quality the scale contains. Entries are deduplicated by
+pitch-class set, first one wins, so listing ``scales`` first keeps the
+hand-written names, labels, and chords.
+"""
+
+import numpy as np
+
+from jazz_common.chords import CHORD_TONES
+from jazz_common.pcset import FULL_MASK, POPCOUNT, mask_from_names, mask_from_pcs, pcs_from_mask
+from jazz_common.pitch import FLAT_NAMES
+
+# Step labels by semitones, as in SCALES ("W+H" for the augmented second).
+STEP_LABELS = {1: "H", 2: "W", 3: "W+H", 4: "M3", 5: "P4", 6: "TT", 7: "P5", 8: "m6", 9: "M6", 10: "m7", 11: "M7"}
+# A chart bar holds eight eighth notes: up to seven notes plus the octave, or eight.
+MAX_NOTES = 8
+# Parent scales as semitone steps, with their modes' names in rotation order.
+PARENTS = {
+    "Major": ((2, 2, 1, 2, 2, 2, 1), ("Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian")),
+    "Melodic Minor": (
+        (2, 1, 2, 2, 2, 2, 1),
+        ("Jazz Melodic Minor", "Dorian b2", "Lydian Augmented", "Lydian Dominant", "Mixolydian b6", "Locrian nat2", "Altered Dominant"),
+    ),
+    "Harmonic Minor": (
+        (2, 1, 2, 2, 1, 3, 1),
+        ("Harmonic Minor", "Locrian nat6", "Ionian Augmented", "Dorian #4", "Phrygian Dominant", "Lydian #2", "Super Locrian bb7"),
+    ),
+    "Harmonic Major": (
+        (2, 2, 1, 2, 1, 3, 1),
+        ("Harmonic Major", "Locrian nat2 nat6", "Altered Dominant nat5", "Lydian b3", "Mixolydian b2", "Lydian Augmented #2", "Locrian bb7"),
+    ),
+}
+# Chord qualities tried in order when deriving a chord: altered and tension
+# chords before plain sevenths, sevenths before sixths and triads, and the
+# dominant before maj7 (so a bebop dominant stays a 7 chord).
+CHORD_PREFERENCE = (
+    "7alt", "7(b9)", "7(#11)", "7(b13)", "m7(b9)", "maj7(#11)", "maj7(#5)", "m(maj7)",
+    "7", "maj7", "m7", "m7b5", "dim7", "7(#5)", "6", "m6", "7sus4", "", "m",
+)
+CHORD_MASKS = [(quality, mask_from_pcs(CHORD_TONES[quality])) for quality in CHORD_PREFERENCE]
+# A raised fifth only names the chord when the scale has no perfect fifth.
+PERFECT_FIFTH = 1 << 7
+SHARP_FIVE = {"7(#5)", "maj7(#5)"}
+
+
+def rotations(steps) -> np.ndarray:
+    """Every rotation of ``steps`` as rows: row ``k`` is the mode starting on degree ``k``."""
+    steps = np.asarray(steps, dtype=np.int8)
+    n = len(steps)
+    return steps[(np.arange(n)[:, None] + np.arange(n)) % n]
+
+
+def steps_from_mask(mask: int):
+    pcs = pcs_from_mask(mask)
+    return [b - a for a, b in zip(pcs, pcs[1:] + [12])]
+
+
+def chord_for_mask(mask: int) -> str:
+    """``"C"`` plus the first ``CHORD_PREFERENCE`` quality inside ``mask``, or ``""`` if none fits."""
+    for quality, chord in CHORD_MASKS:
+        if mask & chord == chord and not (quality in SHARP_FIVE and mask & PERFECT_FIFTH):
+            return "C" + quality
+    return ""
+
+
+def scale_entry(name: str, mask: int):
+    """A ``SCALES``-shaped entry for the pitch-class set ``mask`` (which contains C)."""
+    pcs = pcs_from_mask(mask)
+    if len(pcs) > MAX_NOTES:
+        raise ValueError(f"{name} has {len(pcs)} notes; a chart bar holds at most {MAX_NOTES}")
+    steps = steps_from_mask(mask)
+    notes = [FLAT_NAMES[pc] for pc in pcs]
+    if len(notes) < MAX_NOTES:
+        notes.append("C5")
+    else:
+        steps = steps[:-1]
+    return (name, notes, [STEP_LABELS[step] for step in steps], chord_for_mask(mask))
+
+
+def set_name(mask: int) -> str:
+    return "Set (" + ",".join(str(pc) for pc in pcs_from_mask(mask)) + ")"
+
+
+def iter_parent_modes():
+    """``(name, mask)`` for every mode of every ``PARENTS`` scale."""
+    for steps, names in PARENTS.values():
+        rows = rotations(steps)
+        offsets = np.cumsum(rows, axis=1) - rows
+        for name, mask in zip(names, (1 << offsets.astype(np.int64)).sum(axis=1).tolist()):
+            yield name, mask
+
+
+def normal_forms(masks: np.ndarray) -> np.ndarray:
+    """Each set's normal form: the smallest mask among its rotations that put a member on C."""
+    masks = masks.astype(np.int64)[:, None]
+    shifts = np.arange(12)
+    rotated = ((masks >> shifts) | (masks << (12 - shifts))) & FULL_MASK
+    return np.where((masks >> shifts) & 1 == 1, rotated, FULL_MASK + 1).min(axis=1)
+
+
+def iter_sets(size: int, modes: bool = False):
+    """``(name, mask)`` per ``size``-note set class, or per mode of each with ``modes``."""
+    if not 1 <= size <= MAX_NOTES:
+        raise ValueError(f"Set size must be 1..{MAX_NOTES}, got {size}")
+    masks = np.arange(FULL_MASK + 1)
+    masks = masks[(POPCOUNT[masks] == size) & (masks & 1 == 1)]
+    forms = normal_forms(masks)
+    if modes:
+        order = np.lexsort((masks, forms))
+        chosen = masks[order]
+    else:
+        chosen = np.unique(forms)
+    for mask in chosen.tolist():
+        yield set_name(mask), mask
+
+
+def parse_catalogue(tokens):
+    """Validate ``--catalogue`` tokens: ``scales``, ``modes``, ``sets:N``, ``sets:N:modes``."""
+    parsed = []
+    for token in tokens:
+        parts = token.split(":")
+        if parts in (["scales"], ["modes"]):
+            parsed.append((parts[0], 0, False))
+        elif parts[0] == "sets" and len(parts) in (2, 3) and parts[1].isdigit() and parts[2:] in ([], ["modes"]):
+            size = int(parts[1])
+            if not 1 <= size <= MAX_NOTES:
+                raise ValueError(f"{token}: set size must be 1..{MAX_NOTES}")
+            parsed.append(("sets", size, len(parts) == 3))
+        else:
+            raise ValueError(f"Unknown catalogue {token!r} (use scales, modes, sets:N, or sets:N:modes)")
+    return parsed
+
+
+def iter_catalogue(tokens, scales):
+    """Stream ``SCALES``-shaped entries for ``tokens``, skipping any pitch-class set already seen.
+
+    ``scales`` is the hand-written catalogue used for the ``scales`` token.
+    """
+    seen = set()
+    for kind, size, modes in parse_catalogue(tokens):
+        if kind == "scales":
+            for scale in scales:
+                mask = mask_from_names(scale[1])
+                if mask not in seen:
+                    seen.add(mask)
+                    yield scale
+            continue
+        source = iter_parent_modes() if kind == "modes" else iter_sets(size, modes)
+        for name, mask in source:
+            if mask not in seen:
+                seen.add(mask)
+                yield scale_entry(name, mask)
+
+
+def install_catalogue(tokens, scales):
+    """Replace ``scales`` in place, so every module sharing the ``SCALES`` list sees the catalogue."""
+    scales[:] = list(iter_catalogue(tokens, scales))
+    return scales
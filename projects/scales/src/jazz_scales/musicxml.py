@@ -0,0 +1,127 @@
+"""Export every key x scale chart as MusicXML, streamed without building abjad scores.
+
+Each chart is its own score, the two measures of the printed pair: the scale
+and its retrograde, with the key signature, the chord symbol as a
+``<harmony>``, the scale name above, and the interval steps as lyrics. Pitches
+come straight from the catalogue's pitch numbers and are spelled for the key
+as the LilyPond charts are, so notation apps open the same charts the book
+prints. Scores go out one measure at a time (``jazz_common.musicxml``) into
+one ``.musicxml`` or compressed ``.mxl`` file per chart, or a ``.zip`` of the
+``.mxl`` files.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from jazz_common.musicxml import (
+    FORMATS,
+    SCORE_FOOTER,
+    ScoreFiles,
+    attributes_xml,
+    beam_runs,
+    key_fifths,
+    measure_xml,
+    score_header,
+    tempo_xml,
+    words_xml,
+)
+from jazz_common.pitch import NAME_TO_PC, key_cycle, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+
+from .catalogue import pitch_numbers
+from .chart import pc_to_register_offset, transpose_chord_text
+from .generator import SCALES, scale_slug
+from .modes import install_catalogue, parse_catalogue
+
+TITLE_BASE = "{scale} in {key}"
+
+
+def bar_notes(numbers, labels):
+    """Eighth-note dicts for one bar, ``labels`` as lyrics, padded with rests to 4/4."""
+    notes = [{"pitches": [number], "divisions": 3, "type": "eighth", "lyric": label} for number, label in zip(numbers, labels)]
+    while len(notes) < 8:
+        notes.append({"pitches": [], "divisions": 3, "type": "eighth"})
+    return beam_runs(notes)
+
+
+def chart_measures(scale, spec, anchor: str, mode: str, bpm: int, clef: str = "treble", octave: int = 0):
+    """Yield the two ``<measure>`` strings of ``scale`` in ``spec`` (forward, then retrograde)."""
+    name, notes, intervals, chord_c = scale
+    pc, prefer, key_name = spec
+    offset = pc_to_register_offset(pc, anchor) + 12 * octave
+    numbers = [number + offset for number in pitch_numbers(notes)]
+    labels = ["-", *intervals]
+    chord = transpose_chord_text(chord_c, key_name)
+    harmonies = [(0, chord)] if chord else []
+
+    directions = [(0, words_xml(name))]
+    if bpm:
+        directions.append((0, tempo_xml(bpm)))
+    attributes = attributes_xml(key_fifths(pc, prefer, mode), mode, clef)
+    yield measure_xml(1, bar_notes(numbers, labels), prefer, attributes, directions, harmonies)
+    retrograde_labels = ["-", *reversed(intervals)]
+    yield measure_xml(2, bar_notes(numbers[::-1], retrograde_labels), prefer, directions=[(0, words_xml(f"{name} - Retrograde"))], harmonies=harmonies)
+
+
+def write_chart(f, scale, spec, args):
+    f.write(score_header(TITLE_BASE.format(scale=scale[0], key=spec[2]), args.author, args.license, part_name=scale[0]))
+    for measure in chart_measures(scale, spec, args.anchor, args.mode, args.bpm):
+        f.write(measure)
+    f.write(SCORE_FOOTER)
+
+
+def export(args, specs) -> int:
+    """Write every chart for ``specs`` (by key, then scale) to ``args.output``; returns the chart count."""
+    count = 0
+    with ScoreFiles(args.output, args.format) as files:
+        for spec in specs:
+            with span(f"key {spec[2]}", cat="key"):
+                for scale in SCALES:
+                    with files.open(f"{scale_slug(scale[0])}_{sanitize_key_for_filename(spec[2])}") as f:
+                        write_chart(f, scale, spec, args)
+                    count += 1
+    return count
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export every key x scale chart as MusicXML (a .musicxml or .mxl file per chart, or one .zip of them).")
+    ap.add_argument("--format", choices=FORMATS, default="xml", help="xml / mxl: a .musicxml / compressed .mxl file per chart in --output; zip: one .zip of .mxl files at --output (default xml).")
+    ap.add_argument("--output", type=Path, default=None, help="Directory (xml, mxl) or archive (zip) to write (default: build/musicxml, build/mxl or build/jazz_scales_mxl.zip).")
+    ap.add_argument("--start", type=str, default="C", help="Starting key (default C).")
+    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
+    ap.add_argument("--count", type=int, default=12, help="How many keys (default 12).")
+    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style (default auto).")
+    ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring (default nearest).")
+    ap.add_argument("--mode", type=str, choices=["major", "minor"], default="major", help="Key signature mode for each chart (major or minor).")
+    ap.add_argument("--bpm", type=int, default=120, help="Tempo marked on each chart in quarter-notes per minute; 0 for none (default 120).")
+    ap.add_argument("--author", type=str, default="George K. Thiruvathukal", help="Composer recorded in each score.")
+    ap.add_argument("--license", type=str, default="Creative Commons 4.0 International", help="Rights recorded in each score.")
+    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
+    ap.add_argument("--catalogue", nargs="+", default=None, metavar="SOURCE", help="Export a derived catalogue instead of SCALES: scales, modes, sets:N, sets:N:modes (see jazz_scales.modes).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    if args.start not in NAME_TO_PC:
+        raise SystemExit(f"Unknown start key: {args.start}")
+    if args.catalogue:
+        try:
+            parse_catalogue(args.catalogue)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if args.output is None:
+        args.output = {"xml": Path("build/musicxml"), "mxl": Path("build/mxl"), "zip": Path("build/jazz_scales_mxl.zip")}[args.format]
+
+    with profiled(args.profile, "jazz_scales.musicxml"):
+        start = time.perf_counter()
+        if args.catalogue:
+            with span("install_catalogue"):
+                install_catalogue(args.catalogue, SCALES)
+        specs = key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+        count = export(args, specs)
+        elapsed = time.perf_counter() - start
+    print(f"Wrote {args.output} ({count} charts, {len(specs)} keys) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
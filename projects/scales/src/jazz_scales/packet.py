@@ -0,0 +1,131 @@
+"""Assemble a practice packet (chosen scales in chosen keys) from an already-built book.
+
+``jazz_scales.book`` writes ``book-index.json`` beside the book: where each
+chapter starts, its own PDF, and the scale names or "Key of X" headings found
+on each of its pages. A packet looks its selection up in that index, copies
+just the matching pages out of the chapter PDFs (or the book, for chapters
+with no file of their own), and writes them behind a fresh table of contents
+and outline. Nothing is engraved, so a packet takes a fraction of a second.
+
+Pages are the unit: a page holding a selected key (or scale) comes with the
+other systems printed on it. Chapters whose PDFs have no extractable text are
+taken whole.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from jazz_common.profile import profiled, span
+
+from .binding import INDEX_NAME, INDEX_VERSION, assemble
+from .patterns import PATTERN_IDS, PATTERN_LABELS
+
+
+def load_index(book_dir: Path) -> dict:
+    path = book_dir / INDEX_NAME
+    if not path.exists():
+        raise SystemExit(f"No {INDEX_NAME} in {book_dir}/ — build the book with jazz_scales.book first.")
+    index = json.loads(path.read_text(encoding="utf-8"))
+    if index.get("version") != INDEX_VERSION:
+        raise SystemExit(f"{path} is from another version of jazz_scales.book; rebuild the book.")
+    return index
+
+
+def resolve_scales(index, names):
+    """Catalogue names for ``names``, given as names or slugs in any case (``"altered"`` -> ``"Altered"``).
+
+    The names and slugs come from the book's index, so the catalogue (and
+    abjad behind it) is never imported.
+    """
+    def folded(text):
+        # "Major (Ionian)", "major ionian" and "major_ionian" all fold to "majorionian".
+        return "".join(ch for ch in text.casefold() if ch.isalnum())
+
+    lookup = {}
+    for scale in index["scales"]:
+        lookup[scale["name"].casefold()] = scale["name"]
+        lookup[folded(scale["slug"])] = scale["name"]
+    resolved = []
+    for name in names:
+        match = lookup.get(name.casefold()) or lookup.get(folded(name))
+        if match is None:
+            raise SystemExit(f"Unknown scale: {name}")
+        resolved.append(match)
+    return resolved
+
+
+def matching_pages(chapter, wanted):
+    """Indices of ``chapter``'s pages showing any label in ``wanted`` (every page if no filter or no text)."""
+    if not wanted or chapter["page_labels"] is None:
+        return list(range(chapter["npages"]))
+    return [i for i, labels in enumerate(chapter["page_labels"]) if wanted.intersection(labels)]
+
+
+def select_chapters(index, book_dir: Path, keys, scales, by: str, patterns=()):
+    """Content items for ``binding.assemble``: the selected chapters, each limited to its matching pages."""
+    if by == "key":
+        sections, field, chosen = {"By Key"}, "key", set(keys)
+        wanted = set(scales)
+    else:
+        sections = {"By Scale"} | {f"In {PATTERN_LABELS[pattern_id]}" for pattern_id in patterns}
+        field, chosen = "scale", set(scales)
+        wanted = {f"Key of {key}" for key in keys}
+    book = book_dir / index["book"]
+    content = []
+    for chapter in index["chapters"]:
+        if chapter["section"] not in sections or chapter[field] not in chosen:
+            continue
+        pages = matching_pages(chapter, wanted)
+        if not pages:
+            continue
+        # Relative to the book directory, or absolute for chapters found through a store kept elsewhere.
+        path = book_dir / Path(chapter["path"]) if chapter["path"] else None
+        if path is None or not path.exists():
+            path, pages = book, [chapter["start"] + i for i in pages]
+        content.append({"label": chapter["label"], "section": chapter["section"], "path": str(path), "npages": chapter["npages"], "pages": pages})
+    return content
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Assemble a practice packet of chosen scales and keys from an already-built book (no LilyPond).")
+    ap.add_argument("--book-dir", type=Path, default=Path("build"), help="Directory holding the book and its book-index.json (default: build).")
+    ap.add_argument("--scales", nargs="+", default=[], help="Scales to include, by name or slug (e.g. Dorian altered).")
+    ap.add_argument("--keys", nargs="+", default=[], help="Keys to include, as printed in the book (e.g. F Bb Eb).")
+    ap.add_argument("--by", choices=["scale", "key"], default=None, help="Take pages from the by-scale or by-key chapters (default: scale when --scales is given).")
+    ap.add_argument("--patterns", nargs="+", choices=PATTERN_IDS + ["all"], default=[], help="With --by scale, also take these interval-pattern chapters (if the book has them).")
+    ap.add_argument("--title", type=str, default="Practice Packet", help="Heading of the packet's contents page.")
+    ap.add_argument("--output", type=Path, default=Path("build/packet.pdf"), help="Packet PDF to write (default: build/packet.pdf).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    if not args.scales and not args.keys:
+        raise SystemExit("Choose at least one of --scales and --keys.")
+    by = args.by or ("scale" if args.scales else "key")
+    if by == "scale" and not args.scales:
+        raise SystemExit("--by scale needs --scales.")
+    if by == "key" and not args.keys:
+        raise SystemExit("--by key needs --keys.")
+    patterns = [pattern_id for pattern_id in PATTERN_IDS if pattern_id in args.patterns or "all" in args.patterns]
+
+    with profiled(args.profile, "jazz_scales.packet"):
+        index = load_index(args.book_dir)
+        scales = resolve_scales(index, args.scales)
+        printed_keys = {chapter["key"] for chapter in index["chapters"] if chapter["key"]}
+        unknown = [key for key in args.keys if printed_keys and key not in printed_keys]
+        if unknown:
+            raise SystemExit(f"Key(s) not in this book: {', '.join(unknown)} (have {', '.join(sorted(printed_keys))})")
+        with span("select"):
+            content = select_chapters(index, args.book_dir, args.keys, scales, by, patterns)
+        if not content:
+            raise SystemExit("Nothing in the book matches that selection.")
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        toc_name = f".{args.output.stem}-toc.pdf"
+        assemble(content, [], args.output.parent, args.output, toc_name, args.title)
+        (args.output.parent / toc_name).unlink(missing_ok=True)
+    pages = sum(len(item["pages"]) for item in content)
+    print(f"Wrote {args.output}: {len(content)} chapter(s), {pages} page(s)")
+
+
+if __name__ == "__main__":
+    main()
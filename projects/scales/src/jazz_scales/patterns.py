@@ -0,0 +1,83 @@
+"""Interval practice patterns: scales in steps, seconds, thirds ... sevenths.
+
+Each pattern is a two-measure phrase (16 eighth notes) of scale-degree
+indices that walks up and back down and loops cleanly: the note after the last
+is the tonic again. Degrees shift *within* the scale, octave-wrapped, so the
+pattern keeps the scale's own tones. An index ``d`` of an ``m``-degree scale is
+degree ``d % m`` raised ``d // m`` octaves.
+
+The sequences depend only on the pattern and the number of degrees, so
+``sequence_table`` computes every pattern for one degree count as a single
+``(patterns, 16)`` array, and a chart resolves all of them in one NumPy step.
+This is the data behind the web app's pattern selector (exported by
+``jazz_scales.export_json``) and the generator's ``--patterns`` chapters.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# (id, label, degree skip of the pair: musical interval N -> skip N - 1). "steps" is the bare scale.
+INTERVAL_PATTERNS = [
+    ("steps", "Steps", 1),
+    ("seconds", "Seconds", 1),
+    ("thirds", "Thirds", 2),
+    ("fourths", "Fourths", 3),
+    ("fifths", "Fifths", 4),
+    ("sixths", "Sixths", 5),
+    ("sevenths", "Sevenths", 6),
+]
+PATTERN_IDS = [pattern_id for pattern_id, _label, _skip in INTERVAL_PATTERNS]
+PATTERN_LABELS = {pattern_id: label for pattern_id, label, _skip in INTERVAL_PATTERNS}
+# Eighth-note slots in two 4/4 measures; every pattern fills exactly this.
+TWO_MEASURE_SLOTS = 16
+# Lower voice of the interval patterns: up to the 5th degree and back, eight pairs.
+INTERVAL_LOWER = [0, 1, 2, 3, 4, 3, 2, 1]
+
+
+def degree_count(pitch_numbers) -> int:
+    """Distinct scale degrees: a trailing octave duplicate of the first note (C ... C5) is not one."""
+    if len(pitch_numbers) > 1 and pitch_numbers[-1] == pitch_numbers[0] + 12:
+        return len(pitch_numbers) - 1
+    return len(pitch_numbers)
+
+
+def degree_indices(pattern_id: str, skip: int, m: int):
+    """The 16 degree indices of one pattern for a scale of ``m`` degrees."""
+    if pattern_id == "steps":
+        # Up to the 9th (one step past the octave) and back down to the 2nd.
+        return list(range(0, 9)) + list(range(7, 0, -1))
+    if pattern_id == "seconds":
+        # Each note dips a 2nd below, climbing an octave: 1 7 2 1 3 2 4 3 ...
+        return [d for lower in range(8) for d in (lower, lower - 1)]
+    if m >= 5:
+        # Pairs (L, L + skip) over the lower voice 1 -> 5 -> 2.
+        return [d for lower in INTERVAL_LOWER for d in (lower, lower + skip)]
+    # Too few degrees to reach a 5th: keep climbing in pairs across both measures.
+    return [d for n in range(TWO_MEASURE_SLOTS // 2) for d in (n, n + skip)]
+
+
+@lru_cache(maxsize=None)
+def sequence_table(m: int) -> np.ndarray:
+    """``[p, i]``: degree index of slot ``i`` of ``INTERVAL_PATTERNS[p]`` for ``m`` degrees (read-only)."""
+    table = np.array([degree_indices(pattern_id, skip, m) for pattern_id, _label, skip in INTERVAL_PATTERNS], dtype=np.int16)
+    table.flags.writeable = False
+    return table
+
+
+def resolve(pitch_numbers, table: np.ndarray) -> np.ndarray:
+    """Pitch numbers for every index in ``table``: degree ``d % m`` plus ``d // m`` octaves."""
+    degrees = np.asarray(pitch_numbers[: degree_count(pitch_numbers)], dtype=np.int16)
+    m = len(degrees)
+    return degrees[table % m] + 12 * (table // m)
+
+
+def pattern_labels(pattern_id: str, indices, intervals, m: int):
+    """Text under each note: the step label for ``steps``, else the scale-degree number."""
+    if pattern_id == "steps":
+        labels = ["-"]
+        for previous, d in zip(indices, indices[1:]):
+            step = min(previous, d) % m
+            labels.append(intervals[step] if step < len(intervals) else "")
+        return labels
+    return [str(d % m + 1) for d in indices]
@@ -0,0 +1,193 @@
+"""Rank the ``SCALES`` catalogue against every chord of a progression.
+
+Each scale in each key is a pitch-class mask (``jazz_common.pcset``) and each
+chord symbol another (``jazz_common.chords``). A scale fits a chord when it
+contains every chord tone; fitting scales are ranked by whether the catalogue
+pairs that scale with this very chord (e.g. Mixolydian with a 7 chord), then
+by sharing the chord's root, then by fewest avoid notes (a half step above a
+chord tone) and fewest notes outside the chord. One chord's ranking is a few
+NumPy operations over all scales x keys and is memoized per chord, so a whole
+library of forms in every key reduces to a handful of distinct chords.
+"""
+
+import argparse
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import abjad
+import numpy as np
+
+from jazz_common.chords import chord_mask, normalize_quality
+from jazz_common.forms import FORMS, load_forms
+from jazz_common.lilypond import compile_many, print_progress, write_ly_incrementally
+from jazz_common.pcset import FULL_MASK, POPCOUNT, PitchClassSetIndex, transpose_mask
+from jazz_common.pitch import NAME_TO_PC, auto_prefer_for_pc, pc_to_name, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+
+from .generator import SCALES, scale_slug
+
+TITLE_BASE = "{form} in {key} — Chord-Scale Choices"
+
+INDEX = PitchClassSetIndex.from_scales((name, notes) for name, notes, *_ in SCALES)
+ROOTS = np.array([root for _name, root in INDEX.labels], dtype=np.int8)
+SCALE_NUMBERS = np.repeat(np.arange(len(SCALES)), 12)
+# Each entry's own chord from the catalogue (e.g. Dorian on D -> Dm7), as a mask.
+PAIRED = np.array([chord_mask(root, SCALES[s][3][1:]) for s, (_name, root) in zip(SCALE_NUMBERS, INDEX.labels)], dtype=np.uint16)
+
+
+def key_prefer(key_name: str) -> str:
+    """Spelling for chords and scales in ``key_name``: sharps for C#/F#, else the key signature's."""
+    return "sharps" if "#" in key_name else auto_prefer_for_pc(NAME_TO_PC[key_name])
+
+
+@lru_cache(maxsize=None)
+def rank_chord(root_pc: int, quality: str):
+    """Entries (``INDEX`` positions) fitting the chord, best first, with their avoid/outside counts."""
+    chord = chord_mask(root_pc, quality)
+    fits = np.flatnonzero((INDEX.masks & chord) == chord)
+    masks = INDEX.masks[fits]
+    outside = masks & ~np.uint16(chord) & FULL_MASK
+    avoid = POPCOUNT[outside & transpose_mask(chord, 1)]
+    extra = POPCOUNT[outside]
+    same_root = ROOTS[fits] == root_pc
+    # Paired means this very chord: the same set on another root (C6 = Am7) is not.
+    paired = (PAIRED[fits] == chord) & same_root
+    # np.lexsort sorts by the last key first; the entry order breaks ties.
+    order = np.lexsort((fits, extra, avoid, ~same_root, ~paired))
+    return tuple((int(fits[i]), bool(paired[i]), int(avoid[i]), int(extra[i])) for i in order)
+
+
+def scale_choice(entry: int, paired: bool, avoid: int, extra: int, prefer: str) -> dict:
+    scale_name, root = INDEX.labels[entry]
+    return {
+        "scale": scale_name,
+        "slug": scale_slug(scale_name),
+        "key": pc_to_name(root, prefer),
+        "paired": paired,
+        "avoid_notes": avoid,
+        "outside_notes": extra,
+    }
+
+
+@lru_cache(maxsize=None)
+def chord_choices(root_pc: int, quality: str, prefer: str, top: int):
+    """The JSON records of ``rank_chord``'s best ``top`` entries; shared by every occurrence of the chord."""
+    return [scale_choice(*choice, prefer) for choice in rank_chord(root_pc, quality)[:top]]
+
+
+def recommend_form(bars, key_name: str, top: int) -> list:
+    """``bars`` of ``(offset, quality, roman)`` events in ``key_name``, each event with its best ``top`` scales."""
+    key_pc = NAME_TO_PC[key_name]
+    prefer = key_prefer(key_name)
+    out = []
+    for events in bars:
+        bar = []
+        for offset, quality, roman in events:
+            root = (key_pc + offset) % 12
+            quality = normalize_quality(quality)
+            bar.append({
+                "chord": pc_to_name(root, prefer) + quality,
+                "roman": roman,
+                "scales": chord_choices(root, quality, prefer, top),
+                "fits": len(rank_chord(root, quality)),
+            })
+        out.append(bar)
+    return out
+
+
+def build_recommendations(forms: dict, keys, top: int) -> dict:
+    results = []
+    for name, bars in forms.items():
+        with span(f"form {name}", cat="form"):
+            for key in keys:
+                results.append({"form": name, "key": key, "bars": recommend_form(bars, key, top)})
+    return {"top": top, "results": results}
+
+
+def build_annotated_score(result: dict):
+    """Slash-notation lead sheet: chord symbols above, ranked scale names below each chord."""
+    voice = abjad.Voice(name="Slashes")
+    for index, bar in enumerate(result["bars"], start=1):
+        if 4 % len(bar):
+            raise ValueError(f"Bar {index} of {result['form']} splits 4/4 into {len(bar)} chords")
+        for event in bar:
+            leaves = [abjad.Note("b'4") for _ in range(4 // len(bar))]
+            abjad.attach(abjad.Markup(f'"{event["chord"]}"'), leaves[0], direction=abjad.UP)
+            names = " ".join(f'"{choice["key"]} {choice["scale"]}"' for choice in event["scales"])
+            if names:
+                abjad.attach(abjad.Markup(rf"\column {{ {names} }}"), leaves[0], direction=abjad.DOWN)
+            voice.extend(leaves)
+        if index % 4 == 0:
+            abjad.attach(abjad.LilyPondLiteral(r"\break", site="after"), abjad.select.leaf(voice, -1))
+    first = abjad.select.leaf(voice, 0)
+    abjad.attach(abjad.LilyPondLiteral(r"\improvisationOn"), first)
+    abjad.attach(abjad.TimeSignature((4, 4)), first)
+    staff = abjad.Staff([voice], name="Staff")
+    return abjad.Score([staff], name="Score")
+
+
+def write_annotated_lilypond(result: dict, outfile: Path):
+    title = TITLE_BASE.format(form=result["form"], key=result["key"])
+    header = abjad.Block("header", items=[rf'title = \markup {{ \bold "{title}" }}', 'tagline = ""'])
+    layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0"])
+    score = build_annotated_score(result)
+    write_ly_incrementally([header, abjad.Block("score", items=[score, layout_block])], outfile)
+    return outfile
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rank SCALES entries for every chord of a progression, as JSON or annotated LilyPond.")
+    ap.add_argument("--form", nargs="+", default=None, help=f"Built-in forms to process (default: all of {', '.join(FORMS)}).")
+    ap.add_argument("--forms-file", type=Path, default=None, help="JSON library of forms ({name: [[[offset, quality, roman], ...], ...]}); replaces the built-ins.")
+    ap.add_argument("--keys", nargs="+", default=["C"], help="Keys to realize each form in (default: C).")
+    ap.add_argument("--top", type=int, default=5, help="Scales kept per chord (default 5).")
+    ap.add_argument("--format", choices=["json", "ly"], default="json", help="Write one JSON file, or an annotated .ly per form and key (default json).")
+    ap.add_argument("--output", type=Path, default=Path("build/recommend"), help="JSON file, or directory for .ly files (default: build/recommend[.json]).")
+    ap.add_argument("--pdf", action="store_true", help="With --format ly, compile each .ly to PDF (runs lilypond).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    for key in args.keys:
+        if key not in NAME_TO_PC:
+            raise SystemExit(f"Unknown key: {key}")
+    forms = load_forms(args.forms_file) if args.forms_file else FORMS
+    if args.form:
+        missing = [name for name in args.form if name not in forms]
+        if missing:
+            raise SystemExit(f"Unknown form(s): {', '.join(missing)} (have {', '.join(forms)})")
+        forms = {name: forms[name] for name in args.form}
+
+    with profiled(args.profile, "jazz_scales.recommend"):
+        start = time.perf_counter()
+        with span("build_recommendations"):
+            data = build_recommendations(forms, args.keys, args.top)
+        elapsed = time.perf_counter() - start
+        chords = sum(len(bar) for result in data["results"] for bar in result["bars"])
+        print(f"Ranked {chords} chords in {len(data['results'])} form x key realizations in {elapsed:.3f}s ({rank_chord.cache_info().currsize} distinct chords)")
+
+        if args.format == "json":
+            output = args.output if args.output.suffix == ".json" else args.output.with_suffix(".json")
+            output.parent.mkdir(parents=True, exist_ok=True)
+            with span("write json"):
+                # Large libraries are written compactly; a few forms stay readable.
+                indent = 2 if len(data["results"]) <= 50 else None
+                output.write_text(json.dumps(data, indent=indent, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"Wrote {output}")
+            return
+
+        args.output.mkdir(parents=True, exist_ok=True)
+        paths = []
+        with span("write ly"):
+            for result in data["results"]:
+                stem = f"recommend_{result['form']}_{sanitize_key_for_filename(result['key'])}"
+                paths.append(write_annotated_lilypond(result, args.output / f"{stem}.ly"))
+        print(f"Wrote {len(paths)} .ly file(s) to {args.output}")
+        if args.pdf:
+            compile_many([(path, True, False) for path in paths], concurrency=args.jobs, on_event=print_progress)
+
+
+if __name__ == "__main__":
+    main()
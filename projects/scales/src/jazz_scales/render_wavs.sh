@@ -4,7 +4,18 @@ set -euo pipefail
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 INPUT_DIR="${1:-$ROOT_DIR/build}"
 OUTPUT_DIR="${2:-$INPUT_DIR}"
+# Optional "i/N": render only every N-th MIDI file (sorted by name), starting at the i-th.
+SHARD="${3:-1/1}"
 SOUNDFONT_PATH="${SALAMANDER_SF2:-}"
+# Optional artifact store (generator --store): list the MIDI files from it instead of globbing.
+STORE="${JAZZ_STORE:-}"
+
+if [[ ! "$SHARD" =~ ^([0-9]+)/([0-9]+)$ ]] || (( BASH_REMATCH[1] < 1 || BASH_REMATCH[1] > BASH_REMATCH[2] )); then
+  echo "Bad shard $SHARD: expected i/N with 1 <= i <= N" >&2
+  exit 2
+fi
+SHARD_INDEX="${BASH_REMATCH[1]}"
+SHARD_COUNT="${BASH_REMATCH[2]}"
 
 if [[ -z "$SOUNDFONT_PATH" ]]; then
   SOUNDFONT_PATH="$("$ROOT_DIR/src/jazz_scales/fetch_salamander_soundfont.sh")"
@@ -12,14 +23,21 @@ fi
 
 mkdir -p "$OUTPUT_DIR"
 shopt -s nullglob
+export LC_ALL=C
 
-midi_files=("$INPUT_DIR"/jazz_scales_abjad_*.midi "$INPUT_DIR"/jazz_scales_abjad_*.mid)
+if [[ -n "$STORE" ]]; then
+  mapfile -t midi_files < <(python -m jazz_common.store "$STORE" list --project scales --format midi --section key)
+else
+  midi_files=("$INPUT_DIR"/jazz_scales_abjad_*.midi "$INPUT_DIR"/jazz_scales_abjad_*.mid)
+fi
 if [[ ${#midi_files[@]} -eq 0 ]]; then
-  echo "No MIDI files found in $INPUT_DIR" >&2
+  echo "No MIDI files found in ${STORE:-$INPUT_DIR}" >&2
   exit 1
 fi
 
-for midi_file in "${midi_files[@]}"; do
+for i in "${!midi_files[@]}"; do
+  (( i % SHARD_COUNT == SHARD_INDEX - 1 )) || continue
+  midi_file="${midi_files[$i]}"
   base_name="$(basename "${midi_file%.*}")"
   wav_file="$OUTPUT_DIR/$base_name.wav"
   fluidsynth -ni -F "$wav_file" -T wav -r 44100 "$SOUNDFONT_PATH" "$midi_file" >/dev/null
@@ -0,0 +1,392 @@
+"""Serve single charts on demand over HTTP: any key x scale as LilyPond, PDF, SVG, MIDI, or JSON.
+
+    python -m jazz_scales.serve --port 8765
+    curl -o d-dorian.pdf http://127.0.0.1:8765/chart/D/dorian.pdf
+
+A chart is the forward/retrograde pair for one scale in one key, built from
+the same model as the book (``build_pair_score``) and the web export
+(``chart_data``), and engraved lazily with ``compile_with_lilypond`` in a worker
+thread. Artifacts pass through an in-memory LRU in front of an on-disk cache
+whose directory is named by a hash of the model's source, so editing the
+generator never serves stale charts. Concurrent requests for the same artifact
+share one render. ``/metrics`` reports hit rates and latency per format.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import time
+import traceback
+from collections import OrderedDict, deque
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from jazz_common import lilypond, pitch
+from jazz_common.lilypond import compile_with_lilypond, publish_outputs, stamped_outputs
+from jazz_common.pitch import NAME_TO_PC, auto_prefer_for_pc, pc_to_name, sanitize_key_for_filename
+
+from . import chart, export_json, generator, patterns
+from .catalogue import CATALOGUE_PATH
+from .export_json import chart_data
+from .generator import SCALES, build_pair_score, scale_slug, write_lilypond
+from .snippets import SNIPPET_FLAGS
+
+CONTENT_TYPES = {
+    "ly": "text/x-lilypond; charset=utf-8",
+    "pdf": "application/pdf",
+    "svg": "image/svg+xml",
+    "midi": "audio/midi",
+    "json": "application/json",
+}
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error", 502: "Bad Gateway"}
+
+
+class RenderError(Exception):
+    """LilyPond ran but did not produce the requested artifact."""
+
+
+class LRUCache:
+    """Bytes by key, evicting the least recently used entry past ``max_entries``."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.items = OrderedDict()
+
+    def get(self, key):
+        data = self.items.get(key)
+        if data is not None:
+            self.items.move_to_end(key)
+        return data
+
+    def put(self, key, data: bytes):
+        self.items[key] = data
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_entries:
+            self.items.popitem(last=False)
+
+
+def source_version() -> str:
+    """Hash of every module (and the catalogue) a chart is built from; names the on-disk cache directory."""
+    digest = hashlib.sha256()
+    for module in (pitch, lilypond, chart, patterns, generator, export_json):
+        digest.update(Path(module.__file__).read_bytes())
+    digest.update(CATALOGUE_PATH.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def parse_key(text: str):
+    """``(pc, prefer, name)`` for a key given as ``F#``, ``F%23``, ``Fsharp``, ``Bb`` or ``Bflat``."""
+    name = unquote(text)
+    name = name.replace("double-sharp", "##").replace("double-flat", "bb").replace("sharp", "#").replace("flat", "b")
+    if name not in NAME_TO_PC:
+        return None
+    pc = NAME_TO_PC[name]
+    if "#" in name:
+        prefer = "sharps"
+    elif name.endswith("b"):
+        prefer = "flats"
+    else:
+        prefer = auto_prefer_for_pc(pc)
+    return pc, prefer, pc_to_name(pc, prefer)
+
+
+def find_scale(slug: str):
+    for scale in SCALES:
+        if scale_slug(scale[0]) == slug:
+            return scale
+    return None
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ChartServer:
+    def __init__(self, cache_dir: Path, memory_entries: int, jobs: int):
+        self.cache_dir = cache_dir / source_version()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory = LRUCache(memory_entries)
+        self.render_slots = asyncio.Semaphore(jobs)
+        # abjad model building is CPU-bound and not known to be thread-safe; one at a time.
+        self.build_lock = asyncio.Lock()
+        self.inflight = {}
+        self.counts = {"requests": 0, "memory": 0, "disk": 0, "render": 0, "shared": 0, "errors": 0}
+        self.latency = {fmt: deque(maxlen=2048) for fmt in CONTENT_TYPES}
+
+    # -- cache layers -----------------------------------------------------
+
+    async def once(self, key, make):
+        """Await ``make()`` once per ``key`` at a time; returns ``(result, shared)``.
+
+        A caller that arrives while the same key is in flight awaits that run
+        instead of starting another, and gets ``shared=True``.
+        """
+        future = self.inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await make()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self.inflight[key]
+
+    def artifact_path(self, stem: str, fmt: str) -> Path:
+        suffix = {"svg": ".cropped.svg"}.get(fmt, f".{fmt}")
+        return self.cache_dir / f"{stem}{suffix}"
+
+    def stamp_path(self, stem: str, fmt: str) -> Path:
+        """The ``.ok`` stamp listing what the last successful engraving for ``fmt`` published."""
+        return self.cache_dir / (f"{stem}.svg.ok" if fmt == "svg" else f"{stem}.ok")
+
+    def on_disk(self, stem: str, fmt: str) -> bool:
+        path = self.artifact_path(stem, fmt)
+        if fmt in ("ly", "json"):  # written to a temporary name and renamed: whole if present
+            return path.exists()
+        return path.name in stamped_outputs(self.stamp_path(stem, fmt)) and path.exists()
+
+    async def artifact(self, chart: dict, fmt: str):
+        """``(bytes, source)`` for ``fmt`` of ``chart``; source is memory, disk, render, or shared."""
+        key = (chart["stem"], fmt)
+        data = self.memory.get(key)
+        if data is not None:
+            return data, "memory"
+        (data, source), shared = await self.once(key, lambda: self.load(chart, fmt))
+        return data, "shared" if shared else source
+
+    async def load(self, chart: dict, fmt: str):
+        path = self.artifact_path(chart["stem"], fmt)
+        source = "disk"
+        if not self.on_disk(chart["stem"], fmt):
+            await self.render(chart, fmt)
+            source = "render"
+        data = await asyncio.to_thread(path.read_bytes)
+        self.memory.put((chart["stem"], fmt), data)
+        return data, source
+
+    # -- rendering ----------------------------------------------------------
+
+    async def render(self, chart: dict, fmt: str):
+        stem = chart["stem"]
+        if fmt == "json":
+            await self.build(write_chart_json, chart, self.artifact_path(stem, "json"))
+            return
+        ly_path = self.artifact_path(stem, "ly")
+        if not ly_path.exists():
+            await self.once((stem, "write ly"), lambda: self.build(write_chart_ly, chart, ly_path))
+        if fmt == "ly":
+            return
+        # PDF and MIDI come out of the same LilyPond run; SVG needs its own backend.
+        svg = fmt == "svg"
+        key = (stem, "engrave svg") if svg else (stem, "engrave")
+        (result, published), _shared = await self.once(key, lambda: self.engrave(stem, svg))
+        if self.artifact_path(stem, fmt) not in published:
+            raise RenderError(result.get("stderr_tail") or f"lilypond produced no {fmt}")
+
+    async def build(self, write, chart: dict, path: Path):
+        async with self.build_lock:
+            tmp = path.with_name(path.name + ".tmp")
+            await asyncio.to_thread(write, chart, tmp)
+            os.replace(tmp, path)
+
+    async def engrave(self, stem: str, svg: bool):
+        """Engrave ``stem``'s ``.ly`` to PDF and MIDI (or a cropped SVG); returns ``(result, published paths)``.
+
+        LilyPond writes under a per-process name, and its outputs are renamed
+        into the cache and stamped only if the run succeeded, so a failed or
+        killed run never leaves a file that ``load`` would serve.
+        """
+        partial_ly = self.cache_dir / f"{stem}-partial{'-svg' if svg else ''}-{os.getpid()}.ly"
+        await asyncio.to_thread(shutil.copyfile, self.artifact_path(stem, "ly"), partial_ly)
+        want_pdf, want_midi, flags = (False, False, SNIPPET_FLAGS) if svg else (True, True, ())
+        async with self.render_slots:
+            result = await asyncio.to_thread(compile_with_lilypond, partial_ly, want_pdf, want_midi, flags)
+        base = partial_ly.parent / partial_ly.stem
+        if svg:
+            produced = [(f"{base}.cropped.svg", "svg")]
+        else:  # some LilyPond builds write .mid; it is published as .midi all the same
+            produced = [(result["pdf_path"], "pdf"), (result["midi_path"], "midi")]
+        outputs = [
+            (path, self.artifact_path(stem, fmt))
+            for path, fmt in produced
+            if result["succeeded"] and path and os.path.exists(path)
+        ]
+        published = await asyncio.to_thread(publish_outputs, outputs, self.stamp_path(stem, "svg" if svg else "pdf"))
+        for suffix in (".ly", ".pdf", ".midi", ".mid", ".cropped.svg"):
+            Path(f"{base}{suffix}").unlink(missing_ok=True)
+        return result, published
+
+    # -- HTTP -----------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _sep, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) != 3:
+                status, content_type, body, fmt = 400, "text/plain", b"Malformed request line\n", None
+                method, target = "", ""
+            else:
+                method, target, _version = request_line
+                try:
+                    status, content_type, body, fmt = await self.respond(method, target)
+                except Exception:
+                    traceback.print_exc()
+                    status, content_type, body, fmt = 500, "text/plain", b"Internal error; see the server log\n", None
+
+            extra = ""
+            if status == 200 and fmt in CONTENT_TYPES:
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                extra = f"ETag: {etag}\r\nCache-Control: max-age=3600\r\n"
+                if headers.get("if-none-match") == etag:
+                    status, body = 304, b""
+            head = (
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n{extra}Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1"))
+            if method != "HEAD":
+                writer.write(body)
+            await writer.drain()
+            print(f"{method} {target} {status} {(time.perf_counter() - start) * 1000:.1f}ms", flush=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method: str, target: str):
+        """``(status, content type, body, format)`` for one request."""
+        if method not in ("GET", "HEAD"):
+            return 405, "text/plain", b"Only GET and HEAD are supported\n", None
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if not parts:
+            return 200, "application/json", self.index(), None
+        if parts == ["metrics"]:
+            return 200, "application/json", json.dumps(self.metrics(), indent=2).encode("utf-8") + b"\n", None
+        if len(parts) != 3 or parts[0] != "chart" or "." not in parts[2]:
+            return 404, "text/plain", b"Use /chart/<key>/<scale-slug>.<ly|pdf|svg|midi|json>\n", None
+
+        slug, _dot, fmt = parts[2].rpartition(".")
+        spec, scale = parse_key(parts[1]), find_scale(slug)
+        if fmt not in CONTENT_TYPES or spec is None or scale is None:
+            return 404, "text/plain", b"Unknown key, scale, or format (see / for the lists)\n", None
+        try:
+            chart = chart_request(spec, scale, parse_qs(url.query))
+        except ValueError as exc:
+            return 400, "text/plain", f"{exc}\n".encode("utf-8"), None
+
+        start = time.perf_counter()
+        self.counts["requests"] += 1
+        try:
+            data, source = await self.artifact(chart, fmt)
+        except RenderError as exc:
+            self.counts["errors"] += 1
+            return 502, "text/plain", f"LilyPond failed:\n{exc}\n".encode("utf-8"), None
+        self.counts[source] += 1
+        self.latency[fmt].append((time.perf_counter() - start) * 1000)
+        return 200, CONTENT_TYPES[fmt], data, fmt
+
+    def index(self) -> bytes:
+        return json.dumps({
+            "keys": sorted(NAME_TO_PC),
+            "scales": [{"name": name, "slug": scale_slug(name)} for name, *_rest in SCALES],
+            "formats": list(CONTENT_TYPES),
+            "query": {"anchor": ["nearest", "up", "down"], "mode": ["major", "minor"], "bpm": "int (MIDI tempo)"},
+            "example": "/chart/Bb/dorian.pdf?anchor=up",
+        }, indent=2).encode("utf-8") + b"\n"
+
+    def metrics(self) -> dict:
+        served = self.counts["memory"] + self.counts["disk"] + self.counts["render"] + self.counts["shared"]
+        latency = {}
+        for fmt, samples in self.latency.items():
+            if samples:
+                latency[fmt] = {
+                    "count": len(samples),
+                    "mean_ms": round(statistics.fmean(samples), 2),
+                    "p50_ms": round(percentile(samples, 0.50), 2),
+                    "p95_ms": round(percentile(samples, 0.95), 2),
+                    "max_ms": round(max(samples), 2),
+                }
+        return {
+            **self.counts,
+            "hit_rate": round((served - self.counts["render"]) / served, 4) if served else None,
+            "memory_entries": len(self.memory.items),
+            "inflight": len(self.inflight),
+            "cache_dir": str(self.cache_dir),
+            "latency": latency,
+        }
+
+
+def chart_request(spec, scale, query: dict) -> dict:
+    """Validate query options and describe one chart, with a cache-safe ``stem``."""
+    anchor = query.get("anchor", ["nearest"])[-1]
+    mode = query.get("mode", ["major"])[-1]
+    bpm = query.get("bpm", ["96"])[-1]
+    if anchor not in ("nearest", "up", "down"):
+        raise ValueError(f"anchor must be nearest, up, or down (got {anchor!r})")
+    if mode not in ("major", "minor"):
+        raise ValueError(f"mode must be major or minor (got {mode!r})")
+    if not bpm.isdigit() or not 20 <= int(bpm) <= 400:
+        raise ValueError(f"bpm must be an integer from 20 to 400 (got {bpm!r})")
+    stem = f"{scale_slug(scale[0])}__{sanitize_key_for_filename(spec[2])}__{anchor}_{mode}_{bpm}"
+    return {"spec": spec, "scale": scale, "anchor": anchor, "mode": mode, "bpm": int(bpm), "stem": stem}
+
+
+def write_chart_ly(chart: dict, outfile: Path):
+    scale, spec = chart["scale"], chart["spec"]
+    score = build_pair_score(scale, spec, chart["anchor"], chart["mode"], chart["bpm"], scale[0])
+    write_lilypond(score, f"{scale[0]} — Key of {spec[2]}", str(outfile), midi=True, compile_now=False)
+
+
+def write_chart_json(chart: dict, outfile: Path):
+    data = chart_data(chart["scale"], chart["spec"], chart["anchor"])
+    outfile.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+async def serve(args):
+    server = ChartServer(args.cache_dir, args.memory_entries, args.jobs or os.cpu_count() or 1)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"Serving charts on http://{args.host}:{args.port}/ (cache {server.cache_dir})", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve single jazz scale charts on demand (LilyPond, PDF, SVG, MIDI, JSON).")
+    ap.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on (default 127.0.0.1).")
+    ap.add_argument("--port", type=int, default=8765, help="Port to listen on (default 8765).")
+    ap.add_argument("--cache-dir", type=Path, default=Path("build/serve-cache"), help="On-disk artifact cache (default: build/serve-cache).")
+    ap.add_argument("--memory-entries", type=int, default=256, help="Artifacts kept in the in-memory LRU (default 256).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    args = ap.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Engrave every key x scale forward/retrograde pair as a cropped SVG snippet.
+
+Each pair is written as its own small ``.ly`` file and compiled in parallel with
+LilyPond's SVG backend and ``-dcrop``, so the web app can show pre-engraved
+charts as static, cacheable assets instead of laying out notation on the device.
+Snippets are named by the hash of their SVG content and listed in
+``manifest.json``; a pair whose LilyPond source has not changed since the last
+build is not recompiled.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import abjad
+
+from jazz_common.lilypond import compile_many, print_progress, write_ly_incrementally
+from jazz_common.pitch import NAME_TO_PC, key_cycle, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+
+from .generator import SCALES, build_pair_score, scale_slug
+
+SNIPPET_FLAGS = ["-dbackend=svg", "-dcrop", "-dno-print-pages"]
+MANIFEST_NAME = "manifest.json"
+
+
+def snippet_stem(scale_name: str, key_name: str) -> str:
+    return f"{scale_slug(scale_name)}__{sanitize_key_for_filename(key_name)}"
+
+
+def write_snippet_source(scale, spec, anchor: str, mode: str, outfile: Path) -> str:
+    """Write one pair as a title-less LilyPond file; returns the source's SHA-256."""
+    score = build_pair_score(scale, spec, anchor, mode, 0, scale[0])
+    header = abjad.Block("header", items=['tagline = ""'])
+    layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0"])
+    write_ly_incrementally([header, abjad.Block("score", items=[score, layout_block])], outfile)
+    return hashlib.sha256(outfile.read_bytes()).hexdigest()
+
+
+def load_manifest(out_dir: Path) -> dict:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {"charts": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def build_snippets(out_dir: Path, specs, anchor: str, mode: str, force: bool = False, **compile_options):
+    src_dir = out_dir / "ly"
+    src_dir.mkdir(parents=True, exist_ok=True)
+    previous = {(c["key"], c["scale"]): c for c in load_manifest(out_dir)["charts"]}
+
+    charts = []
+    stale = []
+    with span("write snippet sources"):
+        for spec in specs:
+            for scale in SCALES:
+                stem = snippet_stem(scale[0], spec[2])
+                source_hash = write_snippet_source(scale, spec, anchor, mode, src_dir / f"{stem}.ly")
+                entry = {"key": spec[2], "scale": scale[0], "slug": scale_slug(scale[0]), "svg": None, "source_sha256": source_hash}
+                old = previous.get((spec[2], scale[0]))
+                if not force and old and old["svg"] and old["source_sha256"] == source_hash and (out_dir / old["svg"]).exists():
+                    entry["svg"] = old["svg"]
+                else:
+                    stale.append((entry, stem))
+                charts.append(entry)
+
+    print(f"{len(charts)} snippets, {len(stale)} to engrave")
+    if stale:
+        jobs = []
+        for _entry, stem in stale:
+            # An SVG from an earlier (possibly killed) run is never this run's output.
+            (src_dir / f"{stem}.cropped.svg").unlink(missing_ok=True)
+            jobs.append((src_dir / f"{stem}.ly", False, False))
+        results = compile_many(jobs, flags=SNIPPET_FLAGS, on_event=print_progress, **compile_options)
+        for (entry, stem), result in zip(stale, results):
+            cropped = src_dir / f"{stem}.cropped.svg"
+            if not result["succeeded"] or not cropped.exists():
+                cropped.unlink(missing_ok=True)
+                print(f"  [MISS] {entry['key']} {entry['scale']} — no SVG.")
+                continue
+            svg = cropped.read_bytes()
+            name = f"{stem}.{hashlib.sha256(svg).hexdigest()[:12]}.svg"
+            (out_dir / name).write_bytes(svg)
+            cropped.unlink()
+            entry["svg"] = name
+
+    # Drop superseded hashed files so the directory mirrors the manifest.
+    keep = {entry["svg"] for entry in charts if entry["svg"]}
+    for path in out_dir.glob("*.svg"):
+        if path.name not in keep:
+            path.unlink()
+
+    manifest = {"flags": SNIPPET_FLAGS, "charts": charts}
+    tmp = out_dir / f"{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Engrave each key x scale pair as a cropped SVG with a content-hashed manifest.")
+    ap.add_argument("--output-dir", type=Path, default=Path("build/snippets"), help="Directory for SVGs and manifest.json (default: build/snippets).")
+    ap.add_argument("--start", type=str, default="C", help="Starting key (default C).")
+    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
+    ap.add_argument("--count", type=int, default=12, help="How many keys (default 12).")
+    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style (default auto).")
+    ap.add_argument("--anchor", type=str, choices=["nearest", "up", "down"], default="nearest", help="Register anchoring (default nearest).")
+    ap.add_argument("--mode", type=str, choices=["major", "minor"], default="major", help="Key signature mode (default major).")
+    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--timeout", type=float, default=None, help="Kill a lilypond run after this many seconds (default: no limit).")
+    ap.add_argument("--force", action="store_true", help="Re-engrave every snippet, even if its source is unchanged.")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    if args.start not in NAME_TO_PC:
+        raise SystemExit(f"Unknown start key: {args.start}")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    specs = key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+    with profiled(args.profile, "jazz_scales.snippets"):
+        manifest = build_snippets(
+            args.output_dir, specs, args.anchor, args.mode, force=args.force,
+            concurrency=args.jobs, timeout=args.timeout,
+        )
+    done = sum(1 for entry in manifest["charts"] if entry["svg"])
+    print(f"Wrote {args.output_dir / MANIFEST_NAME} ({done}/{len(manifest['charts'])} snippets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Playable voicings of every chart's chord symbol, in every key, as JSON and optional piano charts.
+
+Each ``SCALES`` entry carries its chord in C (``Cmaj7``, ``C7alt``, ...),
+which ``transpose_chord_text`` names for each key of the cycle. The voicings
+behind those symbols come from ``jazz_common.voicings``: shell, rootless A/B,
+drop-2 and drop-3 shapes enumerated across the whole range for all twelve
+roots at once with NumPy, once per chord quality, so the full catalogue in
+every key is a few array operations. The JSON lists each distinct chord's
+voicings (type, degrees bottom to top, MIDI numbers, spelled notes) and which
+chart uses which chord; ``--engrave`` also writes a grand-staff chart per key
+with the most central voicing of each type for each chord.
+"""
+
+import argparse
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import abjad
+
+from jazz_common.chords import parse_chord_symbol
+from jazz_common.lilypond import compile_many, print_progress, write_ly_incrementally
+from jazz_common.pitch import NAME_TO_PC, key_cycle, pc_to_lily_key, pc_to_name, sanitize_key_for_filename
+from jazz_common.profile import profiled, span
+from jazz_common.voicings import HIGH, LOW, MAX_SPAN, VOICING_TYPES, enumerate_voicings, voicing_shapes
+
+from .chart import transpose_chord_text
+from .generator import SCALES
+from .modes import install_catalogue, parse_catalogue
+
+TITLE_BASE = "Chord Voicings in {key}"
+
+
+def chord_prefer(symbol: str, prefer: str) -> str:
+    """Spelling for a chord's notes: its root's accidental if it has one, else the key's."""
+    root = symbol[1:2]
+    return "sharps" if root == "#" else "flats" if root == "b" else prefer
+
+
+def note_name(midi: int, prefer: str) -> str:
+    """Scientific pitch name of a MIDI number (``60`` -> ``"C4"``)."""
+    return f"{pc_to_name(midi % 12, prefer)}{midi // 12 - 1}"
+
+
+@lru_cache(maxsize=None)
+def quality_voicings(quality: str, low: int, high: int, max_span: int, types):
+    """``enumerate_voicings`` for all twelve roots, memoized per quality and constraints."""
+    return enumerate_voicings(range(12), quality, low, high, max_span, types)
+
+
+def chord_voicings(symbol: str, prefer: str, args) -> list:
+    """Voicing dicts for ``symbol``, by type (in ``args.types`` order), then from the bottom up."""
+    root_pc, quality = parse_chord_symbol(symbol)
+    shapes = voicing_shapes(quality, args.types)
+    voicings = []
+    for root_index, shape_index, notes in quality_voicings(quality, args.low, args.high, args.max_span, args.types):
+        rows = root_index == root_pc
+        for index, midi in zip(shape_index[rows].tolist(), notes[rows].tolist()):
+            voicing_type, degrees, _bottom, _offsets = shapes[index]
+            voicings.append({
+                "type": voicing_type,
+                "degrees": list(degrees),
+                "midi": midi,
+                "notes": [note_name(number, prefer) for number in midi],
+            })
+    order = {voicing_type: index for index, voicing_type in enumerate(args.types)}
+    voicings.sort(key=lambda voicing: (order[voicing["type"]], voicing["midi"]))
+    return voicings
+
+
+def build_voicings(specs, args) -> dict:
+    """Every distinct chord of ``SCALES`` in each key of ``specs`` with its voicings, and each chart's chord."""
+    chords, charts = {}, []
+    for pc, prefer, key_name in specs:
+        with span(f"key {key_name}", cat="key"):
+            for name, _notes, _intervals, chord_c in SCALES:
+                chord = transpose_chord_text(chord_c, key_name)
+                if not chord:
+                    continue
+                charts.append({"key": key_name, "scale": name, "chord": chord})
+                if chord not in chords:
+                    chords[chord] = chord_voicings(chord, chord_prefer(chord, prefer), args)
+    return {
+        "range": {"low": args.low, "high": args.high, "max_span": args.max_span},
+        "types": list(args.types),
+        "chords": chords,
+        "charts": charts,
+    }
+
+
+def lily_chord(midi, prefer: str) -> str:
+    names = " ".join(abjad.NamedPitch(number - 60).respell(prefer).name() for number in midi)
+    return f"<{names}>1"
+
+
+def central_voicings(voicings, center: float) -> list:
+    """One voicing per type, the one whose average pitch is nearest ``center``, in type order."""
+    best = {}
+    for voicing in voicings:
+        distance = abs(sum(voicing["midi"]) / len(voicing["midi"]) - center)
+        if voicing["type"] not in best or distance < best[voicing["type"]][0]:
+            best[voicing["type"]] = (distance, voicing)
+    return [voicing for _distance, voicing in best.values()]
+
+
+def build_key_score(data: dict, spec, center: float):
+    """Grand staff with a line per chord of the key: one whole-note measure per voicing type."""
+    pc, prefer, key_name = spec
+    upper, lower = abjad.Voice(name="Upper"), abjad.Voice(name="Lower")
+    seen = set()
+    for chart in data["charts"]:
+        chord = chart["chord"]
+        if chart["key"] != key_name or chord in seen:
+            continue
+        seen.add(chord)
+        spelling = chord_prefer(chord, prefer)
+        for index, voicing in enumerate(central_voicings(data["chords"][chord], center)):
+            treble = [number for number in voicing["midi"] if number >= 60]
+            bass = [number for number in voicing["midi"] if number < 60]
+            top = abjad.Chord(lily_chord(treble, spelling)) if treble else abjad.Rest("r1")
+            bottom = abjad.Chord(lily_chord(bass, spelling)) if bass else abjad.Rest("r1")
+            if index == 0:
+                abjad.attach(abjad.Markup(rf'\bold "{chord}"'), top, direction=abjad.UP)
+            degrees = " ".join(voicing["degrees"])
+            abjad.attach(abjad.Markup(rf'\small \column {{ "{voicing["type"]}" "{degrees}" }}'), bottom, direction=abjad.DOWN)
+            upper.append(top)
+            lower.append(bottom)
+        abjad.attach(abjad.LilyPondLiteral(r"\break", site="after"), abjad.select.leaf(upper, -1))
+    lily_key = pc_to_lily_key(pc, prefer)
+    for voice, clef in ((upper, "treble"), (lower, "bass")):
+        first = abjad.select.leaf(voice, 0)
+        abjad.attach(abjad.Clef(clef), first)
+        abjad.attach(abjad.LilyPondLiteral(rf"\key {lily_key} \major"), first)
+    abjad.attach(abjad.TimeSignature((4, 4)), abjad.select.leaf(upper, 0))
+    piano = abjad.StaffGroup(
+        [abjad.Staff([upper], name="Treble"), abjad.Staff([lower], name="Bass")],
+        lilypond_type="PianoStaff",
+        name="Piano",
+    )
+    return abjad.Score([piano], name="Score")
+
+
+def write_key_lilypond(data: dict, spec, outfile: Path, center: float):
+    title = TITLE_BASE.format(key=spec[2])
+    header = abjad.Block("header", items=[rf'title = \markup {{ \bold "{title}" }}', 'tagline = ""'])
+    layout_block = abjad.Block("layout", items=["indent = 0", "short-indent = 0", r"\context { \Score \omit BarNumber }"])
+    score = build_key_score(data, spec, center)
+    write_ly_incrementally([header, abjad.Block("score", items=[score, layout_block])], outfile)
+    return outfile
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Enumerate shell, rootless and drop voicings of every chart's chord symbol in each key (JSON, optional LilyPond).")
+    ap.add_argument("--output-dir", type=Path, default=Path("build"), help="Directory for voicings.json and, with --engrave, voicings/*.ly (default: build).")
+    ap.add_argument("--start", type=str, default="C", help="Starting key (default C).")
+    ap.add_argument("--step", type=int, default=5, help="Cycle step in semitones (default 5 = fourths).")
+    ap.add_argument("--count", type=int, default=12, help="How many keys (default 12).")
+    ap.add_argument("--prefer", type=str, choices=["auto", "flats", "sharps"], default="auto", help="Accidental style (default auto).")
+    ap.add_argument("--no-enharmonics", action="store_true", help="Skip the extra enharmonic sharp keys (F#, C#) emitted alongside Gb, Db.")
+    ap.add_argument("--types", nargs="+", choices=VOICING_TYPES, default=list(VOICING_TYPES), help="Voicing types to enumerate (default: all).")
+    ap.add_argument("--low", type=int, default=LOW, help=f"Lowest MIDI note of any voicing (default {LOW} = E2).")
+    ap.add_argument("--high", type=int, default=HIGH, help=f"Highest MIDI note of any voicing (default {HIGH} = G5).")
+    ap.add_argument("--max-span", type=int, default=MAX_SPAN, help=f"Widest bottom-to-top span in semitones (default {MAX_SPAN}).")
+    ap.add_argument("--catalogue", nargs="+", default=None, metavar="SOURCE", help="Voice a derived catalogue's chords instead of SCALES': scales, modes, sets:N, sets:N:modes (see jazz_scales.modes).")
+    ap.add_argument("--engrave", action="store_true", help="Also write a grand-staff .ly per key with the most central voicing of each type.")
+    ap.add_argument("--pdf", action="store_true", help="Compile the engraved .ly files to PDF (implies --engrave; runs lilypond).")
+    ap.add_argument("--jobs", type=int, default=None, help="Maximum concurrent lilypond processes (default: CPU count).")
+    ap.add_argument("--profile", type=Path, default=None, metavar="TRACE_JSON", help="Record timing spans to this Chrome trace JSON (plus a .txt summary beside it).")
+    args = ap.parse_args(argv)
+
+    if args.start not in NAME_TO_PC:
+        raise SystemExit(f"Unknown start key: {args.start}")
+    if not 0 <= args.low < args.high <= 127:
+        raise SystemExit(f"Invalid range: --low {args.low} --high {args.high}")
+    if args.catalogue:
+        try:
+            parse_catalogue(args.catalogue)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    args.types = tuple(dict.fromkeys(args.types))
+
+    with profiled(args.profile, "jazz_scales.voicings"):
+        start = time.perf_counter()
+        if args.catalogue:
+            with span("install_catalogue"):
+                install_catalogue(args.catalogue, SCALES)
+        specs = key_cycle(args.start, args.step, args.count, args.prefer, extras=not args.no_enharmonics)
+        with span("build_voicings"):
+            data = build_voicings(specs, args)
+        elapsed = time.perf_counter() - start
+        count = sum(len(voicings) for voicings in data["chords"].values())
+        print(f"Enumerated {count} voicings of {len(data['chords'])} chords for {len(data['charts'])} charts in {elapsed:.3f}s ({quality_voicings.cache_info().currsize} distinct qualities)")
+
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        output = args.output_dir / "voicings.json"
+        with span("write json"):
+            output.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Wrote {output}")
+        if not (args.engrave or args.pdf):
+            return
+
+        ly_dir = args.output_dir / "voicings"
+        ly_dir.mkdir(parents=True, exist_ok=True)
+        center = (args.low + args.high) / 2
+        paths = []
+        with span("write ly"):
+            for spec in specs:
+                stem = f"voicings_{sanitize_key_for_filename(spec[2])}"
+                paths.append(write_key_lilypond(data, spec, ly_dir / f"{stem}.ly", center))
+        print(f"Wrote {len(paths)} .ly file(s) to {ly_dir}")
+        if args.pdf:
+            compile_many([(path, True, False) for path in paths], concurrency=args.jobs, on_event=print_progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the scales pipeline on stub LilyPond/FluidSynth.
+
+Runs generator -> compile -> render -> cover -> book once per (scale factor, key
+factor) combination, each stage in its own process so wall-clock time and peak
+RSS are measured per stage. Stub ``lilypond``/``fluidsynth`` executables from
+``stubs/`` are put first on PATH, so this runs offline with neither installed.
+
+The synthetic catalogue repeats ``SCALES`` ``--scale-factors`` times (renamed so
+every copy gets its own by-scale chapter); ``--key-factors`` multiplies the key
+cycle length. ``--workers`` runs the generator stage with each of the given
+``--workers`` counts and reports its chart throughput and speedup over one
+worker. Results are printed as a table and appended to a JSON-lines history
+file so runs can be compared over time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SCALES_ROOT = HERE.parent.parent
+STUBS = HERE / "stubs"
+STAGES = ["generator", "compile", "render", "cover", "book"]
+
+
+def synthetic_scales(base, factor: int):
+    """``base`` repeated ``factor`` times; copies after the first get a ``[n]`` suffix."""
+    scales = list(base)
+    for n in range(2, factor + 1):
+        scales.extend((f"{name} [{n}]", notes, intervals, chord) for name, notes, intervals, chord in base)
+    return scales
+
+
+def install_synthetic_catalogue(factor: int):
+    # Mutate in place: book/export_json import the same list object from generator.
+    from jazz_scales import generator
+
+    generator.SCALES[:] = synthetic_scales(generator.SCALES, factor)
+
+
+def run_stage_inline(stage: str, out_dir: Path, scale_factor: int, key_factor: int, workers: int = 1):
+    """Body of one stage, executed inside a fresh child process."""
+    install_synthetic_catalogue(scale_factor)
+    if stage == "generator":
+        from jazz_scales import generator
+
+        # Emit \midi blocks but leave compilation to the "compile" stage, so the
+        # two are timed separately.
+        generator.compile_many = lambda jobs, **_options: [{} for _job in jobs]
+        sys.argv = [
+            "generator", "--output-dir", str(out_dir),
+            "--step", "5", "--count", str(12 * key_factor), "--start", "C",
+            "--prefer", "auto", "--anchor", "nearest", "--mode", "major", "--midi", "--bpm", "96",
+            "--workers", str(workers),
+        ]
+        generator.main()
+    elif stage == "compile":
+        from jazz_common.lilypond import compile_many
+
+        ly_paths = sorted(out_dir.glob("jazz_scales_*.ly"))
+        compile_many([(p, True, p.name.startswith("jazz_scales_abjad_")) for p in ly_paths])
+    elif stage == "cover":
+        from jazz_scales import cover
+
+        sys.argv = ["cover", "--output-dir", str(out_dir)]
+        cover.main()
+    elif stage == "book":
+        from jazz_scales import book
+
+        sys.argv = ["book", "--output-dir", str(out_dir)]
+        book.main()
+    else:
+        raise SystemExit(f"Unknown stage: {stage}")
+
+
+def stage_command(stage: str, out_dir: Path, scale_factor: int, key_factor: int, workers: int = 1):
+    if stage == "render":
+        return ["bash", str(SCALES_ROOT / "src" / "jazz_scales" / "render_wavs.sh"), str(out_dir), str(out_dir)]
+    return [
+        sys.executable, str(Path(__file__).resolve()), "--run-stage", stage,
+        "--output-dir", str(out_dir),
+        "--scale-factors", str(scale_factor), "--key-factors", str(key_factor), "--workers", str(workers),
+    ]
+
+
+def measure(cmd, env):
+    """Run ``cmd``; return (seconds, peak RSS in KiB of the direct child, exit code)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+    _pid, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return elapsed, usage.ru_maxrss, proc.returncode
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCALES_ROOT, text=True, capture_output=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_env(args):
+    env = dict(os.environ)
+    env["PATH"] = f"{STUBS}{os.pathsep}{env.get('PATH', '')}"
+    env["STUB_LILYPOND_DELAY"] = str(args.lilypond_delay)
+    env["STUB_FLUIDSYNTH_DELAY"] = str(args.fluidsynth_delay)
+    soundfont = args.work_dir / "stub.sf2"
+    soundfont.parent.mkdir(parents=True, exist_ok=True)
+    soundfont.touch()
+    env["SALAMANDER_SF2"] = str(soundfont)
+    return env
+
+
+def print_scaling(generator_runs):
+    """Generator throughput per ``--workers`` count, and speedup over the one-worker run of the same size."""
+    print(f"\nGenerator scaling ({os.cpu_count()} CPUs):")
+    print(f"{'scales':>7} {'keys':>5} {'workers':>7} {'charts':>7} {'charts/s':>9} {'speedup':>8}")
+    for (scale_factor, key_factor, workers), run in sorted(generator_runs.items()):
+        rate = run["charts"] / run["seconds"] if run["seconds"] else 0.0
+        base = generator_runs.get((scale_factor, key_factor, 1))
+        speedup = f"{base['seconds'] / run['seconds']:.2f}x" if base and run["seconds"] else "-"
+        print(f"{'x' + str(scale_factor):>7} {'x' + str(key_factor):>5} {workers:>7} {run['charts']:>7} {rate:9.1f} {speedup:>8}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the scales pipeline end to end on stub LilyPond/FluidSynth.")
+    ap.add_argument("--scale-factors", type=int, nargs="+", default=[1, 10], help="Multiples of SCALES to benchmark (default: 1 10).")
+    ap.add_argument("--key-factors", type=int, nargs="+", default=[1], help="Multiples of the 12-key cycle to benchmark (default: 1).")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1], help="Generator --workers counts to benchmark, e.g. 1 2 4 8 (default: 1).")
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to run, in pipeline order (default: all).")
+    ap.add_argument("--lilypond-delay", type=float, default=0.0, help="Seconds the stub lilypond sleeps per file (default 0).")
+    ap.add_argument("--fluidsynth-delay", type=float, default=0.0, help="Seconds the stub fluidsynth sleeps per file (default 0).")
+    ap.add_argument("--work-dir", type=Path, default=Path("build-bench"), help="Scratch directory for benchmark outputs (default: build-bench).")
+    ap.add_argument("--history", type=Path, default=None, help="JSON-lines file to append results to (default: <work-dir>/history.jsonl).")
+    ap.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    ap.add_argument("--output-dir", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run_stage:
+        run_stage_inline(args.run_stage, args.output_dir, args.scale_factors[0], args.key_factors[0], args.workers[0])
+        return
+
+    args.work_dir = args.work_dir.resolve()
+    env = bench_env(args)
+    history = args.history or args.work_dir / "history.jsonl"
+    stages = [stage for stage in STAGES if stage in args.stages]
+    generator_runs = {}
+
+    rows = []
+    for scale_factor in args.scale_factors:
+        for key_factor in args.key_factors:
+            for workers in args.workers:
+                suffix = f"_w{workers}" if len(args.workers) > 1 else ""
+                out_dir = args.work_dir / f"s{scale_factor}_k{key_factor}{suffix}"
+                out_dir.mkdir(parents=True, exist_ok=True)
+                record = {
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "git": git_revision(),
+                    "python": platform.python_version(),
+                    "cpus": os.cpu_count(),
+                    "scale_factor": scale_factor,
+                    "key_factor": key_factor,
+                    "workers": workers,
+                    "lilypond_delay": args.lilypond_delay,
+                    "fluidsynth_delay": args.fluidsynth_delay,
+                    "stages": {},
+                }
+                for stage in stages:
+                    cmd = stage_command(stage, out_dir, scale_factor, key_factor, workers)
+                    seconds, max_rss_kb, code = measure(cmd, env)
+                    record["stages"][stage] = {"seconds": round(seconds, 3), "max_rss_kb": max_rss_kb, "ok": code == 0}
+                    if stage == "generator":
+                        record["stages"][stage]["charts"] = len(list(out_dir.glob("jazz_scales_*.ly")))
+                    rows.append((scale_factor, key_factor, workers, stage, seconds, max_rss_kb, code == 0))
+                    if code != 0:
+                        print(f"stage {stage} failed (exit {code}) at scale x{scale_factor}, keys x{key_factor}, {workers} worker(s)", file=sys.stderr)
+                        break
+                history.parent.mkdir(parents=True, exist_ok=True)
+                with open(history, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                if "generator" in record["stages"]:
+                    generator_runs[(scale_factor, key_factor, workers)] = record["stages"]["generator"]
+
+    print(f"{'scales':>7} {'keys':>5} {'workers':>7}  {'stage':<10} {'seconds':>9} {'peak MiB':>9}")
+    for scale_factor, key_factor, workers, stage, seconds, max_rss_kb, ok in rows:
+        flag = "" if ok else "  FAILED"
+        print(f"{'x' + str(scale_factor):>7} {'x' + str(key_factor):>5} {workers:>7}  {stage:<10} {seconds:9.2f} {max_rss_kb / 1024:9.1f}{flag}")
+    if len(args.workers) > 1 and generator_runs:
+        print_scaling(generator_runs)
+    print(f"\nAppended results to {history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+// Reverse note -> scale lookup over the pitch-class set index exported beside
+// scales.json (jazz_scales.export_json). Each scale in each key is a 12-bit
+// mask (bit n = pitch class n, C = 0), so a search is one AND per entry.
+import data from "./pcsets.json";
+
+export interface PcSetData {
+  bits: string;
+  scales: string[];       // scale slugs, in scales.json order
+  keys: string[][];       // key names per pitch class, e.g. [["C"], ["Db", "C#"], ...]
+  masks: number[][];      // masks[scale][root pitch class]
+  same_notes: number[][][]; // groups of [scale, root] sharing one pitch-class set
+}
+
+export interface PcSetMatch {
+  scale: string;  // slug
+  root: number;   // pitch class
+  keys: string[]; // key names for root (both spellings of Db/C# and Gb/F#)
+  distance: number; // notes in exactly one of the query and the scale
+}
+
+export const pcSetData = data as PcSetData;
+
+export function maskFromMidi(midis: number[]): number {
+  let mask = 0;
+  for (const midi of midis) mask |= 1 << (((midi % 12) + 12) % 12);
+  return mask;
+}
+
+function popcount(mask: number): number {
+  let count = 0;
+  for (let m = mask; m; m &= m - 1) count++;
+  return count;
+}
+
+function matches(keep: (mask: number) => boolean, query: number): PcSetMatch[] {
+  const found: PcSetMatch[] = [];
+  pcSetData.masks.forEach((roots, s) => {
+    roots.forEach((mask, root) => {
+      if (keep(mask)) {
+        found.push({ scale: pcSetData.scales[s], root, keys: pcSetData.keys[root], distance: popcount(mask ^ query) });
+      }
+    });
+  });
+  return found;
+}
+
+/** Scales (in every key) containing every note of `query`. */
+export function scalesContaining(query: number): PcSetMatch[] {
+  return matches((mask) => (mask & query) === query, query);
+}
+
+/** Scales whose notes all lie within `query` (e.g. the notes of a voicing). */
+export function scalesWithin(query: number): PcSetMatch[] {
+  return matches((mask) => (mask & ~query & 0xfff) === 0, query);
+}
+
+/** The `count` scales closest to `query` by differing notes. */
+export function nearestScales(query: number, count = 5): PcSetMatch[] {
+  return matches(() => true, query)
+    .sort((a, b) => a.distance - b.distance)
+    .slice(0, count);
+}
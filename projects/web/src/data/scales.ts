@@ -26,10 +26,19 @@ export interface ScaleMeta {
   slug: string;
 }
 
+export interface PatternMeta {
+  id: string;
+  label: string;
+  skip: number; // degree skip of the pair (musical interval N -> skip N - 1)
+}
+
 export interface ScalesData {
   keys: string[];
   scales: ScaleMeta[];
   charts: Chart[];
+  patterns: PatternMeta[];
+  // sequences[degree count][pattern id]: the 16 degree indices of the phrase
+  sequences: Record<string, Record<string, number[]>>;
 }
 
 export const scalesData = data as ScalesData;